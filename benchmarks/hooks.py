@@ -0,0 +1,83 @@
+"""
+Per-request overhead of the global hooks: before and after request
+functions and template context processors.
+
+Usage: python3 -m benchmarks.hooks [--requests N]
+"""
+
+import argparse
+import timeit
+
+import flask
+import user_agents
+from webapp.app import create_app
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:84.0) "
+    "Gecko/20100101 Firefox/84.0"
+)
+
+HEADERS = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate, br"}
+
+PATHS = ["/", "/store", "/toto", "/static/images/badges/en/badge.svg"]
+
+
+def get_hooks(app):
+    """
+    Return the global hooks of the app as (kind, name, callable) tuples
+    """
+    hooks = []
+
+    for func in app.before_request_funcs.get(None, []):
+        hooks.append(("before_request", func.__name__, func))
+
+    for func in app.after_request_funcs.get(None, []):
+        hooks.append(
+            (
+                "after_request",
+                func.__name__,
+                lambda func=func: func(flask.Response("")),
+            )
+        )
+
+    for func in app.template_context_processors.get(None, []):
+        hooks.append(("context_processor", func.__name__, func))
+
+    return hooks
+
+
+def run(requests):
+    app = create_app(testing=True)
+    app.secret_key = "benchmark"
+    results = {}
+
+    for path in PATHS:
+        with app.test_request_context(path, headers=HEADERS):
+            app.preprocess_request()
+
+            for kind, name, hook in get_hooks(app):
+                duration = timeit.timeit(hook, number=requests)
+                results.setdefault((kind, name), []).append(duration)
+
+    print(f"Average time per request over {requests} requests:")
+    total = 0
+
+    for (kind, name), durations in results.items():
+        average = sum(durations) / len(durations) / requests * 1e6
+        total += average
+        print(f"  {kind:<18} {name:<32} {average:8.1f} µs")
+
+    print(f"  {'total':<51} {total:8.1f} µs")
+
+    # Reference: what prometheus_metrics paid before caching the parsing
+    parse_duration = timeit.timeit(
+        lambda: user_agents.parse(USER_AGENT), number=requests // 10 or 1
+    )
+    parse_average = parse_duration / (requests // 10 or 1) * 1e6
+    print(f"  {'uncached user-agent parsing':<51} {parse_average:8.1f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=10000)
+    run(parser.parse_args().requests)
@@ -0,0 +1,98 @@
+"""
+Memory of forked workers, depending on whether the application is
+preloaded in the parent, and whether the parent heap is frozen.
+
+Every worker runs a full garbage collection and renders a page, like a
+worker serving its first requests, then reports its memory. The modules
+imported by this script are shared by the workers in all cases.
+
+Usage: python3 -m benchmarks.preload [--workers N]
+"""
+
+import argparse
+import gc
+import json
+import os
+
+from webapp.app import create_app
+from webapp.preload import freeze, get_memory_usage, warm_up
+
+
+def load_app():
+    app = create_app(testing=True)
+    app.secret_key = "benchmark"
+    warm_up(app)
+
+    return app
+
+
+def serve(app):
+    gc.collect()
+
+    for _ in range(10):
+        app.test_client().get("/static/does-not-exist")
+
+
+def fork_workers(workers, preload, frozen):
+    app = load_app() if preload else None
+
+    if frozen:
+        freeze()
+
+    pids = []
+
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+
+        if pid == 0:
+            os.close(read_fd)
+            serve(app or load_app())
+
+            with os.fdopen(write_fd, "w") as pipe:
+                json.dump(get_memory_usage(), pipe)
+
+            os._exit(0)
+
+        os.close(write_fd)
+        pids.append((pid, read_fd))
+
+    usages = []
+
+    for pid, read_fd in pids:
+        with os.fdopen(read_fd) as pipe:
+            usages.append(json.load(pipe))
+
+        os.waitpid(pid, 0)
+
+    if frozen:
+        gc.unfreeze()
+
+    return usages
+
+
+def run(workers):
+    if get_memory_usage() is None:
+        raise SystemExit("/proc/self/smaps_rollup is not available")
+
+    print(f"Average memory of {workers} workers, in MB:")
+    print(f"  {'':<22} {'rss':>8} {'pss':>8} {'shared':>8} {'private':>8}")
+
+    for name, preload, frozen in [
+        ("no preload", False, False),
+        ("preload", True, False),
+        ("preload and freeze", True, True),
+    ]:
+        usages = fork_workers(workers, preload, frozen)
+        averages = [
+            sum(usage[field] for usage in usages) / len(usages) / 1024 ** 2
+            for field in ["rss", "pss", "shared", "private"]
+        ]
+
+        print(f"  {name:<22}" + "".join(f" {a:8.1f}" for a in averages))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    run(parser.parse_args().workers)
@@ -0,0 +1,148 @@
+"""
+Render time of store/snap-details.html with the lazy template context,
+compared to a context processor computing every property eagerly.
+
+Usage: python3 -m benchmarks.render [--renders N]
+"""
+
+import argparse
+import timeit
+
+import flask
+import responses
+from webapp.app import create_app
+from werkzeug.local import LocalProxy
+
+SNAP_NAME = "toto"
+
+PAYLOAD = {
+    "snap-id": "id",
+    "name": SNAP_NAME,
+    "default-track": None,
+    "snap": {
+        "title": "Snap Title",
+        "summary": "This is a summary",
+        "description": "this is a description",
+        "media": [],
+        "license": "license",
+        "prices": 0,
+        "publisher": {
+            "display-name": "Toto",
+            "username": "toto",
+            "validation": True,
+        },
+        "categories": [{"name": "test"}],
+        "trending": False,
+        "unlisted": False,
+    },
+    "channel-map": [
+        {
+            "channel": {
+                "architecture": "amd64",
+                "name": "stable",
+                "risk": "stable",
+                "track": "latest",
+                "released-at": "2018-09-18T14:45:28.064633+00:00",
+            },
+            "created-at": "2018-09-18T14:45:28.064633+00:00",
+            "version": "1.0",
+            "confinement": "conf",
+            "download": {"size": 100000},
+        }
+    ],
+}
+
+
+def get_snap_details_context(app):
+    """
+    Request the snap details page against a mocked store API
+    and return the context the view renders the template with
+    """
+    contexts = []
+
+    def record(sender, template, context, **extra):
+        if template.name == "store/snap-details.html":
+            contexts.append(context)
+
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add(
+            "GET",
+            f"https://api.snapcraft.io/v2/snaps/info/{SNAP_NAME}",
+            json=PAYLOAD,
+        )
+        rsps.add(
+            "POST", "https://api.snapcraft.io/api/v1/snaps/metrics", json={}
+        )
+
+        with flask.template_rendered.connected_to(record, app):
+            app.test_client().get(f"/{SNAP_NAME}")
+
+    # Keep only what the view passed, not what the context processors added
+    names = set()
+
+    for processor in app.template_context_processors[None]:
+        with app.test_request_context(f"/{SNAP_NAME}"):
+            names.update(processor())
+
+    return {k: v for k, v in contexts[0].items() if k not in names}
+
+
+def eager(processor):
+    """
+    Wrap a context processor to evaluate all its lazy properties,
+    the way it did before they were lazy
+    """
+
+    def eager_processor():
+        return {
+            key: (
+                value._get_current_object()
+                if isinstance(value, LocalProxy)
+                else value
+            )
+            for key, value in processor().items()
+        }
+
+    return eager_processor
+
+
+def run(renders):
+    app = create_app(testing=True)
+    app.secret_key = "benchmark"
+    context = get_snap_details_context(app)
+
+    lazy_processors = app.template_context_processors[None]
+    eager_processors = [eager(p) for p in lazy_processors]
+
+    def render():
+        with app.test_request_context(f"/{SNAP_NAME}"):
+            flask.render_template("store/snap-details.html", **context)
+
+    def process():
+        app.update_template_context(dict(context))
+
+    render()
+
+    print(f"Best average time over 5 runs of {renders} renders:")
+
+    for name, processors in [
+        ("eager context", eager_processors),
+        ("lazy context", lazy_processors),
+    ]:
+        app.template_context_processors[None] = processors
+
+        duration = min(timeit.repeat(render, number=renders, repeat=5))
+        print(f"  {name:<16} render       {duration / renders * 1e6:8.1f} µs")
+
+        with app.test_request_context(f"/{SNAP_NAME}"):
+            duration = min(timeit.repeat(process, number=renders, repeat=5))
+
+        print(f"  {name:<16} context only {duration / renders * 1e6:8.1f} µs")
+
+    app.template_context_processors[None] = lazy_processors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=1000)
+    run(parser.parse_args().renders)
@@ -0,0 +1,92 @@
+"""
+Startup cost of the application for each webapp: the time to import
+the modules and create the app, the memory used, and the modules that
+take the longest to import, from the -X importtime report of Python.
+
+Usage: python3 -m benchmarks.startup [--webapps W [W ...]] [--top N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from webapp.app import create_app
+create_app()
+duration = time.perf_counter() - start
+from webapp.preload import get_memory_usage
+print(json.dumps({"seconds": duration, "memory": get_memory_usage()}))
+"""
+
+
+def parse_importtime(report):
+    """
+    Return the modules imported in an -X importtime report, as a list
+    of (module, self microseconds, cumulative microseconds)
+    """
+    imports = []
+
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        self_time, cumulative_time, module = line[12:].split("|")
+
+        if not self_time.strip().isdigit():
+            continue
+
+        imports.append((module.strip(), int(self_time), int(cumulative_time)))
+
+    return imports
+
+
+def start_app(webapp):
+    """
+    Create the app of a webapp in a fresh interpreter.
+    Returns its startup report and the modules it imported
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        env=dict(os.environ, WEBAPP=webapp),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return json.loads(process.stdout), parse_importtime(process.stderr)
+
+
+def run(webapps, top):
+    for webapp in webapps:
+        startup, imports = start_app(webapp)
+        memory = startup["memory"] or {}
+
+        print(
+            f"{webapp}: {startup['seconds']:.2f} s to create the app, "
+            f"{len(imports)} modules, "
+            f"{memory.get('rss', 0) / 1024 ** 2:.1f} MB RSS"
+        )
+
+        print(f"  {'self ms':>8} {'cumul. ms':>9}  module")
+
+        for module, self_time, cumulative_time in sorted(
+            imports, key=lambda i: i[1], reverse=True
+        )[:top]:
+            print(
+                f"  {self_time / 1000:8.1f} "
+                f"{cumulative_time / 1000:9.1f}  {module}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--webapps", nargs="+", default=["snapcraft", "limenet"]
+    )
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    run(args.webapps, args.top)
@@ -88,51 +88,123 @@ class RepoConnect extends React.Component {
     );
   }
 
+  /**
+   * Map repositories from the API to repo list options
+   *
+   * @param {{name: string, nameWithOwner: string}[]} repos
+   *
+   * @returns {{value: string}[]}
+   */
+  mapRepos(repos) {
+    const { user } = this.state;
+
+    return repos.map((el) => {
+      // a user may have access to a repo in an org
+      // but they're not part of that org
+      // they may also have their own fork
+      // so we need to differentiate, this just shows
+      // the upstream org name in the repo list
+      if (el.nameWithOwner) {
+        if (el.nameWithOwner.indexOf(`${user.login}/`) === 0) {
+          return {
+            value: el.nameWithOwner.replace(`${user.login}/`, ""),
+          };
+        } else {
+          return { value: el.nameWithOwner };
+        }
+      } else {
+        return { value: el.name };
+      }
+    });
+  }
+
+  /**
+   * Read the newline delimited JSON stream of repos, calling onPage
+   * with every list of repos as soon as it is received
+   *
+   * @param {Response} res
+   * @param {function} onPage
+   *
+   * @returns {Promise}
+   */
+  static readRepoPages(res, onPage) {
+    if (!res.ok) {
+      throw new Error(res.statusText);
+    }
+
+    const parseLines = (lines) =>
+      lines
+        .filter((line) => line.trim())
+        .forEach((line) => onPage(JSON.parse(line)));
+
+    if (!res.body || !res.body.getReader) {
+      return res.text().then((text) => parseLines(text.split("\n")));
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    const read = () =>
+      reader.read().then(({ done, value }) => {
+        if (done) {
+          parseLines([buffer]);
+          return;
+        }
+
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop();
+        parseLines(lines);
+
+        return read();
+      });
+
+    return read();
+  }
+
   /**
    * Fetch repo list of the selected organization
    *
+   * Repos are added to the list page by page, as they are streamed
    */
   fetchRepoList() {
     const { selectedOrganization, user } = this.state;
     let url = "";
 
     if (selectedOrganization === user.login) {
-      url = "/publisher/github/get-repos";
+      url = "/publisher/github/get-repos/stream";
     } else {
-      url = `/publisher/github/get-repos?org=${selectedOrganization}`;
+      url = `/publisher/github/get-repos/stream?org=${selectedOrganization}`;
     }
     this.setState({
+      repoList: [],
       isRepoListDisabled: true,
       status: LOADING,
     });
     fetch(url)
-      .then((res) => res.json())
-      .then((result) => {
-        let newRepoList = result
-          .map((el) => {
-            // a user may have access to a repo in an org
-            // but they're not part of that org
-            // they may also have their own fork
-            // so we need to differentiate, this just shows
-            // the upstream org name in the repo list
-            if (el.nameWithOwner) {
-              if (el.nameWithOwner.indexOf(`${user.login}/`) === 0) {
-                return {
-                  value: el.nameWithOwner.replace(`${user.login}/`, ""),
-                };
-              } else {
-                return { value: el.nameWithOwner };
-              }
-            } else {
-              return { value: el.name };
-            }
-          })
-          .sort(this.sortByValue);
-        this.setState({
-          repoList: newRepoList,
-          isRepoListDisabled: false,
-          status: null,
-        });
+      .then((res) =>
+        RepoConnect.readRepoPages(res, (repos) => {
+          // Ignore pages of a previously selected organization
+          if (this.state.selectedOrganization !== selectedOrganization) {
+            return;
+          }
+
+          this.setState((state) => ({
+            repoList: state.repoList
+              .concat(this.mapRepos(repos))
+              .sort(this.sortByValue),
+            isRepoListDisabled: false,
+          }));
+        })
+      )
+      .then(() => {
+        if (this.state.selectedOrganization === selectedOrganization) {
+          this.setState({
+            isRepoListDisabled: false,
+            status: null,
+          });
+        }
       })
       .catch(() => {
         this.setState({
@@ -0,0 +1,59 @@
+import responses
+from tests.publisher.endpoint_testing import BaseTestCases
+
+ACCOUNT_URL = "https://dashboard.snapcraft.io/dev/api/account"
+STORE_URL = "https://dashboard.snapcraft.io/api/v2/stores/store-id"
+
+
+class AdminDataTestCase(BaseTestCases.BaseAppTesting):
+    def setUp(self, endpoint_url):
+        super().setUp(
+            snap_name=None, api_url=STORE_URL, endpoint_url=endpoint_url
+        )
+        self.authorization = self._log_in(self.client)
+
+        self.store = {"id": "store-id", "name": "Store", "roles": []}
+        self.members = [
+            {"email": "toto@example.com", "roles": ["admin"], "id": "1"}
+        ]
+        self.invites = [
+            {
+                "email": "titi@example.com",
+                "status": "Pending",
+                "expiration-date": "2021-01-01T00:00:00Z",
+            }
+        ]
+
+    def add_responses(self):
+        responses.add(
+            responses.GET,
+            ACCOUNT_URL,
+            json={"stores": [{"id": "store-id", "roles": ["admin"]}]},
+        )
+        responses.add(
+            responses.GET,
+            STORE_URL,
+            json={
+                "store": self.store,
+                "users": self.members,
+                "invites": self.invites,
+            },
+        )
+
+
+class GetManageMembersPage(AdminDataTestCase):
+    def setUp(self):
+        super().setUp(endpoint_url="/admin/store-id/members")
+
+    @responses.activate
+    def test_get_manage_members(self):
+        self.add_responses()
+
+        response = self.client.get(self.endpoint_url)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, len(responses.calls))
+        self.assert_template_used("admin/manage_members.html")
+        self.assert_context("store", self.store)
+        self.assert_context("members", self.members)
+        self.assert_context("invites", self.invites)
@@ -0,0 +1,85 @@
+import json
+
+import responses
+from tests.publisher.endpoint_testing import BaseTestCases
+from webapp.admin.views import store_cache
+
+STORES_URL = "https://dashboard.snapcraft.io/api/v2/stores/{}"
+
+
+class GetStoreSnapsPage(BaseTestCases.BaseAppTesting):
+    def setUp(self):
+        super().setUp(
+            snap_name=None,
+            api_url=STORES_URL.format("store-id/snaps"),
+            endpoint_url="/admin/store-id/snaps",
+        )
+        self.authorization = self._log_in(self.client)
+
+    def tearDown(self):
+        super().tearDown()
+        store_cache.clear()
+
+    def add_responses(self, snaps):
+        responses.add(
+            responses.GET,
+            "https://dashboard.snapcraft.io/dev/api/account",
+            json={"stores": [{"id": "store-id", "roles": ["admin"]}]},
+        )
+        responses.add(
+            responses.GET,
+            STORES_URL.format("store-id"),
+            json={"store": {"id": "store-id", "name": "Store"}},
+        )
+        responses.add(responses.GET, self.api_url, json={"snaps": snaps})
+        responses.add(
+            responses.GET,
+            STORES_URL.format("other-id"),
+            json={"store": {"id": "other-id", "name": "Other store"}},
+        )
+
+    @responses.activate
+    def test_get_store_snaps(self):
+        snaps = [
+            {"name": "snap-1", "store": "store-id"},
+            {"name": "snap-2", "store": "other-id"},
+            {"name": "snap-3", "store": "ubuntu"},
+            {"name": "snap-4", "store": "other-id"},
+        ]
+        self.add_responses(snaps)
+
+        response = self.client.get(self.endpoint_url)
+
+        self.assertEqual(200, response.status_code)
+        self.assert_template_used("admin/snaps.html")
+        self.assert_context("store", {"id": "store-id", "name": "Store"})
+        self.assert_context("snaps", json.dumps(snaps))
+        self.assert_context(
+            "other_stores_data",
+            json.dumps(
+                [
+                    {"id": "other-id", "name": "Other store"},
+                    {"id": "ubuntu", "name": "Global store"},
+                ]
+            ),
+        )
+
+        for called in responses.calls:
+            self.assertEqual(
+                self.authorization, called.request.headers["Authorization"]
+            )
+
+    @responses.activate
+    def test_other_stores_cached(self):
+        self.add_responses([{"name": "snap-2", "store": "other-id"}])
+
+        self.client.get(self.endpoint_url)
+        self.client.get(self.endpoint_url)
+
+        other_store_calls = [
+            called
+            for called in responses.calls
+            if called.request.url == STORES_URL.format("other-id")
+        ]
+        self.assertEqual(1, len(other_store_calls))
+        self.assertEqual(7, len(responses.calls))
@@ -1,6 +1,10 @@
+import unittest
+from base64 import b64encode
 from os import getenv
+
+import responses
 from vcr_unittest import VCRTestCase
-from webapp.api.github import GitHub
+from webapp.api.github import GitHub, InvalidYAML
 from werkzeug.exceptions import Unauthorized
 
 
@@ -60,44 +64,141 @@ class GitHubTest(VCRTestCase):
         )
         self.assertEqual(False, case2)
 
-    def test_get_snapcraft_yaml_location(self):
-        # /snapcraft.yaml is present
-        case1 = self.client.get_snapcraft_yaml_location(
-            "build-staging-snapcraft-io", "test1"
-        )
-        self.assertEqual("snapcraft.yaml", case1)
 
-        # /.snapcraft.yaml is present
-        case2 = self.client.get_snapcraft_yaml_location(
-            "build-staging-snapcraft-io", "test2"
+class GitHubSnapcraftYamlTest(unittest.TestCase):
+    def setUp(self):
+        GitHub._yaml_cache.clear()
+        self.sha = "a" * 40
+        self.repo_url = f"{GitHub.REST_API_URL}/repos/owner/repo"
+
+    def _add_gql_response(self, files):
+        data = {
+            "repository": {
+                "defaultBranchRef": {"target": {"oid": self.sha}},
+            }
+        }
+        for i, loc in enumerate(GitHub.YAML_LOCATIONS):
+            data["repository"][f"file{i}"] = files.get(loc)
+
+        responses.add(
+            responses.POST, GitHub.GRAPHQL_API_URL, json={"data": data}
         )
-        self.assertEqual(".snapcraft.yaml", case2)
 
-        # /snap/snapcraft.yaml is present
-        case3 = self.client.get_snapcraft_yaml_location(
-            "build-staging-snapcraft-io", "test3"
+    def _add_rest_responses(self, location, content):
+        responses.add(
+            responses.GET,
+            f"{self.repo_url}/commits/HEAD",
+            json={"sha": self.sha},
         )
-        self.assertEqual("snap/snapcraft.yaml", case3)
-
-        # /build-aux/snap/snapcraft.yaml is present
-        case4 = self.client.get_snapcraft_yaml_location(
-            "build-staging-snapcraft-io", "test4"
+        for loc in GitHub.YAML_LOCATIONS:
+            if loc == location:
+                json = {
+                    "encoding": "base64",
+                    "content": b64encode(content.encode("utf-8")).decode(),
+                }
+            else:
+                json = {"message": "Not Found"}
+
+            responses.add(
+                responses.GET,
+                f"{self.repo_url}/contents/{loc}?ref={self.sha}",
+                match_querystring=True,
+                json=json,
+                status=200 if loc == location else 404,
+            )
+
+    @responses.activate
+    def test_get_snapcraft_yaml_graphql(self):
+        self._add_gql_response(
+            {
+                ".snapcraft.yaml": {"text": "name: test-snap"},
+                "snap/snapcraft.yaml": {"text": "name: other"},
+            }
         )
-        self.assertEqual("build-aux/snap/snapcraft.yaml", case4)
+        client = GitHub("secret")
+
+        result = client.get_snapcraft_yaml("owner", "repo")
+
+        self.assertEqual(1, len(responses.calls))
+        self.assertEqual(".snapcraft.yaml", result["location"])
+        self.assertEqual("test-snap", result["content"]["name"])
+
+    @responses.activate
+    def test_get_snapcraft_yaml_graphql_missing(self):
+        self._add_gql_response({})
+        client = GitHub("secret")
+
+        result = client.get_snapcraft_yaml("owner", "repo")
 
-        # The repo doesn't contain a valid yaml file
-        case5 = self.client.get_snapcraft_yaml_location(
-            "build-staging-snapcraft-io", "test5"
+        self.assertEqual({"location": False, "content": False}, result)
+
+    @responses.activate
+    def test_get_snapcraft_yaml_graphql_unknown_repo(self):
+        responses.add(
+            responses.POST,
+            GitHub.GRAPHQL_API_URL,
+            json={"data": {"repository": None}},
         )
-        self.assertEqual(False, case5)
+        client = GitHub("secret")
 
-    def test_get_snapcraft_yaml_name(self):
-        case1 = self.client.get_snapcraft_yaml_name(
-            "build-staging-snapcraft-io", "test1"
+        result = client.get_snapcraft_yaml("owner", "repo")
+
+        self.assertEqual(False, result["location"])
+
+    @responses.activate
+    def test_get_snapcraft_yaml_invalid(self):
+        self._add_gql_response({"snapcraft.yaml": {"text": "name: [test"}})
+        client = GitHub("secret")
+
+        self.assertRaises(
+            InvalidYAML, client.get_snapcraft_yaml, "owner", "repo"
         )
-        self.assertEqual("test1", case1)
 
-        case2 = self.client.get_snapcraft_yaml_name(
-            "build-staging-snapcraft-io", "test5"
+    @responses.activate
+    def test_get_snapcraft_yaml_rest(self):
+        self._add_rest_responses("snap/snapcraft.yaml", "name: test-snap")
+        client = GitHub()
+
+        result = client.get_snapcraft_yaml("owner", "repo")
+
+        self.assertEqual("snap/snapcraft.yaml", result["location"])
+        self.assertEqual("test-snap", result["content"]["name"])
+        # The head of the branch, then the contents of each location
+        self.assertEqual(1 + len(GitHub.YAML_LOCATIONS), len(responses.calls))
+
+    @responses.activate
+    def test_get_snapcraft_yaml_rest_memoised_by_commit(self):
+        self._add_rest_responses("snapcraft.yaml", "name: test-snap")
+        client = GitHub()
+
+        client.get_snapcraft_yaml("owner", "repo")
+        calls = len(responses.calls)
+        result = client.get_snapcraft_yaml("owner", "repo")
+
+        # Only the default branch head is requested again
+        self.assertEqual(calls + 1, len(responses.calls))
+        self.assertEqual("snapcraft.yaml", result["location"])
+
+
+class GitHubHooksTest(unittest.TestCase):
+    @responses.activate
+    def test_get_hooks_pagination(self):
+        hooks_url = f"{GitHub.REST_API_URL}/repos/owner/repo/hooks"
+        responses.add(
+            responses.GET,
+            f"{hooks_url}?per_page=100&page=1",
+            match_querystring=True,
+            json=[{"id": 1}],
+            headers={"Link": f'<{hooks_url}?page=2>; rel="next"'},
         )
-        self.assertEqual(False, case2)
+        responses.add(
+            responses.GET,
+            f"{hooks_url}?per_page=100&page=2",
+            match_querystring=True,
+            json=[{"id": 2}],
+        )
+        client = GitHub("secret")
+
+        hooks = client.get_hooks("owner", "repo")
+
+        self.assertEqual([{"id": 1}, {"id": 2}], hooks)
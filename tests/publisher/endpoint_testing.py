@@ -5,6 +5,7 @@ import responses
 from flask_testing import TestCase
 from webapp.app import create_app
 from webapp.authentication import get_authorization_header
+from webapp.publisher.account_cache import account_cache
 
 # Make sure tests fail on stray responses.
 responses.mock.assert_all_requests_are_fired = True
@@ -28,6 +29,7 @@ class BaseTestCases:
 
         def tearDown(self):
             responses.reset()
+            account_cache.clear()
 
         def create_app(self):
             app = create_app(testing=True)
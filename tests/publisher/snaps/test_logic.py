@@ -1,5 +1,10 @@
+import hashlib
+import io
+import json
 import unittest
 
+from werkzeug.datastructures import FileStorage
+
 from webapp.publisher.snaps import logic
 
 
@@ -42,3 +47,56 @@ class LogicTest(unittest.TestCase):
         owned, shared = logic.get_snap_names_by_ownership(account_info)
         self.assertListEqual(owned, ["test"])
         self.assertListEqual(shared, ["test2"])
+
+    def test_build_image_info(self):
+        content = b"image" * logic.HASH_CHUNK_SIZE
+        image = FileStorage(io.BytesIO(content), filename="image.png")
+
+        image_info = logic.build_image_info(image, "screenshot")
+
+        self.assertEqual(
+            image_info,
+            {
+                "key": "image.png",
+                "type": "screenshot",
+                "filename": "image.png",
+                "hash": hashlib.sha256(content).hexdigest(),
+            },
+        )
+        self.assertEqual(image.read(), content)
+
+    def test_build_changed_images(self):
+        current_screenshots = [
+            {"url": "https://example.com/1.png", "type": "screenshot"},
+            {"url": "https://example.com/2.png", "type": "screenshot"},
+        ]
+        new_screenshot = FileStorage(io.BytesIO(b"new"), filename="new.png")
+        duplicate = FileStorage(io.BytesIO(b"new"), filename="new.png")
+        icon = FileStorage(io.BytesIO(b"icon"), filename="icon.png")
+        changed_screenshots = [
+            {"url": "https://example.com/2.png", "status": "uploaded"},
+            {"url": "blob:new", "status": "new", "name": "new.png"},
+            {"url": "blob:new", "status": "new", "name": "new.png"},
+            None,
+            {"url": "https://example.com/1.png", "status": "uploaded"},
+        ]
+
+        images_json, images_files = logic.build_changed_images(
+            changed_screenshots,
+            current_screenshots,
+            icon,
+            [None, new_screenshot, duplicate],
+            None,
+        )
+
+        info = json.loads(images_json["info"])
+        self.assertEqual(
+            [image.get("url", image.get("filename")) for image in info],
+            [
+                "https://example.com/2.png",
+                "new.png",
+                "https://example.com/1.png",
+                "icon.png",
+            ],
+        )
+        self.assertEqual(images_files, [new_screenshot, icon])
@@ -0,0 +1,218 @@
+import io
+import struct
+import unittest
+import zlib
+
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from webapp.publisher.snaps import media
+
+
+def png(width, height, padding=0):
+    def chunk(chunk_type, data):
+        crc = struct.pack(">I", zlib.crc32(chunk_type + data))
+        return struct.pack(">I", len(data)) + chunk_type + data + crc
+
+    rows = (b"\0" + b"\xff" * width * 3) * height
+
+    return (
+        media.PNG_SIGNATURE
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+        + b"\0" * padding
+    )
+
+
+def jpeg(width, height):
+    return (
+        b"\xff\xd8"
+        + b"\xff\xe0"
+        + struct.pack(">H", 16)
+        + b"JFIF\0" * 2
+        + b"\0" * 4
+        + b"\xff\xff\xc0"
+        + struct.pack(">HBHH", 17, 8, height, width)
+    )
+
+
+def upload(content, filename="image"):
+    return FileStorage(io.BytesIO(content), filename=filename)
+
+
+def noise_jpeg(width, height, **options):
+    output = io.BytesIO()
+    noise = Image.effect_noise((width, height), 64).convert("RGB")
+    noise.save(output, "JPEG", **options)
+
+    return output.getvalue()
+
+
+class GetImageInfoTest(unittest.TestCase):
+    def test_png(self):
+        image = upload(png(640, 480))
+
+        self.assertEqual(media.get_image_info(image), ("png", (640, 480)))
+        self.assertEqual(image.tell(), 0)
+
+    def test_jpeg(self):
+        self.assertEqual(
+            media.get_image_info(upload(jpeg(1218, 406))),
+            ("jpeg", (1218, 406)),
+        )
+
+    def test_gif(self):
+        image = upload(b"GIF89a" + struct.pack("<HH", 480, 640))
+
+        self.assertEqual(media.get_image_info(image), ("gif", (480, 640)))
+
+    def test_svg(self):
+        image = upload(b'<?xml version="1.0"?><svg></svg>')
+
+        self.assertEqual(media.get_image_info(image), ("svg", None))
+
+    def test_truncated(self):
+        self.assertIsNone(media.get_image_info(upload(png(640, 480)[:20])))
+        self.assertIsNone(media.get_image_info(upload(jpeg(640, 480)[:25])))
+        self.assertIsNone(media.get_image_info(upload(b"not an image")))
+
+
+class ValidateImagesTest(unittest.TestCase):
+    def test_valid_images(self):
+        errors = media.validate_images(
+            upload(png(256, 256), "icon.png"),
+            [None, upload(png(1920, 1080), "screenshot.png")],
+            upload(jpeg(1218, 406), "banner.jpg"),
+        )
+
+        self.assertEqual(errors, [])
+
+    def test_size(self):
+        image = upload(png(256, 256, 300000), "icon.png")
+        size = len(image.read()) / 1000
+        image.seek(0)
+
+        self.assertEqual(
+            media.validate_image(image, "icon"),
+            [
+                {
+                    "code": "invalid-image",
+                    "message": (
+                        f"icon.png: it is {size:.1f} kB, "
+                        "the maximum is 256 kB"
+                    ),
+                }
+            ],
+        )
+
+    def test_format(self):
+        errors = media.validate_image(
+            upload(b"GIF89a" + struct.pack("<HH", 1218, 406), "banner.gif"),
+            "banner",
+        )
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(
+            errors[0]["message"],
+            "banner.gif: it needs to be a PNG or JPEG image",
+        )
+
+    def test_dimensions(self):
+        errors = media.validate_images(
+            None, [upload(png(4000, 2000), "screenshot.png")], None
+        )
+
+        self.assertEqual(len(errors), 1)
+        self.assertIn("it is 4000 x 2000 pixels", errors[0]["message"])
+
+    def test_aspect_ratio(self):
+        errors = media.validate_image(
+            upload(png(1000, 480), "screenshot.png"), "screenshot"
+        )
+
+        self.assertEqual(
+            errors[0]["message"],
+            "screenshot.png: its aspect ratio needs to be between 1:2 and 2:1",
+        )
+        self.assertEqual(
+            media.validate_image(upload(png(1200, 400)), "banner"), []
+        )
+        self.assertEqual(
+            len(media.validate_image(upload(png(1200, 401)), "banner")), 1
+        )
+
+
+class NormaliseImagesTest(unittest.TestCase):
+    def test_resize(self):
+        image = upload(png(3840, 2160, 1000), "screenshot.png")
+
+        normalised, errors = media.normalise_image(image, "screenshot")
+
+        self.assertEqual(errors, [])
+        self.assertEqual(normalised.filename, "screenshot.png")
+        self.assertEqual(
+            media.get_image_info(normalised), ("png", (1920, 1080))
+        )
+
+    def test_strip_metadata(self):
+        exif = Image.Exif()
+        exif[0x013B] = "The artist"
+        image = upload(noise_jpeg(640, 480, quality=95, exif=exif))
+
+        normalised, errors = media.normalise_image(image, "screenshot")
+
+        self.assertEqual(errors, [])
+        self.assertLess(
+            media.get_image_size(normalised), media.get_image_size(image)
+        )
+
+        with Image.open(normalised) as decoded:
+            self.assertEqual(decoded.size, (640, 480))
+            self.assertNotIn("exif", decoded.info)
+
+    def test_unchanged(self):
+        image = upload(noise_jpeg(640, 480, quality=20))
+
+        self.assertEqual(
+            media.normalise_image(image, "screenshot"), (image, [])
+        )
+
+    def test_not_normalised_formats(self):
+        gif = upload(b"GIF89a" + struct.pack("<HH", 480, 640))
+        svg = upload(b"<svg></svg>")
+
+        self.assertEqual(media.normalise_image(gif, "screenshot"), (gif, []))
+        self.assertEqual(media.normalise_image(svg, "icon"), (svg, []))
+
+    def test_invalid(self):
+        image = upload(png(480, 480)[:40], "broken.png")
+
+        self.assertEqual(
+            media.normalise_image(image, "screenshot"),
+            (
+                image,
+                [
+                    {
+                        "code": "invalid-image",
+                        "message": "broken.png: it could not be decoded",
+                    }
+                ],
+            ),
+        )
+
+    def test_normalise_images(self):
+        icon = upload(png(256, 256), "icon.png")
+        screenshot = upload(png(3840, 2160), "screenshot.png")
+
+        icon, screenshots, banner, errors = media.normalise_images(
+            icon, [None, screenshot], None
+        )
+
+        self.assertEqual(icon.filename, "icon.png")
+        self.assertEqual(screenshots[0], None)
+        self.assertEqual(
+            media.get_image_info(screenshots[1]), ("png", (1920, 1080))
+        )
+        self.assertIsNone(banner)
+        self.assertEqual(errors, [])
@@ -1,8 +1,15 @@
+import hashlib
 import io
 import json
 
 import responses
 from tests.publisher.endpoint_testing import BaseTestCases
+from tests.publisher.snaps.tests_media import png
+from webapp.publisher.snaps import media
+from werkzeug.datastructures import FileStorage
+
+BLUE_PNG = png(480, 480)
+BLUE_PNG_HASH = hashlib.sha256(BLUE_PNG).hexdigest()
 
 
 class PostBinaryMetadataListingPageLoggedOut(BaseTestCases.EndpointLoggedOut):
@@ -76,7 +83,7 @@ class PostBinaryMetadataErrorListingPage(BaseTestCases.EndpointLoggedIn):
         }
 
         data = dict(
-            icon=[(io.BytesIO(b"my file contents"), "blue.png")],
+            icon=[(io.BytesIO(BLUE_PNG), "blue.png")],
             snap_id=self.snap_id,
             changes=json.dumps(changes),
         )
@@ -136,7 +143,7 @@ class PostBinaryMetadataListingPage(BaseTestCases.EndpointLoggedIn):
         }
 
         data = dict(
-            screenshots=[(io.BytesIO(b"my file contents"), "blue.png")],
+            screenshots=[(io.BytesIO(BLUE_PNG), "blue.png")],
             snap_id=self.snap_id,
             changes=json.dumps(changes),
         )
@@ -163,10 +170,55 @@ class PostBinaryMetadataListingPage(BaseTestCases.EndpointLoggedIn):
         self.assertIn(b'"key": "blue.png"', called.request.body)
         self.assertIn(b'"type": "screenshot"', called.request.body)
         self.assertIn(b'"filename": "blue.png"', called.request.body)
-        hash_screenshot = (
-            '"hash": '
-            '"114d70ba7d04c76d8c217c970f99682025c89b1a6ffe91eb9045653b4b954eb9'
+        hash_screenshot = '"hash": "{}"'.format(BLUE_PNG_HASH)
+        self.assertIn(
+            bytes(hash_screenshot, encoding="utf-8"), called.request.body
+        )
+
+        assert response.status_code == 302
+        assert response.location == self._get_location()
+
+    @responses.activate
+    def test_upload_new_screenshot_normalised(self):
+        self.app.config["IMAGE_NORMALISATION"] = True
+        responses.add(
+            responses.PUT, self.api_url, json={"totot": "toto"}, status=200
         )
+
+        changes = {
+            "images": [
+                {
+                    "file": {},
+                    "url": "blob:this_is_a_blob",
+                    "name": "large.png",
+                    "type": "screenshot",
+                    "status": "new",
+                }
+            ]
+        }
+
+        large_png = png(3840, 2160)
+        normalised, errors = media.normalise_image(
+            FileStorage(io.BytesIO(large_png), filename="large.png"),
+            "screenshot",
+        )
+        normalised_hash = hashlib.sha256(normalised.read()).hexdigest()
+
+        data = dict(
+            screenshots=[(io.BytesIO(large_png), "large.png")],
+            snap_id=self.snap_id,
+            changes=json.dumps(changes),
+        )
+
+        response = self.client.post(
+            self.endpoint_url, content_type="multipart/form-data", data=data
+        )
+
+        self.assertEqual(2, len(responses.calls))
+        called = responses.calls[1]
+        self.assertEqual("PUT", called.request.method)
+        self.assertIn(b'"filename": "large.png"', called.request.body)
+        hash_screenshot = '"hash": "{}"'.format(normalised_hash)
         self.assertIn(
             bytes(hash_screenshot, encoding="utf-8"), called.request.body
         )
@@ -191,7 +243,7 @@ class PostBinaryMetadataListingPage(BaseTestCases.EndpointLoggedIn):
         }
 
         data = dict(
-            icon=[(io.BytesIO(b"my file contents"), "blue.png")],
+            icon=[(io.BytesIO(BLUE_PNG), "blue.png")],
             snap_id=self.snap_id,
             changes=json.dumps(changes),
         )
@@ -218,10 +270,7 @@ class PostBinaryMetadataListingPage(BaseTestCases.EndpointLoggedIn):
         self.assertIn(b'"key": "blue.png"', called.request.body)
         self.assertIn(b'"type": "icon"', called.request.body)
         self.assertIn(b'"filename": "blue.png"', called.request.body)
-        hash_screenshot = (
-            '"hash": '
-            '"114d70ba7d04c76d8c217c970f99682025c89b1a6ffe91eb9045653b4b954eb9'
-        )
+        hash_screenshot = '"hash": "{}"'.format(BLUE_PNG_HASH)
         self.assertIn(
             bytes(hash_screenshot, encoding="utf-8"), called.request.body
         )
@@ -260,7 +309,7 @@ class PostBinaryMetadataListingPage(BaseTestCases.EndpointLoggedIn):
         }
 
         data = dict(
-            screenshots=[(io.BytesIO(b"my file contents"), "blue.png")],
+            screenshots=[(io.BytesIO(BLUE_PNG), "blue.png")],
             snap_id=self.snap_id,
             changes=json.dumps(changes),
         )
@@ -287,10 +336,7 @@ class PostBinaryMetadataListingPage(BaseTestCases.EndpointLoggedIn):
         self.assertIn(b'"key": "blue.png"', called.request.body)
         self.assertIn(b'"type": "screenshot"', called.request.body)
         self.assertIn(b'"filename": "blue.png"', called.request.body)
-        hash_screenshot = (
-            '"hash": '
-            '"114d70ba7d04c76d8c217c970f99682025c89b1a6ffe91eb9045653b4b954eb9'
-        )
+        hash_screenshot = '"hash": "{}"'.format(BLUE_PNG_HASH)
         self.assertIn(
             bytes(hash_screenshot, encoding="utf-8"), called.request.body
         )
@@ -333,7 +379,7 @@ class PostBinaryMetadataListingPage(BaseTestCases.EndpointLoggedIn):
         }
 
         data = dict(
-            screenshots=[(io.BytesIO(b"my file contents"), "blue.png")],
+            screenshots=[(io.BytesIO(BLUE_PNG), "blue.png")],
             snap_id=self.snap_id,
             changes=json.dumps(changes),
         )
@@ -360,10 +406,7 @@ class PostBinaryMetadataListingPage(BaseTestCases.EndpointLoggedIn):
         self.assertIn(b'"key": "blue.png"', called.request.body)
         self.assertIn(b'"type": "screenshot"', called.request.body)
         self.assertIn(b'"filename": "blue.png"', called.request.body)
-        hash_screenshot = (
-            '"hash": '
-            '"114d70ba7d04c76d8c217c970f99682025c89b1a6ffe91eb9045653b4b954eb9'
-        )
+        hash_screenshot = '"hash": "{}"'.format(BLUE_PNG_HASH)
         self.assertIn(
             bytes(hash_screenshot, encoding="utf-8"), called.request.body
         )
@@ -409,7 +452,7 @@ class PostBinaryMetadataListingPage(BaseTestCases.EndpointLoggedIn):
         }
 
         data = dict(
-            screenshots=[(io.BytesIO(b"my file contents"), "blue.png")],
+            screenshots=[(io.BytesIO(BLUE_PNG), "blue.png")],
             snap_id=self.snap_id,
             changes=json.dumps(changes),
         )
@@ -436,10 +479,7 @@ class PostBinaryMetadataListingPage(BaseTestCases.EndpointLoggedIn):
         self.assertIn(b'"key": "blue.png"', called.request.body)
         self.assertIn(b'"type": "screenshot"', called.request.body)
         self.assertIn(b'"filename": "blue.png"', called.request.body)
-        hash_screenshot = (
-            '"hash": '
-            '"114d70ba7d04c76d8c217c970f99682025c89b1a6ffe91eb9045653b4b954eb9'
-        )
+        hash_screenshot = '"hash": "{}"'.format(BLUE_PNG_HASH)
         self.assertIn(
             bytes(hash_screenshot, encoding="utf-8"), called.request.body
         )
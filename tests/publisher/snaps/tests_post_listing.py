@@ -1,3 +1,4 @@
+import io
 import json
 
 import responses
@@ -412,3 +413,67 @@ class PostMetadataListingPage(BaseTestCases.EndpointLoggedIn):
         )
 
         self.assert_context("categories", [])
+
+    @responses.activate
+    def test_return_error_invalid_image(self):
+        info_url = "https://dashboard.snapcraft.io/dev/api/snaps/info/{}"
+        info_url = info_url.format(self.snap_name)
+
+        payload = {
+            "snap_id": self.snap_id,
+            "snap_name": self.snap_name,
+            "title": "Snap title",
+            "summary": "This is a summary",
+            "description": "This is a description",
+            "media": [],
+            "publisher": {"display-name": "The publisher", "username": "toto"},
+            "private": True,
+            "channel_maps_list": [{"map": [{"info": "info"}]}],
+            "contact": "contact adress",
+            "website": "website_url",
+            "public_metrics_enabled": True,
+            "public_metrics_blacklist": True,
+            "license": "test OR testing",
+            "video_urls": [],
+            "categories": {"items": []},
+        }
+
+        responses.add(responses.GET, info_url, json=payload, status=200)
+        responses.add(
+            responses.GET,
+            "https://api.snapcraft.io/v2/snaps/categories?type=shared",
+            json=[],
+            status=200,
+        )
+
+        changes = {
+            "images": [{"url": "blob:icon", "status": "new", "name": "x"}]
+        }
+
+        response = self.client.post(
+            self.endpoint_url,
+            data={
+                "changes": json.dumps(changes),
+                "snap_id": self.snap_id,
+                "icon": (io.BytesIO(b"not an image"), "icon.png"),
+            },
+            content_type="multipart/form-data",
+        )
+
+        # The images are not sent to the store
+        self.assertEqual(2, len(responses.calls))
+        self.assertEqual(info_url, responses.calls[0].request.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assert_template_used("publisher/listing.html")
+        self.assert_context(
+            "other_errors",
+            [
+                {
+                    "code": "invalid-image",
+                    "message": (
+                        "icon.png: it needs to be a PNG, JPEG or SVG image"
+                    ),
+                }
+            ],
+        )
@@ -0,0 +1,117 @@
+from unittest.mock import patch
+
+import responses
+from tests.publisher.endpoint_testing import BaseTestCases
+
+# Make sure tests fail on stray responses.
+responses.mock.assert_all_requests_are_fired = True
+
+ACCOUNT_URL = "https://dashboard.snapcraft.io/dev/api/account"
+REGISTER_URL = "https://dashboard.snapcraft.io/dev/api/register-name/"
+
+ACCOUNT = {
+    "username": "toto",
+    "snaps": {
+        "16": {
+            "test": {
+                "status": "Approved",
+                "snap-id": "1",
+                "snap-name": "test",
+                "latest_revisions": [],
+                "publisher": {"username": "toto"},
+            }
+        }
+    },
+}
+
+
+class AccountCacheTest(BaseTestCases.BaseAppTesting):
+    def setUp(self):
+        super().setUp(snap_name=None, api_url=ACCOUNT_URL, endpoint_url=None)
+        self.authorization = self._log_in(self.client)
+
+    @responses.activate
+    def test_account_requested_once(self):
+        responses.add(responses.GET, ACCOUNT_URL, json=ACCOUNT, status=200)
+
+        self.client.get("/snaps")
+        response = self.client.get("/snaps/api/snap-count")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({"count": 0, "snaps": []}, response.json)
+        self.assertEqual(1, len(responses.calls))
+        self.check_call_by_api_url(responses.calls)
+
+    @responses.activate
+    def test_account_requested_again_after_register(self):
+        responses.add(responses.GET, ACCOUNT_URL, json=ACCOUNT, status=200)
+        responses.add(responses.POST, REGISTER_URL, json={}, status=200)
+
+        self.client.get("/snaps")
+        self.client.post("/register-snap", data={"snap-name": "test-snap"})
+        self.client.get("/snaps")
+
+        self.assertEqual(
+            [ACCOUNT_URL, REGISTER_URL, ACCOUNT_URL],
+            [call.request.url for call in responses.calls],
+        )
+
+    @responses.activate
+    def test_errors_not_cached(self):
+        responses.add(responses.GET, ACCOUNT_URL, status=500)
+        responses.add(responses.GET, ACCOUNT_URL, json=ACCOUNT, status=200)
+
+        self.assertEqual(502, self.client.get("/snaps").status_code)
+        self.assertEqual(200, self.client.get("/snaps").status_code)
+        self.assertEqual(2, len(responses.calls))
+
+
+class SnapPermissionsTest(BaseTestCases.BaseAppTesting):
+    def setUp(self):
+        super().setUp(snap_name=None, api_url=ACCOUNT_URL, endpoint_url=None)
+        self.authorization = self._log_in(self.client)
+
+    @responses.activate
+    @patch("webapp.publisher.snaps.build_views.launchpad")
+    def test_builds_checked_once(self, launchpad):
+        launchpad.is_snap_building.return_value = False
+        responses.add(responses.GET, ACCOUNT_URL, json=ACCOUNT, status=200)
+
+        for _ in range(2):
+            response = self.client.post("/test/builds/trigger-build")
+            self.assertEqual({"success": True}, response.json)
+
+        self.assertEqual(1, len(responses.calls))
+        self.assertEqual(2, launchpad.build_snap.call_count)
+
+    @responses.activate
+    @patch("webapp.publisher.snaps.build_views.launchpad")
+    def test_unknown_snap_checked_again(self, launchpad):
+        responses.add(responses.GET, ACCOUNT_URL, json=ACCOUNT, status=200)
+
+        self.client.post("/test/builds/trigger-build")
+        response = self.client.post("/other/builds/trigger-build")
+
+        self.assertEqual("FORBIDDEN", response.json["error"]["type"])
+        self.assertEqual(2, len(responses.calls))
+        launchpad.build_snap.assert_called_once_with("test")
+
+    @responses.activate
+    def test_forbidden_release_invalidates(self):
+        release_url = "https://dashboard.snapcraft.io/dev/api/snap-release/"
+        responses.add(responses.GET, ACCOUNT_URL, json=ACCOUNT, status=200)
+        responses.add(
+            responses.POST,
+            release_url,
+            json={"error_list": [{"code": "forbidden", "message": "No"}]},
+            status=403,
+        )
+
+        self.client.get("/snaps")
+        self.client.post("/test/releases", json={"name": "test"})
+        self.client.get("/snaps")
+
+        self.assertEqual(
+            [ACCOUNT_URL, release_url, ACCOUNT_URL],
+            [call.request.url for call in responses.calls],
+        )
@@ -0,0 +1,94 @@
+import json
+
+import responses
+from flask_testing import TestCase
+from webapp.api.github import GitHub
+from webapp.app import create_app
+from webapp.publisher.github import views
+
+
+class GetReposStreamTest(TestCase):
+    render_templates = False
+
+    def setUp(self):
+        self.endpoint_url = "/publisher/github/get-repos/stream"
+        views._repos_cache.clear()
+
+    def tearDown(self):
+        responses.reset()
+
+    def create_app(self):
+        app = create_app(testing=True)
+        app.secret_key = "secret_key"
+        app.config["WTF_CSRF_METHODS"] = []
+
+        return app
+
+    def _log_in(self, client):
+        with client.session_transaction() as s:
+            s["publisher"] = {"nickname": "Toto", "fullname": "El Toto"}
+            s["macaroons"] = "macaroons"
+            s["github_auth_secret"] = "github-token"
+
+    def _page(self, names, end_cursor=None):
+        return {
+            "data": {
+                "viewer": {
+                    "repositories": {
+                        "edges": [
+                            {"node": {"name": n, "nameWithOwner": f"o/{n}"}}
+                            for n in names
+                        ],
+                        "pageInfo": {
+                            "hasNextPage": end_cursor is not None,
+                            "endCursor": end_cursor,
+                        },
+                    }
+                }
+            }
+        }
+
+    def test_not_logged_in(self):
+        response = self.client.get(self.endpoint_url)
+
+        self.assertEqual(302, response.status_code)
+
+    @responses.activate
+    def test_stream_pages(self):
+        responses.add(
+            responses.POST,
+            GitHub.GRAPHQL_API_URL,
+            json=self._page(["repo1", "repo2"], "cursor"),
+        )
+        responses.add(
+            responses.POST,
+            GitHub.GRAPHQL_API_URL,
+            json=self._page(["repo3"]),
+        )
+        self._log_in(self.client)
+
+        response = self.client.get(self.endpoint_url)
+        lines = response.get_data(as_text=True).splitlines()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("application/x-ndjson", response.mimetype)
+        self.assertEqual(2, len(lines))
+        self.assertEqual(
+            ["repo1", "repo2"], [r["name"] for r in json.loads(lines[0])]
+        )
+        self.assertEqual(["repo3"], [r["name"] for r in json.loads(lines[1])])
+
+        # The second request for the same token is served from the cache
+        response = self.client.get(self.endpoint_url)
+
+        self.assertEqual(2, len(responses.calls))
+        self.assertEqual(lines, response.get_data(as_text=True).splitlines())
+
+    @responses.activate
+    def test_unauthorized(self):
+        responses.add(responses.POST, GitHub.GRAPHQL_API_URL, status=401)
+        self._log_in(self.client)
+
+        response = self.client.get(self.endpoint_url)
+
+        self.assertEqual(401, response.status_code)
@@ -0,0 +1,159 @@
+from unittest import mock
+from urllib.parse import urlencode
+
+import responses
+from flask_testing import TestCase
+from webapp.app import create_app
+
+SEARCH_API_URL = "https://api.snapcraft.io/api/v1/snaps/search?"
+
+SNAPS = [
+    {
+        "package_name": "lime-suite",
+        "title": "Lime Suite",
+        "summary": "Drivers and tools for the LimeSDR radio",
+        "publisher": "Lime Micro",
+    },
+    {
+        "package_name": "limenet-micro",
+        "title": "LimeNET Micro",
+        "summary": "Network in a box",
+        "publisher": "Lime Micro",
+    },
+    {
+        "package_name": "gqrx",
+        "title": "Gqrx",
+        "summary": "Software defined radio receiver",
+        "publisher": "SDR Satcom",
+    },
+]
+DEVMODE_SNAP = {
+    "package_name": "lime-devmode",
+    "title": "Lime devmode",
+    "summary": "Not returned by the search",
+    "publisher": "Lime Micro",
+}
+
+
+class BrandStoreViewTest(TestCase):
+    render_templates = False
+
+    def setUp(self):
+        self.listing_api_url = SEARCH_API_URL + urlencode(
+            {"scope": "wide", "size": "500"}
+        )
+        self.search_api_url = SEARCH_API_URL + urlencode(
+            {
+                "q": "",
+                "size": "500",
+                "page": "1",
+                "scope": "wide",
+                "confinement": "strict,classic",
+                "fields": "package_name,title,summary,icon_url,"
+                "architecture,media,publisher,"
+                "developer_validation,origin,apps,sections",
+                "arch": "wide",
+            }
+        )
+
+    def create_app(self):
+        with mock.patch("webapp.config.WEBAPP", "limenet"):
+            app = create_app(testing=True)
+
+        app.secret_key = "secret_key"
+
+        return app
+
+    def add_responses(self, total=None):
+        listing = SNAPS + [DEVMODE_SNAP]
+        responses.add(
+            responses.GET,
+            self.listing_api_url,
+            json={
+                "_embedded": {"clickindex:package": listing},
+                "total": len(listing),
+            },
+        )
+        responses.add(
+            responses.GET,
+            self.search_api_url,
+            json={
+                "_embedded": {"clickindex:package": SNAPS},
+                "total": total or len(SNAPS),
+            },
+        )
+
+    @responses.activate
+    def test_homepage(self):
+        self.add_responses()
+
+        response = self.client.get("/")
+
+        self.assert200(response)
+        self.assert_template_used("brand-store/store.html")
+        self.assert_context("snaps", SNAPS + [DEVMODE_SNAP])
+        self.assertEqual(2, len(responses.calls))
+
+        self.client.get("/")
+        self.assertEqual(2, len(responses.calls))
+
+    @responses.activate
+    def test_search(self):
+        self.add_responses()
+
+        response = self.client.get("/search?q=lime&limit=1&offset=1")
+
+        self.assert200(response)
+        self.assert_template_used("brand-store/search.html")
+        self.assert_context("snaps", [SNAPS[1]])
+
+        url = "http://localhost/search?q=lime&limit=1&offset={}"
+        self.assert_context(
+            "links",
+            {
+                "first": url.format(0),
+                "last": url.format(1),
+                "self": url.format(1),
+                "prev": url.format(0),
+            },
+        )
+
+        self.client.get("/search?q=gqrx")
+        self.assertEqual(2, len(responses.calls))
+
+    @responses.activate
+    def test_search_incomplete_catalogue(self):
+        self.add_responses(total=1000)
+        search_api_url = SEARCH_API_URL + urlencode(
+            {
+                "q": "lime",
+                "size": "25",
+                "page": "1",
+                "scope": "wide",
+                "confinement": "strict,classic",
+                "fields": "package_name,title,summary,icon_url,"
+                "architecture,media,publisher,"
+                "developer_validation,origin,apps,sections",
+                "arch": "wide",
+            }
+        )
+        responses.add(
+            responses.GET,
+            search_api_url,
+            json={"_embedded": {"clickindex:package": SNAPS[:1]}},
+        )
+
+        response = self.client.get("/search?q=lime")
+
+        self.assert200(response)
+        self.assert_context("snaps", SNAPS[:1])
+        self.assertEqual(search_api_url, responses.calls[-1].request.url)
+
+    @responses.activate
+    def test_api_error(self):
+        responses.add(responses.GET, self.listing_api_url, status=500)
+
+        response = self.client.get("/")
+
+        self.assertEqual(502, response.status_code)
+        self.assert_context("snaps", [])
@@ -0,0 +1,202 @@
+import threading
+import time
+import unittest
+
+from canonicalwebteam.store_api.exceptions import StoreApiConnectionError
+
+from webapp.store import logic
+from webapp.store.catalogue import CatalogueIndex, StoreCatalogue
+
+SNAPS = [
+    {
+        "package_name": "gqrx",
+        "title": "Gqrx",
+        "summary": "Software defined radio receiver",
+        "publisher": "SDR Satcom",
+    },
+    {
+        "package_name": "limenet-micro",
+        "title": "LimeNET Micro",
+        "summary": "Network in a box",
+        "publisher": "Lime Micro",
+    },
+    {
+        "package_name": "lime-suite",
+        "title": "Lime Suite",
+        "summary": "Drivers and tools for the LimeSDR radio",
+        "publisher": {"display-name": "Lime Micro", "username": "myriadrf"},
+    },
+]
+
+
+DEVMODE_SNAP = {
+    "package_name": "lime-devmode",
+    "title": "Lime devmode",
+    "summary": "Not returned by the search",
+    "publisher": "Lime Micro",
+}
+
+
+class FakeApi:
+    """
+    The store API: its search leaves out the devmode snaps of the listing
+    """
+
+    def __init__(self, snaps, total=None):
+        self.snaps = snaps
+        self.total = len(snaps) if total is None else total
+        self.calls = 0
+        self.error = None
+        self.ready = threading.Event()
+        self.ready.set()
+
+    def get_all_items(self, size):
+        self.calls += 1
+        self.ready.wait()
+
+        if self.error:
+            raise self.error
+
+        return {
+            "results": (self.snaps + [DEVMODE_SNAP])[:size],
+            "total": self.total + 1,
+        }
+
+    def search(self, search, size):
+        return {"results": self.snaps[:size], "total": self.total}
+
+
+class CatalogueIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = CatalogueIndex(SNAPS)
+
+    def search(self, query):
+        return [snap["package_name"] for snap in self.index.search(query)]
+
+    def test_empty_query(self):
+        self.assertEqual(self.search(""), [])
+        self.assertEqual(self.search("  -"), [])
+
+    def test_words(self):
+        self.assertEqual(self.search("radio"), ["gqrx", "lime-suite"])
+        self.assertEqual(self.search("LimeNET"), ["limenet-micro"])
+        self.assertEqual(self.search("myriadrf"), ["lime-suite"])
+
+    def test_prefix(self):
+        self.assertEqual(self.search("rec"), ["gqrx"])
+        self.assertEqual(self.search("lime"), ["lime-suite", "limenet-micro"])
+
+    def test_fuzzy(self):
+        self.assertEqual(self.search("recieve"), ["gqrx"])
+        self.assertEqual(self.search("zzzz"), [])
+
+    def test_all_words(self):
+        self.assertEqual(self.search("lime radio"), ["lime-suite"])
+        self.assertEqual(self.search("lime receiver"), [])
+
+    def test_ranking(self):
+        # The name matches before the summary
+        self.assertEqual(self.search("box network"), ["limenet-micro"])
+        self.assertEqual(self.search("micro"), ["limenet-micro", "lime-suite"])
+
+
+class StoreCatalogueTest(unittest.TestCase):
+    def test_load_once(self):
+        api = FakeApi(SNAPS)
+        catalogue = StoreCatalogue(api)
+
+        self.assertEqual(catalogue.get_snaps(), SNAPS + [DEVMODE_SNAP])
+        self.assertNotIn(DEVMODE_SNAP, catalogue.search("lime"))
+        self.assertEqual(len(catalogue.search("lime")), 2)
+        self.assertEqual(api.calls, 1)
+
+    def test_single_first_load(self):
+        api = FakeApi(SNAPS)
+        api.ready.clear()
+        catalogue = StoreCatalogue(api)
+        threads = [
+            threading.Thread(target=catalogue.get_snaps) for _ in range(4)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        time.sleep(0.01)
+        api.ready.set()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(api.calls, 1)
+
+    def test_incomplete(self):
+        catalogue = StoreCatalogue(FakeApi(SNAPS), size=2)
+
+        self.assertEqual(catalogue.get_snaps(), SNAPS[:2])
+        self.assertIsNone(catalogue.search("lime"))
+
+    def test_error(self):
+        api = FakeApi(SNAPS)
+        api.error = StoreApiConnectionError("Error")
+        catalogue = StoreCatalogue(api)
+
+        with self.assertRaises(StoreApiConnectionError):
+            catalogue.get_snaps()
+
+        api.error = None
+        self.assertEqual(catalogue.get_snaps(), SNAPS + [DEVMODE_SNAP])
+
+    def test_refresh(self):
+        api = FakeApi(SNAPS[:1])
+        catalogue = StoreCatalogue(api, refresh=0)
+        catalogue.get_snaps()
+
+        api.snaps = SNAPS
+        api.ready.clear()
+        time.sleep(0.01)
+
+        # The stale catalogue is served while the new one loads
+        self.assertEqual(catalogue.get_snaps(), SNAPS[:1] + [DEVMODE_SNAP])
+        self.assertEqual(catalogue.get_snaps(), SNAPS[:1] + [DEVMODE_SNAP])
+        api.ready.set()
+        catalogue.executor.shutdown(wait=True)
+
+        self.assertEqual(api.calls, 2)
+        self.assertEqual(catalogue.index.snaps, SNAPS)
+
+    def test_refresh_error(self):
+        api = FakeApi(SNAPS)
+        catalogue = StoreCatalogue(api, refresh=0)
+        catalogue.get_snaps()
+
+        api.error = StoreApiConnectionError("Error")
+        time.sleep(0.01)
+        catalogue.get_snaps()
+        catalogue.executor.shutdown(wait=True)
+
+        self.assertEqual(api.calls, 2)
+        self.assertEqual(catalogue.index.snaps, SNAPS)
+        self.assertFalse(catalogue.loading)
+
+
+class GetSearchLinksTest(unittest.TestCase):
+    def test_no_results(self):
+        self.assertEqual(
+            logic.get_search_links("http://store/search", "q", 10, 0, 0), {}
+        )
+
+    def test_links(self):
+        url = "http://store/search?q=lime+suite&limit=10&offset={}"
+
+        self.assertEqual(
+            logic.get_search_links(
+                "http://store/search", "lime suite", 10, 10, 25
+            ),
+            {
+                "first": url.format(0),
+                "last": url.format(20),
+                "self": url.format(10),
+                "prev": url.format(0),
+                "next": url.format(20),
+            },
+        )
@@ -0,0 +1,134 @@
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pymacaroons
+from webapp import authentication
+from webapp.app import create_app
+
+
+def create_discharge(*caveats):
+    discharge = pymacaroons.Macaroon("3rd", "a_ident", "a_caveat_key")
+
+    for caveat in caveats:
+        discharge.add_first_party_caveat(caveat)
+
+    return discharge.serialize()
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+        "%Y-%m-%dT%H:%M:%S.%f"
+    )
+
+
+class AuthorizationHeaderTest(unittest.TestCase):
+    def setUp(self):
+        root = pymacaroons.Macaroon("test", "testing", "a_key")
+        root.add_third_party_caveat("3rd", "a_caveat-key", "a_ident")
+        self.root = root.serialize()
+
+        authentication.authorization_headers.clear()
+        self.addCleanup(authentication.authorization_headers.clear)
+
+    def test_discharge_expiry(self):
+        discharge = create_discharge(
+            "login.ubuntu.com|valid_since|2020-01-01T00:00:00.000000",
+            "login.ubuntu.com|expires|2030-01-01T00:00:00.000000",
+            "time-before 2029-01-01T00:00:00Z",
+        )
+
+        self.assertEqual(
+            datetime(2029, 1, 1, tzinfo=timezone.utc).timestamp(),
+            authentication.get_discharge_expiry(discharge),
+        )
+        self.assertIsNone(
+            authentication.get_discharge_expiry(create_discharge())
+        )
+        self.assertIsNone(authentication.get_discharge_expiry("invalid"))
+
+    def test_header_bound_once(self):
+        discharge = create_discharge()
+
+        with mock.patch.object(
+            pymacaroons.Macaroon,
+            "deserialize",
+            wraps=pymacaroons.Macaroon.deserialize,
+        ) as deserialize:
+            header = authentication.get_authorization_header(
+                self.root, discharge
+            )
+            cached_header = authentication.get_authorization_header(
+                self.root, discharge
+            )
+
+        self.assertEqual(header, cached_header)
+        self.assertEqual(2, deserialize.call_count)
+        self.assertTrue(header.startswith(f"Macaroon root={self.root}"))
+
+    def test_expired_discharge_not_kept(self):
+        discharge = create_discharge(
+            f"login.ubuntu.com|expires|{format_time(time.time() - 60)}"
+        )
+
+        authentication.get_authorization_header(self.root, discharge)
+
+        self.assertIsNone(
+            authentication.authorization_headers.get((self.root, discharge))
+        )
+
+
+class DischargeRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.app.secret_key = "secret_key"
+        self.client = self.app.test_client()
+
+        executor = mock.patch.object(authentication, "refresh_executor")
+        self.executor = executor.start()
+        self.executor.submit.side_effect = lambda fn, *args: fn(*args)
+        self.addCleanup(executor.stop)
+
+        refresh = mock.patch.object(
+            authentication,
+            "get_refreshed_discharge",
+            return_value="refreshed",
+        )
+        self.refresh = refresh.start()
+        self.addCleanup(refresh.stop)
+        self.addCleanup(authentication.refreshed_discharges.clear)
+
+    def set_discharge(self, discharge):
+        with self.client.session_transaction() as session:
+            session["macaroon_discharge"] = discharge
+
+    def get_discharge(self):
+        with self.client.session_transaction() as session:
+            return session["macaroon_discharge"]
+
+    def test_refresh_before_expiry(self):
+        expires = time.time() + 60
+        discharge = create_discharge(
+            f"login.ubuntu.com|expires|{format_time(expires)}"
+        )
+        self.set_discharge(discharge)
+
+        self.client.get("/")
+        self.refresh.assert_called_once_with(discharge)
+        self.assertEqual(discharge, self.get_discharge())
+
+        self.client.get("/")
+        self.assertEqual("refreshed", self.get_discharge())
+
+    def test_no_refresh_far_from_expiry(self):
+        expires = time.time() + timedelta(days=1).total_seconds()
+        self.set_discharge(
+            create_discharge(
+                f"login.ubuntu.com|expires|{format_time(expires)}"
+            )
+        )
+
+        self.client.get("/")
+
+        self.refresh.assert_not_called()
@@ -0,0 +1,263 @@
+import os
+import pickle
+import socketserver
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from webapp.cache import (
+    FileCache,
+    LRUCache,
+    RedisCache,
+    RedisError,
+    create_cache,
+)
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_expired_value(self):
+        cache = LRUCache()
+
+        with mock.patch("time.monotonic", return_value=100):
+            cache.set("key", "value", 60)
+            self.assertEqual("value", cache.get("key"))
+
+        with mock.patch("time.monotonic", return_value=161):
+            self.assertIsNone(cache.get("key"))
+
+    def test_bounded(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("first", "1", 60)
+        cache.set("second", "2", 60)
+        cache.get("first")
+        cache.set("third", "3", 60)
+
+        self.assertEqual("1", cache.get("first"))
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual("3", cache.get("third"))
+
+    def test_values_copied(self):
+        cache = LRUCache()
+        value = {"snaps": ["toto"]}
+        cache.set("key", value, 60)
+        value["snaps"].append("tata")
+        cache.get("key")["snaps"].append("titi")
+
+        self.assertEqual({"snaps": ["toto"]}, cache.get("key"))
+
+
+class FileCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_shared_between_instances(self):
+        first = FileCache(self.directory, 1000)
+        second = FileCache(self.directory, 1000)
+
+        first.set(("snap", "toto"), {"name": "toto"})
+
+        self.assertEqual({"name": "toto"}, second.get(("snap", "toto")))
+
+        second.delete(("snap", "toto"))
+
+        self.assertIsNone(first.get(("snap", "toto")))
+
+    def test_expired_value(self):
+        cache = FileCache(self.directory, 1000)
+
+        with mock.patch("time.time", return_value=100):
+            cache.set("key", "value", 60)
+            self.assertEqual("value", cache.get("key"))
+
+        with mock.patch("time.time", return_value=161):
+            self.assertIsNone(cache.get("key"))
+
+        self.assertEqual([], os.listdir(self.directory))
+
+    def test_clear(self):
+        cache = FileCache(self.directory, 1000)
+        cache.set("first", "1")
+        cache.set("second", "2")
+        cache.clear()
+
+        self.assertIsNone(cache.get("first"))
+        self.assertEqual([], os.listdir(self.directory))
+
+
+class RedisStandInHandler(socketserver.StreamRequestHandler):
+    """
+    Answer the few Redis commands used by RedisCache, with the values
+    kept in the server
+    """
+
+    def read_command(self):
+        line = self.rfile.readline()
+
+        if not line:
+            return None
+
+        args = []
+
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+
+        return args
+
+    def write_bulk(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        else:
+            self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+
+    def handle(self):
+        values = self.server.values
+
+        while True:
+            command = self.read_command()
+
+            if command is None:
+                return
+
+            name, args = command[0].upper(), command[1:]
+
+            if name == b"GET":
+                self.write_bulk(values.get(args[0]))
+            elif name == b"SET":
+                values[args[0]] = args[1]
+                self.wfile.write(b"+OK\r\n")
+            elif name == b"DEL":
+                count = sum(values.pop(key, None) is not None for key in args)
+                self.wfile.write(b":%d\r\n" % count)
+            elif name == b"SCAN":
+                prefix = args[args.index(b"MATCH") + 1].rstrip(b"*")
+                keys = [key for key in values if key.startswith(prefix)]
+                self.wfile.write(b"*2\r\n")
+                self.write_bulk(b"0")
+                self.wfile.write(b"*%d\r\n" % len(keys))
+
+                for key in keys:
+                    self.write_bulk(key)
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+class RedisCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(
+            ("localhost", 0), RedisStandInHandler
+        )
+        self.server.daemon_threads = True
+        self.server.values = {}
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.url = "redis://localhost:%d/0" % self.server.server_address[1]
+
+    def test_get_set(self):
+        cache = RedisCache(self.url, "snaps")
+
+        self.assertIsNone(cache.get(("snap", "toto")))
+
+        cache.set(("snap", "toto"), {"name": "toto"}, 60)
+
+        self.assertEqual({"name": "toto"}, cache.get(("snap", "toto")))
+        self.assertEqual(
+            {"name": "toto"},
+            RedisCache(self.url, "snaps").get(("snap", "toto")),
+        )
+        self.assertIsNone(RedisCache(self.url, "other").get(("snap", "toto")))
+
+    def test_delete_clear(self):
+        cache = RedisCache(self.url, "snaps")
+        other_cache = RedisCache(self.url, "other")
+        cache.set("first", "1")
+        cache.set("second", "2")
+        other_cache.set("first", "1")
+
+        cache.delete("first")
+        self.assertIsNone(cache.get("first"))
+
+        cache.clear()
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual("1", other_cache.get("first"))
+
+    def test_server_unavailable(self):
+        self.server.shutdown()
+        self.server.server_close()
+        cache = RedisCache(self.url, "snaps", timeout=0.1)
+
+        cache.set("key", "value")
+
+        self.assertIsNone(cache.get("key"))
+
+    def test_raise_errors(self):
+        self.server.shutdown()
+        self.server.server_close()
+        cache = RedisCache(self.url, "snaps", timeout=0.1, raise_errors=True)
+
+        with self.assertRaises(RedisError):
+            cache.get("key")
+
+        # Skipped after the error
+        with self.assertRaises(RedisError):
+            cache.set("key", "value")
+
+    def test_retry_after_error(self):
+        cache = RedisCache(self.url, "snaps", retry_after=60)
+        cache.set("key", "value")
+        cache.pool = []
+        self.server.shutdown()
+        self.server.server_close()
+
+        with mock.patch(
+            "socket.create_connection", side_effect=ConnectionRefusedError
+        ) as create_connection:
+            self.assertIsNone(cache.get("key"))
+            self.assertIsNone(cache.get("key"))
+
+        self.assertEqual(1, create_connection.call_count)
+
+    def test_connection_pool(self):
+        cache = RedisCache(self.url, "snaps", pool_size=1)
+        first = cache._get_connection()
+        second = cache._get_connection()
+
+        self.assertIsNot(first, second)
+
+        cache._release_connection(first)
+        cache._release_connection(second)
+
+        self.assertEqual([first], cache.pool)
+        self.assertIs(first, cache._get_connection())
+
+    def test_unsigned_value(self):
+        cache = RedisCache(self.url, "snaps")
+        key = cache.get_key("key").encode("utf-8")
+        self.server.values[key] = pickle.dumps("value")
+
+        self.assertIsNone(cache.get("key"))
+
+
+class CreateCacheTest(unittest.TestCase):
+    def test_backends(self):
+        self.assertIsInstance(create_cache("test"), LRUCache)
+        self.assertIsInstance(
+            create_cache("test", backend="redis"), RedisCache
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch("webapp.cache.CACHE_SHARED_DIR", directory):
+                cache = create_cache("test", backend="shared")
+
+            self.assertIsInstance(cache, FileCache)
+            self.assertEqual(os.path.join(directory, "test"), cache.directory)
+
+        with self.assertRaises(ValueError):
+            create_cache("test", backend="unknown")
@@ -0,0 +1,101 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import brotli
+import flask
+from webapp.app import create_app
+from webapp.compression import compress_static
+
+PAGE = "<html>" + "snap " * 1000 + "</html>"
+
+
+class CompressionTest(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+
+        @self.app.route("/page")
+        def page():
+            return PAGE
+
+        @self.app.route("/small-page")
+        def small_page():
+            return "<html>snap</html>"
+
+        @self.app.route("/etag-page")
+        def etag_page():
+            response = flask.make_response(PAGE)
+            response.set_etag("page")
+            return response
+
+        self.client = self.app.test_client()
+
+    def test_brotli(self):
+        response = self.client.get(
+            "/page", headers={"Accept-Encoding": "gzip, deflate, br"}
+        )
+
+        self.assertEqual("br", response.headers["Content-Encoding"])
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(PAGE.encode(), brotli.decompress(response.data))
+
+    def test_gzip_preferred(self):
+        response = self.client.get(
+            "/page", headers={"Accept-Encoding": "gzip;q=1.0, br;q=0.5"}
+        )
+
+        self.assertEqual("gzip", response.headers["Content-Encoding"])
+        self.assertEqual(PAGE.encode(), gzip.decompress(response.data))
+
+    def test_not_accepted(self):
+        response = self.client.get("/page")
+
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(PAGE.encode(), response.data)
+
+    def test_small_body(self):
+        response = self.client.get(
+            "/small-page", headers={"Accept-Encoding": "br"}
+        )
+
+        self.assertNotIn("Content-Encoding", response.headers)
+
+    def test_etag_compressed_once(self):
+        with mock.patch(
+            "webapp.compression.compress", return_value=b"compressed"
+        ) as compress:
+            for _ in range(2):
+                response = self.client.get(
+                    "/etag-page", headers={"Accept-Encoding": "br"}
+                )
+                self.assertEqual(b"compressed", response.data)
+
+        compress.assert_called_once_with(PAGE.encode(), "br")
+        self.assertEqual('W/"page"', response.headers["ETag"])
+
+    def test_precompressed_static_file(self):
+        with tempfile.TemporaryDirectory() as static_folder:
+            with open(os.path.join(static_folder, "world.json"), "w") as f:
+                f.write('{"type": "Topology"}' * 100)
+
+            self.assertEqual(1, compress_static(static_folder, 1024))
+            self.app.static_folder = static_folder
+
+            response = self.client.get(
+                "/static/world.json", headers={"Accept-Encoding": "br"}
+            )
+            self.assertEqual("br", response.headers["Content-Encoding"])
+            self.assertEqual("application/json", response.mimetype)
+            self.assertEqual(
+                b'{"type": "Topology"}' * 100,
+                brotli.decompress(response.data),
+            )
+            response.close()
+
+            response = self.client.get("/static/world.json")
+            self.assertNotIn("Content-Encoding", response.headers)
+            self.assertIn("Accept-Encoding", response.headers["Vary"])
+            response.close()
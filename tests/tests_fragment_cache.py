@@ -0,0 +1,57 @@
+import unittest
+from unittest import mock
+
+import flask
+from webapp.app import create_app
+
+TEMPLATE = "{% cache ('snap', name), 60 %}{{ render(name) }}{% endcache %}"
+
+
+class FragmentCacheExtensionTest(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.app.secret_key = "secret_key"
+        self.app.jinja_env.auto_reload = False
+        self.render = mock.Mock(side_effect=lambda name: name.upper())
+
+    def render_fragment(self, name):
+        return flask.render_template_string(
+            TEMPLATE, name=name, render=self.render
+        )
+
+    def test_fragment_cached_by_key(self):
+        with self.app.test_request_context("/"):
+            self.assertEqual("TOTO", self.render_fragment("toto"))
+            self.assertEqual("TOTO", self.render_fragment("toto"))
+            self.assertEqual("TATA", self.render_fragment("tata"))
+
+        self.assertEqual(2, self.render.call_count)
+
+    def test_fragment_cached_by_webapp(self):
+        with self.app.test_request_context("/"):
+            self.render_fragment("toto")
+            self.app.config["WEBAPP"] = "limenet"
+            self.render_fragment("toto")
+            self.render_fragment("toto")
+
+        self.assertEqual(2, self.render.call_count)
+
+    def test_authenticated_bypass(self):
+        with self.app.test_request_context("/"):
+            flask.session["publisher"] = {"fullname": "Toto"}
+            flask.session["macaroon_root"] = "root"
+            flask.session["macaroon_discharge"] = "discharge"
+
+            self.render_fragment("toto")
+            self.render_fragment("toto")
+
+        self.assertEqual(2, self.render.call_count)
+
+    def test_auto_reload_bypass(self):
+        self.app.jinja_env.auto_reload = True
+
+        with self.app.test_request_context("/"):
+            self.render_fragment("toto")
+            self.render_fragment("toto")
+
+        self.assertEqual(2, self.render.call_count)
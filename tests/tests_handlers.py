@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+
+import flask
+from webapp.app import create_app
+from webapp.handlers import (
+    get_browser_family,
+    lazy_value,
+    normalise_accept_encoding,
+)
+
+
+class HandlersLabelsTest(unittest.TestCase):
+    def test_normalise_accept_encoding(self):
+        cases = [
+            ("gzip, deflate, br", "br,deflate,gzip"),
+            ("br;q=1.0, gzip;q=0.8, *;q=0.1", "br,gzip"),
+            ("GZIP", "gzip"),
+            ("some-unknown-coding", "none"),
+            (None, "none"),
+        ]
+
+        for accept_encoding, label in cases:
+            self.assertEqual(label, normalise_accept_encoding(accept_encoding))
+
+    def test_browser_family_cached(self):
+        agent_string = (
+            "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:84.0) "
+            "Gecko/20100101 Firefox/84.0"
+        )
+        get_browser_family.cache_clear()
+
+        self.assertEqual("Firefox", get_browser_family(agent_string))
+        self.assertEqual("Firefox", get_browser_family(agent_string))
+        self.assertEqual(1, get_browser_family.cache_info().hits)
+
+
+class LazyTemplateContextTest(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.app.secret_key = "secret_key"
+
+    def test_lazy_value_computed_once(self):
+        func = mock.Mock(return_value="value")
+        value = lazy_value(func)
+
+        func.assert_not_called()
+        self.assertEqual("value", value)
+        self.assertEqual("VALUE", value.upper())
+        func.assert_called_once()
+
+    def test_values_computed_when_read(self):
+        with mock.patch(
+            "webapp.template_utils.generate_slug", return_value="store"
+        ) as generate_slug, self.app.test_request_context("/store"):
+            self.assertEqual(
+                "commit_id", flask.render_template_string("{{ COMMIT_ID }}")
+            )
+            generate_slug.assert_not_called()
+
+            self.assertEqual(
+                "store /store None",
+                flask.render_template_string(
+                    "{{ page_slug }} {{ path }} {{ user_name }}"
+                ),
+            )
+            generate_slug.assert_called_once_with("/store")
+
+    def test_user_values(self):
+        with self.app.test_request_context("/"):
+            flask.session["publisher"] = {
+                "fullname": "Toto",
+                "is_canonical": True,
+            }
+            flask.session["macaroon_root"] = "root"
+            flask.session["macaroon_discharge"] = "discharge"
+
+            self.assertEqual(
+                "Toto yes",
+                flask.render_template_string(
+                    "{{ user_name }} "
+                    "{% if user_is_canonical %}yes{% endif %}"
+                ),
+            )
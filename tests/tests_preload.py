@@ -0,0 +1,61 @@
+import gc
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from webapp import gunicorn_config
+from webapp.app import create_app
+from webapp.preload import get_memory_usage, init_preload
+
+
+class PreloadTest(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+
+    def test_no_warm_up_by_default(self):
+        with mock.patch("webapp.preload.warm_up") as warm_up:
+            init_preload(self.app)
+
+        warm_up.assert_not_called()
+
+    def test_warm_up_loads_templates(self):
+        self.app.config["PRELOAD"] = True
+        init_preload(self.app)
+
+        self.assertEqual(
+            len(self.app.jinja_env.list_templates()),
+            len(self.app.jinja_env.cache),
+        )
+
+    @unittest.skipUnless(
+        os.path.exists("/proc/self/smaps_rollup"), "Needs smaps_rollup"
+    )
+    def test_memory_usage(self):
+        usage = get_memory_usage()
+
+        self.assertGreater(usage["rss"], 0)
+        self.assertEqual(usage["rss"], usage["shared"] + usage["private"])
+
+    def test_memory_usage_unknown_process(self):
+        self.assertIsNone(get_memory_usage("unknown"))
+
+
+class GunicornConfigTest(unittest.TestCase):
+    def get_server(self, preload_app):
+        return SimpleNamespace(
+            cfg=SimpleNamespace(preload_app=preload_app),
+            log=mock.Mock(),
+            WORKERS={},
+        )
+
+    def test_pre_fork_freezes_preloaded_app(self):
+        self.addCleanup(gc.unfreeze)
+        gunicorn_config.pre_fork(self.get_server(True), None)
+
+        self.assertGreater(gc.get_freeze_count(), 0)
+
+    def test_pre_fork_without_preload(self):
+        gunicorn_config.pre_fork(self.get_server(False), None)
+
+        self.assertEqual(0, gc.get_freeze_count())
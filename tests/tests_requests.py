@@ -1,10 +1,23 @@
+import threading
+import time
 import unittest
+from unittest.mock import patch
+
+import flask
 
 from requests.exceptions import ConnectionError, Timeout
 
 import responses
+from prometheus_client import REGISTRY
+from pybreaker import CircuitBreakerError
 from webapp.api import requests
-from webapp.api.exceptions import ApiConnectionError, ApiTimeoutError
+from webapp.api.breakers import CircuitBreakers, breaker_state
+from webapp.api.exceptions import (
+    ApiCircuitBreaker,
+    ApiConnectionError,
+    ApiError,
+    ApiTimeoutError,
+)
 
 
 class RequestsCacheTest(unittest.TestCase):
@@ -23,3 +36,265 @@ class RequestsCacheTest(unittest.TestCase):
         responses.add(responses.GET, test_url, body=Timeout())
         with self.assertRaises(ApiTimeoutError):
             session.get(test_url)
+
+
+class ConnectionPoolsTest(unittest.TestCase):
+    def test_pool_sizes_per_host(self):
+        session = requests.Session(
+            pool_maxsize=20, pool_block=True, pool_sizes={"api.test": 50}
+        )
+
+        default_adapter = session.get_adapter("https://snapcraft.io/")
+        host_adapter = session.get_adapter("https://api.test/v2/snaps")
+
+        self.assertEqual(20, default_adapter._pool_maxsize)
+        self.assertEqual(50, host_adapter._pool_maxsize)
+        self.assertTrue(host_adapter._pool_block)
+
+    def test_pool_telemetry(self):
+        pool = requests.InstrumentedHTTPConnectionPool("telemetry.test")
+        created = requests.pool_connections_created.labels(
+            host="telemetry.test"
+        )
+
+        conn = pool._get_conn()
+        pool._put_conn(conn)
+        pool._get_conn()
+
+        self.assertEqual(1, created._value.get())
+        self.assertEqual(
+            0.5,
+            requests.pool_reuse_ratio.labels(
+                host="telemetry.test"
+            )._value.get(),
+        )
+
+
+class CircuitBreakersTest(unittest.TestCase):
+    @responses.activate
+    def test_breakers_per_host(self):
+        failing_url = "https://failing.test/api"
+        healthy_url = "https://healthy.test/api"
+        session = requests.Session()
+        responses.add(responses.GET, failing_url, body=ConnectionError())
+        responses.add(responses.GET, healthy_url, json={})
+
+        for _ in range(5):
+            with self.assertRaises(ApiError):
+                session.get(failing_url)
+
+        with self.assertRaises(ApiCircuitBreaker):
+            session.get(failing_url)
+
+        self.assertEqual(200, session.get(healthy_url).status_code)
+        self.assertEqual(
+            2, breaker_state.labels(upstream="failing.test")._value.get()
+        )
+
+    def test_breakers_per_route(self):
+        breakers = CircuitBreakers(route_depth=2)
+
+        self.assertEqual(
+            "api.test/v2/snaps",
+            breakers.get_upstream("https://api.test/v2/snaps/info/toto"),
+        )
+        self.assertIsNot(
+            breakers.get("https://api.test/v2/snaps/info/toto"),
+            breakers.get("https://api.test/v2/metrics"),
+        )
+
+    def test_half_open_single_probe(self):
+        breaker = CircuitBreakers(fail_max=1, reset_timeout=0).get(
+            "https://probe.test"
+        )
+        breaker.open()
+
+        def probe():
+            # Another call while the trial call is in progress
+            with self.assertRaises(CircuitBreakerError):
+                breaker.call(lambda: None)
+
+            return "probed"
+
+        self.assertEqual("probed", breaker.call(probe))
+        self.assertEqual("closed", breaker.current_state)
+
+
+class RequestDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.app = flask.Flask(__name__)
+
+        @self.app.route("/deadline")
+        def deadline():
+            return ""
+
+    @patch("requests.Session.request")
+    def test_timeout_capped_to_deadline(self, mock_request):
+        session = requests.PublisherSession()
+
+        with self.app.test_request_context("/deadline"):
+            requests.set_deadline(5)
+            session.get("https://snapcraft.io")
+
+        timeout = mock_request.call_args[1]["timeout"]
+        self.assertLessEqual(timeout, 5)
+
+    def test_deadline_exceeded(self):
+        session = requests.Session()
+        counter = requests.deadline_exceeded.labels(route="/deadline")
+        count = counter._value.get()
+
+        with self.app.test_request_context("/deadline"):
+            self.app.preprocess_request()
+            requests.set_deadline(0)
+
+            with self.assertRaises(ApiTimeoutError):
+                session.get("https://snapcraft.io")
+
+        self.assertEqual(count + 1, counter._value.get())
+
+    @responses.activate
+    def test_deadline_timeouts_not_counted(self):
+        url = "https://slow.test/api"
+        session = requests.Session()
+        responses.add(responses.GET, url, body=Timeout())
+
+        with self.app.test_request_context("/deadline"):
+            requests.set_deadline(1)
+
+            for _ in range(10):
+                with self.assertRaises(ApiTimeoutError):
+                    session.get(url)
+
+        breaker = session.api_breakers.get(url)
+        self.assertEqual("closed", breaker.current_state)
+        self.assertEqual(0, breaker.fail_counter)
+
+    def test_deadline_bound_call_refused_by_open_breaker(self):
+        session = requests.Session()
+        session.api_breakers.get("https://down.test/api").open()
+
+        with self.app.test_request_context("/deadline"):
+            requests.set_deadline(1)
+
+            with self.assertRaises(ApiCircuitBreaker):
+                session.get("https://down.test/api")
+
+
+class UpstreamTimingTest(unittest.TestCase):
+    def test_path_templates(self):
+        cases = [
+            ("/v2/snaps/info/toto", "/v2/snaps/info/{snap}"),
+            ("/api/v1/snaps/search", "/api/v1/snaps/search"),
+            (
+                "/dev/api/snaps/abc123/metadata",
+                "/dev/api/snaps/{snap_id}/metadata",
+            ),
+            ("/api/v2/stores/store-id/users", "/api/v2/stores/{store}/users"),
+            ("/repos/owner/repo/hooks", "/repos/{owner}/{repo}/hooks"),
+            ("/owner/repo/sha/snapcraft.yaml", "/owner"),
+            ("", "/"),
+        ]
+
+        for path, template in cases:
+            self.assertEqual(template, requests.get_path_template(path))
+
+    @responses.activate
+    def test_upstream_timings(self):
+        test_url = "https://api.snapcraft.io/v2/snaps/info/toto"
+        session = requests.Session()
+        responses.add(responses.GET, test_url, json={})
+        labels = {
+            "host": "api.snapcraft.io",
+            "path": "/v2/snaps/info/{snap}",
+            "status": "2xx",
+            "breaker": "closed",
+        }
+        sample = "api_upstream_request_duration_seconds_count"
+        count = REGISTRY.get_sample_value(sample, labels) or 0
+
+        with flask.Flask(__name__).test_request_context("/"):
+            session.get(test_url)
+            server_timing = requests.get_server_timing()
+            server_timing_by_host = requests.get_server_timing(by_host=True)
+
+        self.assertEqual(count + 1, REGISTRY.get_sample_value(sample, labels))
+        self.assertNotIn("api.snapcraft.io", server_timing)
+        self.assertTrue(server_timing.startswith("upstream;dur="))
+        self.assertIn('desc="api.snapcraft.io"', server_timing_by_host)
+
+
+class RunConcurrentlyTest(unittest.TestCase):
+    def setUp(self):
+        self.app = flask.Flask(__name__)
+        self.app.secret_key = "secret"
+
+    def test_results_in_order(self):
+        with self.app.test_request_context("/"):
+            flask.session["user"] = "toto"
+            requests.set_deadline(5)
+
+            results = requests.run_concurrently(
+                lambda: flask.session["user"],
+                lambda: requests.get_remaining_time() <= 5,
+                lambda: flask.request.path,
+            )
+
+        self.assertEqual(results, ["toto", True, "/"])
+        self.assertEqual(requests.run_concurrently(), [])
+
+    def test_exception(self):
+        def fail():
+            raise ApiError("error")
+
+        with self.app.test_request_context("/"):
+            with self.assertRaises(ApiError):
+                requests.run_concurrently(lambda: 1, fail)
+
+    @patch("webapp.api.requests.CONCURRENT_CALLS", 2)
+    def test_concurrent_calls_bounded(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def call():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+
+            time.sleep(0.01)
+
+            with lock:
+                running.pop()
+
+        with self.app.test_request_context("/"):
+            requests.run_concurrently(*[call] * 6)
+
+        self.assertEqual(6, len(peak))
+        self.assertEqual(2, max(peak))
+
+    def test_teardown_once(self):
+        teardowns = []
+        self.app.teardown_request(lambda error: teardowns.append("request"))
+        self.app.teardown_appcontext(lambda error: teardowns.append("app"))
+
+        with self.app.test_request_context("/"):
+            flask.g.route = "admin"
+            results = requests.run_concurrently(
+                lambda: flask.g.get("route"), lambda: flask.current_app.name
+            )
+
+        self.assertEqual(results, [None, self.app.name])
+        self.assertEqual(teardowns, ["request", "app"])
+
+    @responses.activate
+    def test_upstream_timings_shared(self):
+        test_url = "https://api.snapcraft.io/v2/snaps/info/toto"
+        session = requests.Session()
+        responses.add(responses.GET, test_url, json={})
+
+        with self.app.test_request_context("/"):
+            requests.run_concurrently(lambda: session.get(test_url))
+            server_timing = requests.get_server_timing(by_host=True)
+
+        self.assertIn('desc="api.snapcraft.io"', server_timing)
@@ -0,0 +1,137 @@
+import threading
+import unittest
+
+import flask
+from webapp.app import create_app
+from webapp.response_cache import (
+    ResponseCache,
+    get_response_key,
+    init_response_cache,
+)
+
+LINUX_USER_AGENT = (
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:84.0) "
+    "Gecko/20100101 Firefox/84.0"
+)
+ANDROID_USER_AGENT = (
+    "Mozilla/5.0 (Linux; Android 11; Pixel 5) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/90.0.4430.91 Mobile Safari/537.36"
+)
+
+
+class ResponseCacheHooksTest(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.app.secret_key = "secret_key"
+        self.app.config["RESPONSE_CACHE_TTL"] = 10
+        init_response_cache(self.app)
+        self.renders = []
+
+        @self.app.route("/cached-page", methods=["GET", "POST"])
+        def cached_page():
+            self.renders.append(flask.request.url)
+            return f"render {len(self.renders)}"
+
+        @self.app.route("/private-page")
+        def private_page():
+            self.renders.append(flask.request.url)
+            response = flask.make_response("private")
+            response.cache_control.private = True
+            return response
+
+        @self.app.route("/stale-page")
+        def stale_page():
+            self.renders.append(flask.request.url)
+            response = flask.make_response("stale")
+            response.headers["Warning"] = '110 - "Response is Stale"'
+            return response
+
+        self.client = self.app.test_client()
+
+    def test_anonymous_response_cached(self):
+        first = self.client.get("/cached-page")
+        second = self.client.get("/cached-page")
+
+        self.assertEqual(b"render 1", first.data)
+        self.assertEqual(b"render 1", second.data)
+        self.assertEqual(1, len(self.renders))
+        self.assertIn("public", second.headers["Cache-Control"])
+        self.assertIn("X-Hostname", second.headers)
+
+    def test_keyed_by_url_and_user_agent(self):
+        self.client.get("/cached-page")
+        self.client.get("/cached-page?page=2")
+        self.client.get(
+            "/cached-page", headers={"User-Agent": LINUX_USER_AGENT}
+        )
+        self.client.get("/cached-page?page=2")
+
+        self.assertEqual(3, len(self.renders))
+
+    def test_android_not_linux(self):
+        self.client.get(
+            "/cached-page", headers={"User-Agent": ANDROID_USER_AGENT}
+        )
+        response = self.client.get(
+            "/cached-page", headers={"User-Agent": LINUX_USER_AGENT}
+        )
+
+        self.assertEqual(b"render 2", response.data)
+        self.assertEqual(2, len(self.renders))
+
+    def test_response_key(self):
+        keys = []
+
+        for user_agent in [ANDROID_USER_AGENT, LINUX_USER_AGENT]:
+            with self.app.test_request_context(
+                "/cached-page", headers={"User-Agent": user_agent}
+            ):
+                keys.append(get_response_key())
+
+        self.assertNotEqual(keys[0], keys[1])
+
+    def test_session_bypass(self):
+        with self.client.session_transaction() as session:
+            session["last_visit"] = "snap"
+
+        self.client.get("/cached-page")
+        self.client.get("/cached-page")
+
+        self.assertEqual(2, len(self.renders))
+
+    def test_private_response_not_cached(self):
+        self.client.get("/private-page")
+        self.client.get("/private-page")
+
+        self.assertEqual(2, len(self.renders))
+
+    def test_stale_response_not_cached(self):
+        self.client.get("/stale-page")
+        self.client.get("/stale-page")
+
+        self.assertEqual(2, len(self.renders))
+
+    def test_post_not_cached(self):
+        self.client.post("/cached-page")
+        self.client.post("/cached-page")
+
+        self.assertEqual(2, len(self.renders))
+        self.assertEqual({}, self.app.extensions["response_cache"].fills)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def test_single_fill(self):
+        cache = ResponseCache(ttl=10, maxsize=10)
+
+        self.assertIsNone(cache.claim("key"))
+
+        fill = cache.claim("key")
+        self.assertIsInstance(fill, threading.Event)
+        self.assertFalse(fill.is_set())
+
+        cache.set("key", (b"body", 200, []))
+        cache.release("key")
+
+        self.assertTrue(fill.is_set())
+        self.assertEqual((b"body", 200, []), cache.get("key"))
+        self.assertIsNone(cache.claim("key"))
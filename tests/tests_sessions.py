@@ -0,0 +1,194 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import flask
+from webapp.authentication import empty_session
+from webapp.cache import FileCache, RedisCache
+from webapp.sessions import (
+    CookieSessionInterface,
+    ServerSideSessionInterface,
+    init_sessions,
+)
+
+
+def create_session_app(session_interface):
+    app = flask.Flask(__name__)
+    app.secret_key = "secret_key"
+    app.session_interface = session_interface
+
+    @app.route("/anonymous")
+    def anonymous():
+        flask.session["next_url"] = "/snaps"
+        return ""
+
+    @app.route("/login")
+    def login():
+        flask.session["publisher"] = {"nickname": "toto"}
+        flask.session["user_shared_snaps"] = frozenset(["toto", "tata"])
+        return ""
+
+    @app.route("/remember")
+    def remember():
+        flask.session.permanent = True
+        return ""
+
+    @app.route("/shared-snaps")
+    def shared_snaps():
+        return flask.jsonify(
+            type=type(flask.session.get("user_shared_snaps")).__name__,
+            snaps=sorted(flask.session.get("user_shared_snaps", [])),
+        )
+
+    @app.route("/logout")
+    def logout():
+        empty_session(flask.session)
+        flask.session.pop("next_url", None)
+        return ""
+
+    return app
+
+
+def get_session_cookie(client):
+    for cookie in client.cookie_jar:
+        if cookie.name == "session":
+            return cookie.value
+
+
+class CookieSessionTest(unittest.TestCase):
+    def test_frozenset(self):
+        client = create_session_app(CookieSessionInterface()).test_client()
+        client.get("/login")
+
+        response = client.get("/shared-snaps")
+
+        self.assertEqual(
+            {"type": "frozenset", "snaps": ["tata", "toto"]}, response.json
+        )
+
+
+class ServerSideSessionTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+        self.store = FileCache(self.directory, 1024 * 1024)
+        self.client = create_session_app(
+            ServerSideSessionInterface(self.store)
+        ).test_client()
+
+    def test_cookie_holds_id(self):
+        self.client.get("/login")
+        sid = get_session_cookie(self.client)
+
+        self.assertEqual(43, len(sid))
+        self.assertEqual(
+            frozenset(["toto", "tata"]),
+            self.store.get(sid)["user_shared_snaps"],
+        )
+
+        response = self.client.get("/shared-snaps")
+
+        self.assertEqual(
+            {"type": "frozenset", "snaps": ["tata", "toto"]}, response.json
+        )
+
+    def test_empty_session_not_stored(self):
+        self.client.get("/shared-snaps")
+
+        self.assertIsNone(get_session_cookie(self.client))
+        self.assertEqual([], os.listdir(self.directory))
+
+    def test_id_changes_on_login(self):
+        self.client.get("/anonymous")
+        anonymous_sid = get_session_cookie(self.client)
+
+        self.client.get("/login")
+        sid = get_session_cookie(self.client)
+
+        self.assertNotEqual(anonymous_sid, sid)
+        self.assertIsNone(self.store.get(anonymous_sid))
+        self.assertEqual("/snaps", self.store.get(sid)["next_url"])
+
+    def test_logout_deletes_session(self):
+        self.client.get("/login")
+        sid = get_session_cookie(self.client)
+        self.client.get("/logout")
+
+        self.assertIsNone(get_session_cookie(self.client))
+        self.assertIsNone(self.store.get(sid))
+
+    def test_unknown_id(self):
+        self.client.set_cookie("localhost", "session", "unknown")
+
+        response = self.client.get("/shared-snaps")
+
+        self.assertEqual({"type": "NoneType", "snaps": []}, response.json)
+
+    def test_store_unavailable(self):
+        self.client.get("/login")
+        sid = get_session_cookie(self.client)
+
+        with mock.patch.object(self.store, "get", side_effect=OSError):
+            response = self.client.get("/shared-snaps")
+            self.client.get("/anonymous")
+
+        self.assertEqual({"type": "NoneType", "snaps": []}, response.json)
+        self.assertEqual(sid, get_session_cookie(self.client))
+        self.assertNotIn("next_url", self.store.get(sid))
+
+        response = self.client.get("/shared-snaps")
+
+        self.assertEqual(["tata", "toto"], response.json["snaps"])
+
+    def test_expiry_extended_on_read(self):
+        self.client.get("/login")
+        self.client.get("/remember")
+        sid = get_session_cookie(self.client)
+
+        with mock.patch.object(
+            self.store, "set", wraps=self.store.set
+        ) as store_set:
+            self.client.get("/shared-snaps")
+
+        store_set.assert_called_once_with(sid, mock.ANY, 31 * 24 * 60 * 60)
+
+    def test_expiry_not_extended(self):
+        self.client.get("/login")
+        self.client.get("/remember")
+        sid = get_session_cookie(self.client)
+
+        with mock.patch.object(self.store, "set", side_effect=OSError):
+            response = self.client.get("/shared-snaps")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(sid, get_session_cookie(self.client))
+
+
+class InitSessionsTest(unittest.TestCase):
+    def test_backends(self):
+        app = flask.Flask(__name__)
+
+        with tempfile.TemporaryDirectory() as directory:
+            app.config["SESSION_SHARED_DIR"] = directory
+            app.config["SESSION_SHARED_MAX_SIZE"] = 1024
+
+            for backend, store_class in [
+                ("shared", FileCache),
+                ("redis", RedisCache),
+            ]:
+                app.config["SESSION_BACKEND"] = backend
+                init_sessions(app)
+
+                self.assertIsInstance(app.session_interface.store, store_class)
+
+        app.config["SESSION_BACKEND"] = "cookie"
+        init_sessions(app)
+        self.assertIsInstance(app.session_interface, CookieSessionInterface)
+
+        app.config["SESSION_BACKEND"] = "unknown"
+
+        with self.assertRaises(ValueError):
+            init_sessions(app)
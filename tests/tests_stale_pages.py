@@ -0,0 +1,157 @@
+import os
+import re
+import tempfile
+import unittest
+
+import requests
+import responses
+from webapp.app import create_app
+from webapp.stale_pages import StalePages, init_stale_pages
+
+PAYLOAD = {
+    "snap-id": "id",
+    "name": "toto",
+    "default-track": None,
+    "snap": {
+        "title": "Snap Title",
+        "summary": "This is a summary",
+        "description": "this is a description",
+        "media": [],
+        "license": "license",
+        "prices": 0,
+        "publisher": {
+            "display-name": "Toto",
+            "username": "toto",
+            "validation": True,
+        },
+        "categories": [{"name": "test"}],
+        "trending": False,
+        "unlisted": False,
+    },
+    "channel-map": [
+        {
+            "channel": {
+                "architecture": "amd64",
+                "name": "stable",
+                "risk": "stable",
+                "track": "latest",
+                "released-at": "2018-09-18T14:45:28.064633+00:00",
+            },
+            "created-at": "2018-09-18T14:45:28.064633+00:00",
+            "version": "1.0",
+            "confinement": "conf",
+            "download": {"size": 100000},
+        }
+    ],
+}
+
+
+class StalePagesTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_get_set(self):
+        stale_pages = StalePages(self.directory, 1000, 60)
+
+        self.assertIsNone(stale_pages.get(["snapcraft", "/toto"]))
+
+        stale_pages.set(["snapcraft", "/toto"], b"<html></html>")
+        page, saved_at = stale_pages.get(["snapcraft", "/toto"])
+
+        self.assertEqual(b"<html></html>", page)
+
+    def test_refresh(self):
+        stale_pages = StalePages(self.directory, 1000, 60)
+        stale_pages.set(["snapcraft", "/toto"], b"first")
+        stale_pages.set(["snapcraft", "/toto"], b"second")
+
+        self.assertEqual(b"first", stale_pages.get(["snapcraft", "/toto"])[0])
+
+    def test_prune_oldest(self):
+        stale_pages = StalePages(self.directory, 60, 60)
+
+        for index, name in enumerate(["first", "second", "third"]):
+            stale_pages.set([name], b"12345")
+            path = stale_pages.pages.get_path([name])
+            os.utime(path, (index, index))
+
+        stale_pages.pages.prune()
+
+        self.assertIsNone(stale_pages.get(["first"]))
+        self.assertIsNotNone(stale_pages.get(["second"]))
+        self.assertIsNotNone(stale_pages.get(["third"]))
+
+
+class StalePagesServedTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        self.app = create_app(testing=True)
+        self.app.secret_key = "secret_key"
+        self.app.config["STALE_PAGES_DIR"] = directory.name
+        init_stale_pages(self.app)
+        self.client = self.app.test_client()
+
+        self.api_url = "https://api.snapcraft.io/v2/snaps/info/toto"
+        self.metrics_url = "https://api.snapcraft.io/api/v1/snaps/metrics"
+
+    @responses.activate
+    def test_stale_page_on_timeout(self):
+        responses.add("GET", self.api_url, json=PAYLOAD)
+        responses.add("POST", self.metrics_url, json={})
+
+        response = self.client.get("/toto")
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn(b"temporarily unavailable", response.data)
+
+        responses.replace(
+            "GET", self.api_url, body=requests.exceptions.Timeout()
+        )
+        response = self.client.get("/toto")
+
+        self.assertEqual(200, response.status_code)
+        self.assertIn(b"Snap Title", response.data)
+        self.assertIn(b"temporarily unavailable", response.data)
+        self.assertIn("stale-if-error", response.headers["Cache-Control"])
+        self.assertIn("Warning", response.headers)
+
+    @responses.activate
+    def test_no_stale_page(self):
+        responses.add("GET", self.api_url, body=requests.exceptions.Timeout())
+        response = self.client.get("/toto")
+
+        self.assertEqual(504, response.status_code)
+
+    @responses.activate
+    def test_stale_page_on_rendered_error(self):
+        category_url = re.compile(
+            r"https://api\.snapcraft\.io/api/v1/snaps/search\?.*"
+        )
+        snap = {
+            "package_name": "toto",
+            "title": "Snap Title",
+            "icon_url": "",
+            "media": [],
+        }
+        responses.add(
+            "GET",
+            category_url,
+            json={"_embedded": {"clickindex:package": [snap]}},
+        )
+
+        response = self.client.get("/store/categories/test")
+        self.assertEqual(200, response.status_code)
+
+        responses.replace(
+            "GET",
+            category_url,
+            body=requests.exceptions.ConnectionError(),
+        )
+        response = self.client.get("/store/categories/test")
+
+        self.assertEqual(200, response.status_code)
+        self.assertIn(b"Snap Title", response.data)
+        self.assertIn("Warning", response.headers)
@@ -0,0 +1,49 @@
+import unittest
+
+from benchmarks.startup import parse_importtime, start_app
+
+SNAPCRAFT_MODULES = [
+    "webapp.admin.views",
+    "webapp.blog.views",
+    "webapp.docs.views",
+    "webapp.first_snap.views",
+    "webapp.login.views",
+    "webapp.publisher.github.views",
+    "webapp.publisher.snaps.preview_data",
+    "webapp.publisher.snaps.views",
+    "webapp.snapcraft.views",
+    "webapp.tutorials.views",
+]
+
+
+class StartupTest(unittest.TestCase):
+    def test_parse_importtime(self):
+        report = "\n".join(
+            [
+                "import time: self [us] | cumulative | imported package",
+                "import time:       125 |        125 |     flask.json",
+                "import time:      1010 |       2040 |   flask",
+                "unrelated output",
+            ]
+        )
+
+        self.assertEqual(
+            [("flask.json", 125, 125), ("flask", 1010, 2040)],
+            parse_importtime(report),
+        )
+
+    def test_brand_store_imports_only_the_store(self):
+        _, imports = start_app("limenet")
+        modules = {module for module, _, _ in imports}
+
+        self.assertIn("webapp.store.views", modules)
+
+        for module in SNAPCRAFT_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_snapcraft_imports_all_blueprints(self):
+        _, imports = start_app("snapcraft")
+        modules = {module for module, _, _ in imports}
+
+        for module in SNAPCRAFT_MODULES:
+            self.assertIn(module, modules)
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+from prometheus_client import REGISTRY
+from webapp.app import create_app
+from webapp.template_cache import compile_templates, init_template_cache
+
+
+class TemplateCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+    def test_no_cache_by_default(self):
+        self.assertIsNone(self.app.jinja_env.bytecode_cache)
+
+    def test_precompile_into_cache(self):
+        self.app.config["TEMPLATE_CACHE_DIR"] = self.cache_dir.name
+        self.app.config["TEMPLATE_PRECOMPILE"] = True
+
+        init_template_cache(self.app)
+
+        count = len(self.app.jinja_env.list_templates())
+        self.assertEqual(count, len(os.listdir(self.cache_dir.name)))
+        self.assertIsNotNone(
+            REGISTRY.get_sample_value("template_compile_seconds")
+        )
+
+    def test_fresh_app_loads_from_cache(self):
+        self.app.config["TEMPLATE_CACHE_DIR"] = self.cache_dir.name
+        init_template_cache(self.app)
+        compile_templates(self.app.jinja_env)
+
+        app = create_app(testing=True)
+        app.config["TEMPLATE_CACHE_DIR"] = self.cache_dir.name
+        init_template_cache(app)
+        bytecode_cache = app.jinja_env.bytecode_cache
+        loaded = []
+        load_bytecode = bytecode_cache.load_bytecode
+
+        def record(bucket):
+            load_bytecode(bucket)
+            loaded.append(bucket.code is not None)
+
+        bytecode_cache.load_bytecode = record
+        app.jinja_env.get_template("404.html")
+
+        self.assertEqual([True], loaded)
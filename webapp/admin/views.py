@@ -1,19 +1,27 @@
 # Packages
+import functools
 import json
 import flask
 from canonicalwebteam.store_api.exceptions import (
     StoreApiError,
     StoreApiResponseErrorList,
 )
-from canonicalwebteam.store_api.stores.snapstore import SnapStoreAdmin
 from webapp.api.exceptions import ApiError
+from webapp.api.publisher import SnapStoreAdmin
+from webapp.api.requests import run_concurrently
+from webapp.cache import create_cache
 from webapp.decorators import login_required
 
 # Local
 from webapp.helpers import api_publisher_session
+from webapp.publisher import account_cache
 from webapp.publisher.views import _handle_error, _handle_error_list
 
+STORE_CACHE_TTL = 300
+STORE_CACHE_SIZE = 256
+
 admin_api = SnapStoreAdmin(api_publisher_session)
+store_cache = create_cache("admin-stores", STORE_CACHE_SIZE)
 
 admin = flask.Blueprint(
     "admin", __name__, template_folder="/templates", static_folder="/static"
@@ -42,13 +50,51 @@ def get_stores():
     )
 
 
+def get_other_store(store_id):
+    """
+    Return the details of a store the snaps of a brand store can come
+    from, cached for the session
+    """
+    if store_id == "ubuntu":
+        return {"id": "ubuntu", "name": "Global store"}
+
+    key = (account_cache.get_session_key(flask.session), store_id)
+    store = store_cache.get(key)
+
+    if store is None:
+        store = admin_api.get_store(flask.session, store_id)
+        store_cache.set(key, store, STORE_CACHE_TTL)
+
+    return store
+
+
+def get_admin_data(store_id):
+    """
+    Return the stores the user is an admin of, and the store with its
+    members and invites, requested concurrently
+    """
+    stores, details = run_concurrently(
+        lambda: admin_api.get_stores(flask.session),
+        lambda: admin_api.get_store_details(flask.session, store_id),
+    )
+
+    return {
+        "stores": stores,
+        "store": details["store"],
+        "members": details.get("users", []),
+        "invites": details.get("invites", []),
+    }
+
+
 @admin.route("/admin/<store_id>/snaps")
 @login_required
 def get_store_snaps(store_id):
     try:
-        stores = admin_api.get_stores(flask.session)
-        store = admin_api.get_store(flask.session, store_id)
-        snaps = admin_api.get_store_snaps(flask.session, store_id)
+        stores, store, snaps = run_concurrently(
+            lambda: admin_api.get_stores(flask.session),
+            lambda: admin_api.get_store(flask.session, store_id),
+            lambda: admin_api.get_store_snaps(flask.session, store_id),
+        )
 
         # list of all deduped store IDs that are not current store
         other_store_ids = list(dict.fromkeys([d["store"] for d in snaps]))
@@ -57,15 +103,12 @@ def get_store_snaps(store_id):
         )
 
         # store data for each store ID
-        other_stores_data = []
-        for other_store_id in other_stores:
-            if other_store_id == "ubuntu":
-                other_stores_data.append(
-                    {"id": "ubuntu", "name": "Global store"}
-                )
-            else:
-                store_data = admin_api.get_store(flask.session, other_store_id)
-                other_stores_data.append(store_data)
+        other_stores_data = run_concurrently(
+            *[
+                functools.partial(get_other_store, other_store_id)
+                for other_store_id in other_stores
+            ]
+        )
 
     except StoreApiResponseErrorList as api_response_error_list:
         return _handle_error_list(api_response_error_list.errors)
@@ -101,19 +144,14 @@ def post_manage_store_snaps(store_id):
     except (StoreApiError, ApiError) as api_error:
         return _handle_error(api_error)
 
-    return flask.redirect(
-        flask.url_for(".get_manage_store_snaps", store_id=store_id)
-    )
+    return flask.redirect(flask.url_for(".get_store_snaps", store_id=store_id))
 
 
 @admin.route("/admin/<store_id>/members")
 @login_required
 def get_manage_members(store_id):
     try:
-        stores = admin_api.get_stores(flask.session)
-        store = admin_api.get_store(flask.session, store_id)
-        members = admin_api.get_store_members(flask.session, store_id)
-        invites = admin_api.get_store_invites(flask.session, store_id)
+        data = get_admin_data(store_id)
     except StoreApiResponseErrorList as api_response_error_list:
         return _handle_error_list(api_response_error_list.errors)
     except (StoreApiError, ApiError) as api_error:
@@ -121,10 +159,10 @@ def get_manage_members(store_id):
 
     return flask.render_template(
         "admin/manage_members.html",
-        stores=stores,
-        store=store,
-        members=members,
-        invites=invites,
+        stores=data["stores"],
+        store=data["store"],
+        members=data["members"],
+        invites=data["invites"],
         confirm_invite=False,
         email_address=None,
         admin=False,
@@ -275,14 +313,16 @@ def post_update_invites(store_id):
 @login_required
 def get_invites(store_id):
     try:
-        stores = admin_api.get_stores(flask.session)
-        store = admin_api.get_store(flask.session, store_id)
-        invites = admin_api.get_store_invites(flask.session, store_id)
+        data = get_admin_data(store_id)
     except StoreApiResponseErrorList as api_response_error_list:
         return _handle_error_list(api_response_error_list.errors)
     except (StoreApiError, ApiError) as api_error:
         return _handle_error(api_error)
 
+    stores = data["stores"]
+    store = data["store"]
+    invites = data["invites"]
+
     pending_invites = []
     expired_invites = []
     revoked_invites = []
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+import prometheus_client
+from pybreaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitBreakerError,
+    CircuitBreakerListener,
+)
+
+BREAKER_STATES = {STATE_CLOSED: 0, STATE_HALF_OPEN: 1, STATE_OPEN: 2}
+
+breaker_state = prometheus_client.Gauge(
+    "api_breaker_state",
+    "State of the circuit breaker of an upstream: "
+    "0 closed, 1 half-open, 2 open",
+    ["upstream"],
+)
+
+breaker_state_changes = prometheus_client.Counter(
+    "api_breaker_state_changes",
+    "A counter of circuit breakers state changes, split by upstream",
+    ["upstream", "state"],
+)
+
+
+class BreakerMetricsListener(CircuitBreakerListener):
+    """Report the circuit breakers state changes to Prometheus"""
+
+    def state_change(self, cb, old_state, new_state):
+        breaker_state.labels(upstream=cb.name).set(
+            BREAKER_STATES[new_state.name]
+        )
+        breaker_state_changes.labels(
+            upstream=cb.name, state=new_state.name
+        ).inc()
+
+
+class UpstreamCircuitBreaker(CircuitBreaker):
+    """
+    A CircuitBreaker that doesn't hold its lock during the guarded call,
+    so the calls to a healthy upstream are not serialised.
+
+    Once the reset timeout elapses, a single trial call is let through
+    while the breaker is half-open. Other calls keep failing until the
+    trial call closes or opens the breaker again.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._probing = False
+
+    def call(self, func, *args, **kwargs):
+        is_probe = False
+
+        with self._lock:
+            if self.current_state == STATE_OPEN:
+                timeout = timedelta(seconds=self.reset_timeout)
+                opened_at = self._state_storage.opened_at
+
+                if opened_at and datetime.utcnow() < opened_at + timeout:
+                    raise CircuitBreakerError(
+                        f"Circuit breaker for {self.name} still open"
+                    )
+
+                self.half_open()
+
+            if self.current_state == STATE_HALF_OPEN:
+                if self._probing:
+                    raise CircuitBreakerError(
+                        f"Trial call to {self.name} already in progress"
+                    )
+
+                self._probing = is_probe = True
+
+            state = self.state
+
+        try:
+            return state.call(func, *args, **kwargs)
+        finally:
+            if is_probe:
+                self._probing = False
+
+    def call_uncounted(self, func, *args, **kwargs):
+        """
+        Call func if the breaker is closed, without counting its result:
+        for the calls which may fail for reasons of their own rather than
+        of the upstream. They are never the trial call of a half-open
+        breaker.
+        """
+        if self.current_state != STATE_CLOSED:
+            raise CircuitBreakerError(f"Circuit breaker for {self.name} open")
+
+        return func(*args, **kwargs)
+
+
+class CircuitBreakers:
+    """
+    Circuit breakers for every upstream, created on first use.
+
+    Upstreams are identified by host, or by host and the first
+    `route_depth` segments of the path.
+    """
+
+    def __init__(self, fail_max=5, reset_timeout=60, route_depth=0):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.route_depth = route_depth
+        self.breakers = {}
+
+    def get_upstream(self, url):
+        parsed_url = urlparse(url)
+        upstream = parsed_url.netloc
+
+        if self.route_depth:
+            segments = [s for s in parsed_url.path.split("/") if s]
+            upstream += "/" + "/".join(segments[: self.route_depth])
+
+        return upstream
+
+    def get(self, url):
+        upstream = self.get_upstream(url)
+        breaker = self.breakers.get(upstream)
+
+        if not breaker:
+            breaker = self.breakers.setdefault(
+                upstream,
+                UpstreamCircuitBreaker(
+                    fail_max=self.fail_max,
+                    reset_timeout=self.reset_timeout,
+                    listeners=[BreakerMetricsListener()],
+                    name=upstream,
+                ),
+            )
+
+        return breaker
@@ -1,8 +1,11 @@
 import hmac
+from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha1
 from os import getenv
 
 from webapp import api
+from webapp.cache import create_cache
 from webapp.helpers import get_yaml_loader
 from werkzeug.exceptions import Unauthorized
 
@@ -22,7 +25,6 @@ class GitHub:
 
     REST_API_URL = "https://api.github.com"
     GRAPHQL_API_URL = "https://api.github.com/graphql"
-    RAW_CONTENT_URL = "https://raw.githubusercontent.com"
 
     YAML_LOCATIONS = [
         "snapcraft.yaml",
@@ -31,6 +33,11 @@ class GitHub:
         "build-aux/snap/snapcraft.yaml",
     ]
 
+    # snapcraft.yaml lookups through the REST API, memoised by
+    # (owner, repo, commit SHA)
+    YAML_CACHE_SIZE = 256
+    _yaml_cache = create_cache("snapcraft-yaml", YAML_CACHE_SIZE)
+
     def __init__(self, access_token=None, session=api.requests.Session()):
         self.access_token = access_token
         self.session = session
@@ -63,7 +70,7 @@ class GitHub:
 
         return response
 
-    def _gql_request(self, query={}):
+    def _gql_request(self, query={}, variables=None):
         """
         Makes a raw HTTP request and returns the response.
         """
@@ -72,10 +79,15 @@ class GitHub:
         else:
             headers = {}
 
+        payload = {"query": query}
+
+        if variables:
+            payload["variables"] = variables
+
         response = self.session.request(
             "POST",
             self.GRAPHQL_API_URL,
-            json={"query": query},
+            json=payload,
             headers=headers,
         )
 
@@ -107,62 +119,39 @@ class GitHub:
 
         return self._gql_request(gql)["viewer"]
 
-    def get_orgs(self, end_cursor=None):
+    def _get_pages(self, gql, path, variables={}, end_cursor=None):
         """
-        Lists of organizations that the authenticated user has explicit
-        permission to access.
-        """
-        gql = (
-            """
-            {
-              viewer {
-                organizations(first: 100,"""
-            + (f'after: "{end_cursor}"' if end_cursor else "")
-            + """) {
-                  edges {
-                    node {
-                      login
-                      name
-                    }
-                  }
-                  pageInfo {
-                    hasNextPage
-                    endCursor
-                  }
-                }
-              }
-            }
+        GraphQL: Yield the list of nodes of each page of a connection,
+        following the cursor until the last page
         """
-        )
+        variables = dict(variables, after=end_cursor)
 
-        gql_response = self._gql_request(gql)["viewer"]["organizations"]
-        page_info = gql_response["pageInfo"]
-        orgs = self._get_nodes(gql_response["edges"])
+        while True:
+            connection = self._gql_request(gql, variables)
+            for key in path:
+                connection = connection[key]
 
-        if page_info["hasNextPage"]:
-            next_page = self.get_orgs(page_info["endCursor"])
-            orgs.extend(next_page)
+            yield self._get_nodes(connection["edges"])
 
-        return orgs
+            page_info = connection["pageInfo"]
+            if not page_info["hasNextPage"]:
+                break
 
-    def get_user_repositories(self, end_cursor=None):
+            variables["after"] = page_info["endCursor"]
+
+    def iter_orgs(self, end_cursor=None):
         """
-        Lists of public repositories from the authenticated user
+        Yield pages of the organizations that the authenticated user has
+        explicit permission to access.
         """
-        gql = (
-            """{
-              viewer {
-                repositories(
-                    first: 100,
-                    privacy: PUBLIC,
-                """
-            + (f'after: "{end_cursor}"' if end_cursor else "")
-            + """
-                ) {
+        gql = """
+        query($after: String) {
+          viewer {
+            organizations(first: 100, after: $after) {
               edges {
                 node {
+                  login
                   name
-                  nameWithOwner
                 }
               }
               pageInfo {
@@ -171,40 +160,71 @@ class GitHub:
               }
             }
           }
-        }"""
-        )
-
-        gql_response = self._gql_request(gql)["viewer"]["repositories"]
-        page_info = gql_response["pageInfo"]
-        repositories = self._get_nodes(gql_response["edges"])
+        }
+        """
 
-        if page_info["hasNextPage"]:
-            next_page = self.get_user_repositories(page_info["endCursor"])
-            repositories.extend(next_page)
+        return self._get_pages(
+            gql, ["viewer", "organizations"], end_cursor=end_cursor
+        )
 
-        return repositories
+    def get_orgs(self, end_cursor=None):
+        """
+        Lists of organizations that the authenticated user has explicit
+        permission to access.
+        """
+        return [org for page in self.iter_orgs(end_cursor) for org in page]
 
-    def get_org_repositories(self, org_login, end_cursor=None):
+    def iter_user_repositories(self, end_cursor=None):
         """
-        Lists of public repositories from the authenticated user
+        Yield pages of public repositories from the authenticated user
         """
-        gql = (
-            """{
-              viewer {
-              organization(login: \""""
-            + org_login
-            + """") {
-                    repositories(
-                        first: 100,
-                        privacy: PUBLIC
-                    """
-            + (f'after: "{end_cursor}"' if end_cursor else "")
-            + """
-                ) {
+        gql = """
+        query($after: String) {
+          viewer {
+            repositories(first: 100, privacy: PUBLIC, after: $after) {
               edges {
                 node {
                   name
+                  nameWithOwner
                 }
+              }
+              pageInfo {
+                hasNextPage
+                endCursor
+              }
+            }
+          }
+        }
+        """
+
+        return self._get_pages(
+            gql, ["viewer", "repositories"], end_cursor=end_cursor
+        )
+
+    def get_user_repositories(self, end_cursor=None):
+        """
+        Lists of public repositories from the authenticated user
+        """
+        return [
+            repo
+            for page in self.iter_user_repositories(end_cursor)
+            for repo in page
+        ]
+
+    def iter_org_repositories(self, org_login, end_cursor=None):
+        """
+        Yield pages of public repositories from an organization of the
+        authenticated user
+        """
+        gql = """
+        query($login: String!, $after: String) {
+          viewer {
+            organization(login: $login) {
+              repositories(first: 100, privacy: PUBLIC, after: $after) {
+                edges {
+                  node {
+                    name
+                  }
                 }
                 pageInfo {
                   hasNextPage
@@ -213,22 +233,26 @@ class GitHub:
               }
             }
           }
-        }"""
-        )
-        response = self._gql_request(gql)["viewer"]["organization"][
-            "repositories"
-        ]
-
-        page_info = response["pageInfo"]
-        repositories = self._get_nodes(response["edges"])
+        }
+        """
 
-        if page_info["hasNextPage"]:
-            next_page = self.get_org_repositories(
-                org_login, page_info["endCursor"]
-            )
-            repositories.extend(next_page)
+        return self._get_pages(
+            gql,
+            ["viewer", "organization", "repositories"],
+            {"login": org_login},
+            end_cursor,
+        )
 
-        return repositories
+    def get_org_repositories(self, org_login, end_cursor=None):
+        """
+        Lists of public repositories from an organization of the
+        authenticated user
+        """
+        return [
+            repo
+            for page in self.iter_org_repositories(org_login, end_cursor)
+            for repo in page
+        ]
 
     def check_permissions_over_repo(self, owner, repo, permission="push"):
         """
@@ -261,65 +285,134 @@ class GitHub:
         elif response.status_code == 200:
             return True
 
-    def get_snapcraft_yaml_location(self, owner, repo):
+    def _get_cached_snapcraft_yaml(self, owner, repo, sha):
+        return self._yaml_cache.get((owner.lower(), repo.lower(), sha))
+
+    def _set_cached_snapcraft_yaml(self, owner, repo, sha, location, text):
+        self._yaml_cache.set(
+            (owner.lower(), repo.lower(), sha), (location, text)
+        )
+
+        return location, text
+
+    def _gql_get_snapcraft_yaml(self, owner, repo):
+        """
+        GraphQL: Return the location and the raw content of the
+        snapcraft.yaml in the head of the default branch in one round trip
         """
-        Return the snapcraft.yaml file location in the GitHub repo
+        files = "".join(
+            f"""
+                file{i}: object(expression: "HEAD:{loc}") {{
+                  ... on Blob {{
+                    text
+                  }}
+                }}"""
+            for i, loc in enumerate(self.YAML_LOCATIONS)
+        )
+
+        gql = (
+            """
+            query($owner: String!, $repo: String!) {
+              repository(owner: $owner, name: $repo) {
+                defaultBranchRef {
+                  target {
+                    oid
+                  }
+                }"""
+            + files
+            + """
+              }
+            }
         """
+        )
 
-        # It is not possible to use GraphQL without authentication
-        # for that reason we are doing a call for each location to the REST API
-        for loc in self.YAML_LOCATIONS:
-            response = self._request(
+        variables = {"owner": owner, "repo": repo}
+        repository = self._gql_request(gql, variables)["repository"]
+
+        if not repository or not repository["defaultBranchRef"]:
+            return False, None
+
+        for i, loc in enumerate(self.YAML_LOCATIONS):
+            blob = repository[f"file{i}"]
+
+            if blob and blob.get("text") is not None:
+                return loc, blob["text"]
+
+        return False, None
+
+    def _rest_get_snapcraft_yaml(self, owner, repo):
+        """
+        REST: Return the location and the raw content of the
+        snapcraft.yaml in the head of the default branch, probing all the
+        locations concurrently. The content is memoised by commit, so
+        only the head of the branch is requested again when it hasn't
+        changed.
+        """
+        response = self._request(
+            "GET", f"repos/{owner}/{repo}/commits/HEAD", raise_exceptions=False
+        )
+
+        if response.status_code in [404, 409]:
+            # Unknown or empty repository
+            return False, None
+
+        response.raise_for_status()
+        sha = response.json()["sha"]
+
+        cached = self._get_cached_snapcraft_yaml(owner, repo, sha)
+
+        if cached:
+            return cached
+
+        def probe(loc):
+            return self._request(
                 "GET",
                 f"repos/{owner}/{repo}/contents/{loc}",
+                params={"ref": sha},
                 raise_exceptions=False,
             )
+
+        with ThreadPoolExecutor(len(self.YAML_LOCATIONS)) as executor:
+            probes = list(executor.map(probe, self.YAML_LOCATIONS))
+
+        for loc, response in zip(self.YAML_LOCATIONS, probes):
             if response.status_code == 404:
                 continue
-            elif response.status_code == 200:
-                return loc
 
             response.raise_for_status()
+            text = b64decode(response.json()["content"]).decode("utf-8")
 
-        return False
+            return self._set_cached_snapcraft_yaml(owner, repo, sha, loc, text)
 
-    def get_default_branch(self, owner, repo):
-        response = self._request("GET", f"repos/{owner}/{repo}")
-        return response.json()["default_branch"]
-
-    def get_last_commit(self, owner, repo, branch=None):
-        if not branch:
-            branch = self.get_default_branch(owner, repo)
-
-        response = self._request(
-            "GET", f"repos/{owner}/{repo}/commits/{branch}"
-        )
-        return response.json()["sha"]
+        return self._set_cached_snapcraft_yaml(owner, repo, sha, False, None)
 
-    def get_snapcraft_yaml_name(self, owner, repo):
+    def get_snapcraft_yaml(self, owner, repo):
         """
-        Return True if the name inside the yaml file match with the snap
-        """
-        loc = self.get_snapcraft_yaml_location(owner, repo)
+        Return the location and the parsed content of the snapcraft.yaml
+        from the last commit of the default branch.
 
-        if loc:
-            # Get last commit to avoid cache issues with raw.github.com
-            last_commit = self.get_last_commit(owner, repo)
+        The location and the content are False when the repo doesn't
+        contain a snapcraft.yaml. Raise InvalidYAML if it can't be parsed.
+        """
+        # It is not possible to use GraphQL without authentication
+        if self.access_token:
+            location, text = self._gql_get_snapcraft_yaml(owner, repo)
+        else:
+            location, text = self._rest_get_snapcraft_yaml(owner, repo)
 
-            response = self.session.request(
-                "GET",
-                f"{self.RAW_CONTENT_URL}/{owner}/{repo}/{last_commit}/{loc}",
-            )
+        if not location:
+            return {"location": False, "content": False}
 
-            yaml = get_yaml_loader()
-            try:
-                content = yaml.load(response.content)
-            except Exception:
-                raise InvalidYAML
+        yaml = get_yaml_loader()
+        try:
+            content = yaml.load(text)
+        except Exception:
+            raise InvalidYAML
 
-            return content.get("name")
+        if not isinstance(content, dict):
+            raise InvalidYAML
 
-        return False
+        return {"location": location, "content": content}
 
     def generate_webhook_secret_for_repo(self, owner, name):
         key = bytes(GITHUB_WEBHOOK_SECRET, "UTF-8")
@@ -357,15 +450,20 @@ class GitHub:
         """
         Return all the webhooks in the repo
         """
-        response = self._request(
-            "GET",
-            f"repos/{owner}/{repo}/hooks",
-            params={"per_page": 100, "page": page},
-        )
-        hooks = response.json()
+        hooks = []
+
+        while True:
+            response = self._request(
+                "GET",
+                f"repos/{owner}/{repo}/hooks",
+                params={"per_page": 100, "page": page},
+            )
+            hooks.extend(response.json())
+
+            if "next" not in response.links:
+                break
 
-        if "next" in response.links:
-            hooks.extend(self.get_hooks(page=page + 1))
+            page += 1
 
         return hooks
 
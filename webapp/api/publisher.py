@@ -0,0 +1,40 @@
+"""
+The store publisher API clients, binding the macaroons of the session
+through webapp.authentication, which keeps the bound headers.
+"""
+
+from canonicalwebteam.store_api.stores import snapstore
+from webapp import authentication
+
+
+class AuthorizationHeaderMixin:
+    def _get_authorization_header(self, session):
+        if "macaroon_root" in session:
+            return {
+                "Authorization": authentication.get_authorization_header(
+                    session["macaroon_root"], session["macaroon_discharge"]
+                )
+            }
+
+        return super()._get_authorization_header(session)
+
+
+class SnapPublisher(AuthorizationHeaderMixin, snapstore.SnapPublisher):
+    pass
+
+
+class SnapStoreAdmin(AuthorizationHeaderMixin, snapstore.SnapStoreAdmin):
+    def get_store_details(self, session, store_id):
+        """
+        Return the details of a store, with its members and invites, which
+        get_store, get_store_members and get_store_invites each request
+
+        :return: A dictionary with the "store", "users" and "invites"
+        """
+        headers = self._get_authorization_header(session)
+
+        response = self.session.get(
+            url=self.get_endpoint_url(store_id), headers=headers
+        )
+
+        return self.process_response(response)
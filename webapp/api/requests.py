@@ -1,8 +1,18 @@
 import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
+import flask
+import prometheus_client
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
-from pybreaker import CircuitBreaker, CircuitBreakerError
+from pybreaker import CircuitBreakerError
+from webapp.api.breakers import CircuitBreakers
 from webapp.api.exceptions import (
     ApiCircuitBreaker,
     ApiConnectionError,
@@ -10,15 +20,296 @@ from webapp.api.exceptions import (
 )
 
 
+# Connection pools configuration, sizes are per host
+# API_POOL_SIZES overrides the size for some hosts: "host=size,host=size"
+POOL_MAXSIZE = int(os.getenv("API_POOL_MAXSIZE", 10))
+POOL_BLOCK = os.getenv("API_POOL_BLOCK", "false").lower() in ["1", "true"]
+POOL_SIZES = {
+    host.strip(): int(size)
+    for host, size in (
+        item.split("=")
+        for item in os.getenv("API_POOL_SIZES", "").split(",")
+        if item.strip()
+    )
+}
+
+# Threads of a run_concurrently call, bound by the smallest pool so the
+# calls never wait for a connection of their host
+CONCURRENT_CALLS = min([POOL_MAXSIZE, *POOL_SIZES.values()])
+
+pool_checkout_wait = prometheus_client.Histogram(
+    "api_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool, split by host",
+    ["host"],
+)
+
+pool_connections_created = prometheus_client.Counter(
+    "api_pool_connections_created",
+    "A counter of new connections opened by the pools, split by host",
+    ["host"],
+)
+
+pool_reuse_ratio = prometheus_client.Gauge(
+    "api_pool_reuse_ratio",
+    "Ratio of pool checkouts reusing an existing connection, split by host",
+    ["host"],
+)
+
+deadline_exceeded = prometheus_client.Counter(
+    "api_deadline_exceeded",
+    "A counter of upstream requests failed because the deadline of the "
+    "request was exceeded, split by route",
+    ["route"],
+)
+
+upstream_request_duration = prometheus_client.Histogram(
+    "api_upstream_request_duration_seconds",
+    "Duration of the upstream requests, split by host, path template, "
+    "status class and circuit breaker state",
+    ["host", "path", "status", "breaker"],
+)
+
+# Templates for the upstream paths with variable segments, to keep the
+# metrics labels bounded. Other paths only keep their first segment.
+PATH_TEMPLATES = [
+    (re.compile(r"^/v2/snaps/info/[^/]+"), "/v2/snaps/info/{snap}"),
+    (re.compile(r"^/(api/v1|v2)/snaps/([a-z-]+)/?$"), r"/\1/snaps/\2"),
+    (
+        re.compile(r"^/api/v1/snaps/details/[^/]+"),
+        "/api/v1/snaps/details/{snap}",
+    ),
+    (re.compile(r"^/dev/api/snaps/info/[^/]+"), "/dev/api/snaps/info/{snap}"),
+    (
+        re.compile(r"^/dev/api/snaps/[^/]+/([a-z-]+)"),
+        r"/dev/api/snaps/{snap_id}/\1",
+    ),
+    (re.compile(r"^/dev/api/([a-z-]+)/?$"), r"/dev/api/\1"),
+    (
+        re.compile(r"^/api/v2/snaps/[^/]+/([a-z-]+)"),
+        r"/api/v2/snaps/{snap}/\1",
+    ),
+    (
+        re.compile(r"^/api/v2/stores/[^/]+/([a-z]+)"),
+        r"/api/v2/stores/{store}/\1",
+    ),
+    (re.compile(r"^/api/v2/stores/[^/]+/?$"), "/api/v2/stores/{store}"),
+    (re.compile(r"^/api/v2/tokens(/whoami)?"), r"/api/v2/tokens\1"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/([a-z]+)"), r"/repos/{owner}/{repo}/\1"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/?$"), "/repos/{owner}/{repo}"),
+]
+
+
+def get_path_template(path):
+    for regex, template in PATH_TEMPLATES:
+        match = regex.match(path)
+
+        if match:
+            return match.expand(template)
+
+    segments = [s for s in path.split("/") if s]
+
+    return "/" + segments[0] if segments else "/"
+
+
+def _observe_upstream_request(url, status, breaker_state, duration):
+    parsed_url = urlparse(url)
+
+    upstream_request_duration.labels(
+        host=parsed_url.netloc,
+        path=get_path_template(parsed_url.path),
+        status=status,
+        breaker=breaker_state,
+    ).observe(duration)
+
+    # Total time of the upstream requests of the current request
+    if flask.has_app_context():
+        timings = flask.g.setdefault("upstream_timings", defaultdict(float))
+        timings[parsed_url.netloc] += duration
+
+
+def get_server_timing(by_host=False):
+    """
+    Return the Server-Timing header value with the time spent in the
+    current request and in its upstream requests, in total, and by host
+    if by_host is set: the hosts are internal, only for debugging
+    """
+    timings = flask.g.get("upstream_timings", {})
+    total = sum(timings.values())
+
+    metrics = [f"upstream;dur={total * 1000:.1f}"]
+
+    if "request_start" in flask.g:
+        app_duration = time.perf_counter() - flask.g.request_start
+        metrics.insert(0, f"app;dur={app_duration * 1000:.1f}")
+
+    if by_host:
+        metrics.extend(
+            f'upstream-{i};dur={duration * 1000:.1f};desc="{host}"'
+            for i, (host, duration) in enumerate(timings.items())
+        )
+
+    return ", ".join(metrics)
+
+
+# Checkouts and new connections per host, to compute the reuse ratio
+_pool_usage = defaultdict(lambda: {"checkouts": 0, "created": 0})
+
+
+class InstrumentedPoolMixin:
+    """Report pool checkout waits and connection reuse to Prometheus"""
+
+    def _new_conn(self):
+        _pool_usage[self.host]["created"] += 1
+        pool_connections_created.labels(host=self.host).inc()
+
+        return super()._new_conn()
+
+    def _get_conn(self, timeout=None):
+        start = time.perf_counter()
+        conn = super()._get_conn(timeout=timeout)
+        pool_checkout_wait.labels(host=self.host).observe(
+            time.perf_counter() - start
+        )
+
+        usage = _pool_usage[self.host]
+        usage["checkouts"] += 1
+        pool_reuse_ratio.labels(host=self.host).set(
+            max(usage["checkouts"] - usage["created"], 0) / usage["checkouts"]
+        )
+
+        return conn
+
+
+class InstrumentedHTTPConnectionPool(
+    InstrumentedPoolMixin, HTTPConnectionPool
+):
+    pass
+
+
+class InstrumentedHTTPSConnectionPool(
+    InstrumentedPoolMixin, HTTPSConnectionPool
+):
+    pass
+
+
+class InstrumentedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter using the instrumented connection pools"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": InstrumentedHTTPConnectionPool,
+            "https": InstrumentedHTTPSConnectionPool,
+        }
+
+
+def set_deadline(seconds):
+    """
+    Set the time budget for all the upstream requests of the current
+    request. None removes the deadline.
+    """
+    if seconds is None:
+        flask.g.pop("api_deadline", None)
+    else:
+        flask.g.api_deadline = time.monotonic() + seconds
+
+
+def get_remaining_time():
+    """
+    Return the seconds left before the deadline of the current request,
+    or None if there is no deadline
+    """
+    if not flask.has_app_context() or "api_deadline" not in flask.g:
+        return None
+
+    return flask.g.api_deadline - time.monotonic()
+
+
+def run_concurrently(*functions):
+    """
+    Call functions concurrently, each in a thread with the request of the
+    current request and a new app context holding only its deadline and
+    upstream timings, at most CONCURRENT_CALLS at a time. Return their
+    results in order, or raise the exception of the first one failing.
+    """
+    if not functions:
+        return []
+
+    flask.g.setdefault("upstream_timings", defaultdict(float))
+    shared = {
+        key: flask.g.get(key)
+        for key in ["api_deadline", "upstream_timings"]
+        if key in flask.g
+    }
+    app = flask.current_app._get_current_object()
+    request_context = flask._request_ctx_stack.top
+
+    def call(function):
+        app_context = app.app_context()
+
+        for key, value in shared.items():
+            setattr(app_context.g, key, value)
+
+        # The contexts are put on the stacks directly: pushing and popping
+        # them would run the teardown handlers once more per thread
+        flask._app_ctx_stack.push(app_context)
+        flask._request_ctx_stack.push(request_context.copy())
+
+        try:
+            return function()
+        finally:
+            flask._request_ctx_stack.pop()
+            flask._app_ctx_stack.pop()
+
+    with ThreadPoolExecutor(min(len(functions), CONCURRENT_CALLS)) as executor:
+        futures = [executor.submit(call, function) for function in functions]
+
+        return [future.result() for future in futures]
+
+
+def _count_deadline_exceeded():
+    route = "unknown"
+
+    if flask.has_request_context() and flask.request.url_rule:
+        route = flask.request.url_rule.rule
+
+    deadline_exceeded.labels(route=route).inc()
+
+
+def _get_timeout(timeout, remaining):
+    """
+    Cap the timeout, or each of the (connect, read) timeouts, to the
+    remaining time
+    """
+    if isinstance(timeout, tuple):
+        return tuple(_get_timeout(t, remaining) for t in timeout)
+
+    if timeout is None:
+        return remaining
+
+    return min(timeout, remaining)
+
+
 class BaseSession:
     """A base session interface to implement common functionality
 
     Create an interface to manage exceptions and return API exceptions
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(
+        self,
+        *args,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=POOL_BLOCK,
+        pool_sizes=POOL_SIZES,
+        breaker_route_depth=0,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
 
+        self.mount_pools(pool_maxsize, pool_block, pool_sizes)
+
         # TODO allow user to choose it's own user agent
         storefront_header = "storefront ({commit_hash};{environment})".format(
             commit_hash=os.getenv("COMMIT_ID", "commit_id"),
@@ -27,18 +318,71 @@ class BaseSession:
 
         headers = {"User-Agent": storefront_header}
         self.headers.update(headers)
-        self.api_breaker = CircuitBreaker(fail_max=5, reset_timeout=60)
+        # One circuit breaker per upstream, so a failing upstream doesn't
+        # close the requests to the other ones
+        self.api_breakers = CircuitBreakers(
+            fail_max=5, reset_timeout=60, route_depth=breaker_route_depth
+        )
+
+    def mount_pools(self, pool_maxsize, pool_block, pool_sizes):
+        """
+        Mount an adapter with its own connection pools for every host with
+        a specific pool size, and a default one for the rest of the hosts
+        """
+        for prefix in ["http://", "https://"]:
+            self.mount(
+                prefix,
+                InstrumentedHTTPAdapter(
+                    pool_maxsize=pool_maxsize, pool_block=pool_block
+                ),
+            )
+
+            for host, size in pool_sizes.items():
+                self.mount(
+                    f"{prefix}{host}/",
+                    InstrumentedHTTPAdapter(
+                        pool_maxsize=size, pool_block=pool_block
+                    ),
+                )
 
     def request(self, method, url, timeout=12, **kwargs):
+        remaining = get_remaining_time()
+        deadline_bound = False
+
+        if remaining is not None:
+            if remaining <= 0:
+                _count_deadline_exceeded()
+                raise ApiTimeoutError(
+                    "The request deadline was exceeded before "
+                    "requesting {}".format(url)
+                )
+
+            capped_timeout = _get_timeout(timeout, remaining)
+            deadline_bound = capped_timeout != timeout
+            timeout = capped_timeout
+
+        breaker = self.api_breakers.get(url)
+        status = "error"
+        start = time.perf_counter()
+
+        # A timeout shortened by the deadline says nothing about the
+        # health of the upstream, it must not count towards opening the
+        # breaker for all the requests
+        call = breaker.call_uncounted if deadline_bound else breaker.call
+
         try:
-            request = self.api_breaker.call(
+            request = call(
                 super().request,
                 method=method,
                 url=url,
                 timeout=timeout,
-                **kwargs
+                **kwargs,
             )
+            status = f"{request.status_code // 100}xx"
         except requests.exceptions.Timeout:
+            if deadline_bound:
+                _count_deadline_exceeded()
+
             raise ApiTimeoutError(
                 "The request to {} took too long".format(url)
             )
@@ -52,6 +396,10 @@ class BaseSession:
                     url
                 )
             )
+        finally:
+            _observe_upstream_request(
+                url, status, breaker.current_state, time.perf_counter() - start
+            )
 
         return request
 
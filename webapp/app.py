@@ -5,24 +5,19 @@ The web frontend for the snap store.
 """
 
 import talisker.requests
-import webapp.api
+import webapp.api.sso
 from canonicalwebteam.flask_base.app import FlaskBase
-from webapp.blog.views import init_blog
-from webapp.docs.views import init_docs
+from webapp.authentication import init_discharge_refresh
+from webapp.compression import init_compression
 from webapp.extensions import csrf
-from webapp.first_snap.views import first_snap
-from webapp.first_snap.views_2 import first_snap_2
-from webapp.first_snap.views_3 import first_snap_3
+from webapp.fragment_cache import init_fragment_cache
 from webapp.handlers import set_handlers
-from webapp.login.views import login
-from webapp.login.oauth_views import oauth
-from webapp.publisher.snaps.views import publisher_snaps
-from webapp.publisher.github.views import publisher_github
-from webapp.admin.views import admin
-from webapp.publisher.views import account
-from webapp.snapcraft.views import snapcraft_blueprint
+from webapp.preload import init_preload
+from webapp.response_cache import init_response_cache
+from webapp.sessions import init_sessions
+from webapp.stale_pages import init_stale_pages
 from webapp.store.views import store_blueprint
-from webapp.tutorials.views import init_tutorials
+from webapp.template_cache import init_template_cache
 
 
 def create_app(testing=False):
@@ -44,13 +39,23 @@ def create_app(testing=False):
         talisker.requests.configure(webapp.helpers.api_publisher_session)
 
     app.config.from_object("webapp.configs." + app.config["WEBAPP"])
+    init_sessions(app)
+    init_compression(app)
     set_handlers(app)
 
+    if not testing:
+        init_response_cache(app)
+        init_stale_pages(app)
+
     if app.config["WEBAPP"] == "snapcraft":
         init_snapcraft(app)
     else:
         init_brandstore(app)
 
+    init_fragment_cache(app)
+    init_template_cache(app)
+    init_preload(app)
+
     return app
 
 
@@ -60,6 +65,21 @@ def init_brandstore(app):
 
 
 def init_snapcraft(app):
+    # Only snapcraft.io serves these, brand stores don't import them
+    from webapp.admin.views import admin
+    from webapp.blog.views import init_blog
+    from webapp.docs.views import init_docs
+    from webapp.first_snap.views import first_snap
+    from webapp.first_snap.views_2 import first_snap_2
+    from webapp.first_snap.views_3 import first_snap_3
+    from webapp.login.oauth_views import oauth
+    from webapp.login.views import login
+    from webapp.publisher.github.views import publisher_github
+    from webapp.publisher.snaps.views import publisher_snaps
+    from webapp.publisher.views import account
+    from webapp.snapcraft.views import snapcraft_blueprint
+    from webapp.tutorials.views import init_tutorials
+
     app.register_blueprint(snapcraft_blueprint())
     app.register_blueprint(first_snap, url_prefix="/first-snap")
     app.register_blueprint(first_snap_2, url_prefix="/first-snap-2")
@@ -74,6 +94,7 @@ def init_snapcraft(app):
     init_docs(app, "/docs")
     init_blog(app, "/blog")
     init_tutorials(app, "/tutorials")
+    init_discharge_refresh(app)
 
 
 def init_extensions(app):
@@ -1,11 +1,44 @@
+import functools
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone
 from urllib.parse import urlparse
 
+import flask
+import prometheus_client
+from dateutil import parser
 from pymacaroons import Macaroon
 from webapp.api import sso
+from webapp.cache import LRUCache, create_cache
 
 LOGIN_URL = os.getenv("LOGIN_URL", "https://login.ubuntu.com")
 
+# Discharges expiring in less than this number of seconds are refreshed
+# in the background
+DISCHARGE_REFRESH_WINDOW = 10 * 60
+
+# Time to live of the authorization headers of discharges without expiry
+AUTHORIZATION_HEADER_TTL = 60 * 60
+
+discharge_refresh_counter = prometheus_client.Counter(
+    "discharge_refresh_counter",
+    "A counter of background refreshes of discharge macaroons",
+    ["result"],
+)
+
+# Bound headers stay in the memory of the worker, they are cheaper to
+# compute again than to fetch from a shared cache
+authorization_headers = LRUCache(1024)
+
+# Refreshed discharges, keyed on the discharge they replace, until the
+# next request of the session picks them up
+refreshed_discharges = create_cache("refreshed-discharges", 256)
+refresh_executor = ThreadPoolExecutor(max_workers=4)
+refreshing = set()
+refreshing_lock = threading.Lock()
+
 PERMISSIONS = [
     "edit_account",
     "package_access",
@@ -18,16 +51,65 @@ PERMISSIONS = [
 ]
 
 
+@functools.lru_cache(maxsize=1024)
+def get_discharge_expiry(discharge):
+    """
+    Return the timestamp a discharge macaroon expires at, from its
+    "expires" or "time-before" caveats, or None
+    """
+    try:
+        caveats = Macaroon.deserialize(discharge).first_party_caveats()
+    except Exception:
+        return None
+
+    expiries = []
+
+    for caveat in caveats:
+        caveat_id = caveat.caveat_id
+
+        if caveat_id.startswith("time-before "):
+            expiry = caveat_id.partition(" ")[2]
+        elif caveat_id.count("|") == 2 and "|expires|" in caveat_id:
+            expiry = caveat_id.split("|")[2]
+        else:
+            continue
+
+        try:
+            expires = parser.isoparse(expiry)
+        except ValueError:
+            continue
+
+        if not expires.tzinfo:
+            expires = expires.replace(tzinfo=timezone.utc)
+
+        expiries.append(expires.timestamp())
+
+    return min(expiries, default=None)
+
+
 def get_authorization_header(root, discharge):
     """
     Bind root and discharge macaroons and return the authorization header.
+    Headers are kept until the discharge expires.
     """
+    key = (root, discharge)
+    header = authorization_headers.get(key)
+
+    if header is None:
+        bound = Macaroon.deserialize(root).prepare_for_request(
+            Macaroon.deserialize(discharge)
+        )
+        header = "Macaroon root={}, discharge={}".format(
+            root, bound.serialize()
+        )
+
+        expires = get_discharge_expiry(discharge)
+        ttl = expires - time.time() if expires else AUTHORIZATION_HEADER_TTL
 
-    bound = Macaroon.deserialize(root).prepare_for_request(
-        Macaroon.deserialize(discharge)
-    )
+        if ttl > 0:
+            authorization_headers.set(key, header, ttl)
 
-    return "Macaroon root={}, discharge={}".format(root, bound.serialize())
+    return header
 
 
 def is_authenticated(session):
@@ -94,3 +176,59 @@ def is_macaroon_expired(headers):
     the header response.
     """
     return headers.get("WWW-Authenticate") == ("Macaroon needs_refresh=1")
+
+
+def _refresh_discharge(discharge):
+    try:
+        refreshed_discharges.set(
+            discharge,
+            get_refreshed_discharge(discharge),
+            DISCHARGE_REFRESH_WINDOW,
+        )
+        discharge_refresh_counter.labels(result="success").inc()
+    except Exception:
+        discharge_refresh_counter.labels(result="error").inc()
+    finally:
+        with refreshing_lock:
+            refreshing.discard(discharge)
+
+
+def schedule_discharge_refresh(discharge):
+    """
+    Refresh a discharge in the background, unless it is already being
+    refreshed by this process
+    """
+    with refreshing_lock:
+        if discharge in refreshing:
+            return
+
+        refreshing.add(discharge)
+
+    refresh_executor.submit(_refresh_discharge, discharge)
+
+
+def init_discharge_refresh(app):
+    """
+    Refresh the discharge of the sessions before it expires, instead of
+    waiting for the store to answer that it needs a refresh. The
+    refreshed discharge replaces the one of the session on its next
+    request.
+    """
+
+    @app.before_request
+    def refresh_discharge():
+        discharge = flask.session.get("macaroon_discharge")
+
+        if not discharge:
+            return
+
+        refreshed = refreshed_discharges.get(discharge)
+
+        if refreshed:
+            flask.session["macaroon_discharge"] = refreshed
+            return
+
+        expires = get_discharge_expiry(discharge)
+
+        if expires and expires - time.time() < DISCHARGE_REFRESH_WINDOW:
+            schedule_discharge_refresh(discharge)
@@ -0,0 +1,485 @@
+"""
+Cache backends used by all the caching layers of the webapp.
+
+All the backends have the same interface:
+
+- get(key): the value, or None if it is missing or expired
+- set(key, value, ttl=None): store a value, for ttl seconds if given
+- delete(key)
+- clear()
+
+Three backends are available, picked with the CACHE_BACKEND environment
+variable:
+
+- memory: an LRU in the memory of every worker
+- shared: files in a shared memory directory, shared by all the
+  workers of a host and surviving their recycling
+- redis: a Redis server, or anything speaking its protocol, shared by
+  all the hosts
+
+Values stored in the shared and redis backends are pickled. The shared
+directory is local to the host and only writable by the webapp, the
+values stored in Redis are signed with CACHE_SECRET_KEY, or SECRET_KEY,
+and only unpickled when their signature matches.
+"""
+
+import copy
+import hashlib
+import hmac
+import json
+import os
+import pickle
+import socket
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+
+import prometheus_client
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_SHARED_DIR = os.getenv("CACHE_SHARED_DIR", "/dev/shm/snapcraft")
+CACHE_SHARED_MAX_SIZE = int(
+    os.getenv("CACHE_SHARED_MAX_SIZE", 32 * 1024 * 1024)
+)
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+# Signs the values stored in Redis, shared by all the hosts
+CACHE_SECRET_KEY = os.getenv("CACHE_SECRET_KEY", os.getenv("SECRET_KEY", ""))
+
+SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+cache_errors = prometheus_client.Counter(
+    "cache_errors",
+    "A counter of cache backend errors, split by backend",
+    ["backend"],
+)
+
+
+def sign(data):
+    return hmac.new(
+        CACHE_SECRET_KEY.encode("utf-8"), data, hashlib.sha256
+    ).digest()
+
+
+def serialise_key(key):
+    """
+    Return a string key of bounded length for any JSON serialisable key
+    """
+    if not isinstance(key, str):
+        key = json.dumps(key, sort_keys=True, default=str)
+
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    A bounded in-process store of values with a time to live,
+    evicting the least recently used values first
+
+    Values are copied when stored and returned, like the other backends
+    return a new value on every get, so callers changing a value don't
+    change the cached one
+    """
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.values = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.values.get(key)
+
+            if not item:
+                return None
+
+            expires, value = item
+
+            if expires and expires < time.monotonic():
+                del self.values[key]
+                return None
+
+            self.values.move_to_end(key)
+
+        return copy.deepcopy(value)
+
+    def set(self, key, value, ttl=None):
+        value = copy.deepcopy(value)
+
+        with self.lock:
+            expires = time.monotonic() + ttl if ttl else None
+            self.values[key] = (expires, value)
+            self.values.move_to_end(key)
+
+            while len(self.values) > self.maxsize:
+                self.values.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.values.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+
+
+class FileCache:
+    """
+    Values stored in a directory, one file per key, shared by all the
+    processes using the same directory. In a shared memory directory
+    like /dev/shm, the files are kept in memory.
+
+    Once the directory grows larger than max_size bytes, the oldest
+    values are removed.
+    """
+
+    # Expiry timestamp of the value, 0 when it doesn't expire
+    HEADER = struct.Struct("d")
+
+    # Number of values written by a process between two checks of the
+    # size of the directory
+    PRUNE_INTERVAL = 100
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        self.writes = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, key):
+        return os.path.join(self.directory, serialise_key(key))
+
+    def get(self, key):
+        path = self.get_path(key)
+
+        try:
+            with open(path, "rb") as value_file:
+                data = value_file.read()
+        except FileNotFoundError:
+            return None
+
+        header_size = self.HEADER.size
+
+        try:
+            (expires,) = self.HEADER.unpack_from(data)
+
+            if expires and expires < time.time():
+                self.delete(key)
+                return None
+
+            return pickle.loads(data[header_size:])
+        except Exception:
+            cache_errors.labels(backend="shared").inc()
+            return None
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + ttl if ttl else 0
+
+        # Write to a temporary file first so other processes never
+        # read a partial value
+        value_file = tempfile.NamedTemporaryFile(
+            dir=self.directory, prefix=".", delete=False
+        )
+
+        with value_file:
+            value_file.write(self.HEADER.pack(expires))
+            pickle.dump(value, value_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(value_file.name, self.get_path(key))
+
+        self.writes += 1
+
+        if self.writes % self.PRUNE_INTERVAL == 1:
+            self.prune()
+
+    def get_mtime(self, key):
+        """
+        Return the time the value was last written, or None
+        """
+        try:
+            return os.stat(self.get_path(key)).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key):
+        try:
+            os.remove(self.get_path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def prune(self):
+        files = []
+
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        size = sum(file_size for _, file_size, _ in files)
+
+        for _, file_size, path in sorted(files):
+            if size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            size -= file_size
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisConnection:
+    """
+    A connection to a Redis server, speaking the RESP protocol
+    """
+
+    def __init__(self, host, port, timeout, password=None, db=0):
+        self.socket = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.socket.makefile("rb")
+        self.pid = os.getpid()
+
+        try:
+            if password:
+                self.send("AUTH", password)
+
+            if db:
+                self.send("SELECT", db)
+        except (OSError, RedisError):
+            self.close()
+            raise
+
+    def close(self):
+        self.reader.close()
+        self.socket.close()
+
+    def read_reply(self):
+        line = self.reader.readline()
+
+        if not line:
+            raise RedisError("Connection closed")
+
+        prefix, value = line[:1], line[1:-2]
+
+        if prefix == b"+":
+            return value.decode("utf-8")
+        elif prefix == b"-":
+            raise RedisError(value.decode("utf-8"))
+        elif prefix == b":":
+            return int(value)
+        elif prefix == b"$":
+            length = int(value)
+
+            if length == -1:
+                return None
+
+            return self.reader.read(length + 2)[:-2]
+        elif prefix == b"*":
+            length = int(value)
+
+            if length == -1:
+                return None
+
+            return [self.read_reply() for _ in range(length)]
+
+        raise RedisError(f"Unknown reply {line!r}")
+
+    def send(self, *args):
+        command = [b"*%d\r\n" % len(args)]
+
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+
+            command.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+
+        self.socket.sendall(b"".join(command))
+
+        return self.read_reply()
+
+
+class RedisCache:
+    """
+    Values stored in a Redis server, under keys prefixed by namespace.
+
+    Commands run on a pool of up to pool_size idle connections, opened
+    when none is idle and dropped in a process forked after they were
+    opened, so concurrent requests don't wait on each other.
+
+    Errors are counted and treated as a missing value, so an unavailable
+    server never fails a request, or raised as RedisError with
+    raise_errors, for the stores that can't take a miss for an error.
+    After an error, the server is skipped for retry_after seconds rather
+    than every request waiting for the timeout to connect to it.
+
+    Values are pickled, and signed with CACHE_SECRET_KEY: values that
+    were not written by the webapp are never unpickled.
+    """
+
+    def __init__(
+        self,
+        url,
+        namespace,
+        timeout=1,
+        pool_size=4,
+        retry_after=5,
+        raise_errors=False,
+    ):
+        parsed_url = urlparse(url)
+
+        self.host = parsed_url.hostname or "localhost"
+        self.port = parsed_url.port or 6379
+        self.password = (
+            unquote(parsed_url.password) if parsed_url.password else None
+        )
+        self.db = int(parsed_url.path.strip("/") or 0)
+        self.namespace = namespace
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.retry_after = retry_after
+        self.raise_errors = raise_errors
+
+        self.pool = []
+        self.failed_at = None
+        self.lock = threading.Lock()
+
+    def _get_connection(self):
+        with self.lock:
+            while self.pool:
+                connection = self.pool.pop()
+
+                if connection.pid == os.getpid():
+                    return connection
+
+        return RedisConnection(
+            self.host, self.port, self.timeout, self.password, self.db
+        )
+
+    def _release_connection(self, connection):
+        with self.lock:
+            if len(self.pool) < self.pool_size:
+                self.pool.append(connection)
+                return
+
+        connection.close()
+
+    def command(self, *args):
+        failed_at = self.failed_at
+
+        if failed_at and time.monotonic() - failed_at < self.retry_after:
+            if self.raise_errors:
+                raise RedisError("Skipped after an error")
+
+            return None
+
+        connection = None
+
+        try:
+            connection = self._get_connection()
+            reply = connection.send(*args)
+        except (OSError, RedisError) as error:
+            cache_errors.labels(backend="redis").inc()
+            self.failed_at = time.monotonic()
+
+            if connection:
+                connection.close()
+
+            if self.raise_errors:
+                raise RedisError(str(error)) from error
+
+            return None
+
+        self.failed_at = None
+        self._release_connection(connection)
+
+        return reply
+
+    def get_key(self, key):
+        return f"{self.namespace}:{serialise_key(key)}"
+
+    def get(self, key):
+        data = self.command("GET", self.get_key(key))
+
+        if data is None:
+            return None
+
+        signature, data = data[:SIGNATURE_SIZE], data[SIGNATURE_SIZE:]
+
+        if not hmac.compare_digest(signature, sign(data)):
+            cache_errors.labels(backend="redis").inc()
+            return None
+
+        try:
+            return pickle.loads(data)
+        except Exception:
+            cache_errors.labels(backend="redis").inc()
+            return None
+
+    def set(self, key, value, ttl=None):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        args = ["SET", self.get_key(key), sign(data) + data]
+
+        if ttl:
+            args += ["PX", int(ttl * 1000)]
+
+        self.command(*args)
+
+    def delete(self, key):
+        self.command("DEL", self.get_key(key))
+
+    def clear(self):
+        cursor = "0"
+
+        while True:
+            reply = self.command(
+                "SCAN", cursor, "MATCH", f"{self.namespace}:*"
+            )
+
+            if not reply:
+                return
+
+            cursor, keys = reply
+
+            if keys:
+                self.command("DEL", *keys)
+
+            if cursor == b"0":
+                return
+
+
+def create_cache(namespace, maxsize=512, backend=None):
+    """
+    Return a cache for a caching layer, using the configured backend.
+    maxsize bounds the number of values of the memory backend.
+    """
+    backend = backend or CACHE_BACKEND
+
+    if backend == "memory":
+        return LRUCache(maxsize)
+    elif backend == "shared":
+        return FileCache(
+            os.path.join(CACHE_SHARED_DIR, namespace), CACHE_SHARED_MAX_SIZE
+        )
+    elif backend == "redis":
+        return RedisCache(CACHE_REDIS_URL, namespace)
+
+    raise ValueError(f"Unknown cache backend {backend}")
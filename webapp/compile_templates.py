@@ -0,0 +1,26 @@
+"""
+Fill the templates bytecode cache, at build time.
+
+Usage: TEMPLATE_CACHE_DIR=<directory> python3 -m webapp.compile_templates
+"""
+
+from webapp.app import create_app
+from webapp.template_cache import compile_templates
+
+
+def main():
+    app = create_app(testing=True)
+
+    if not app.config["TEMPLATE_CACHE_DIR"]:
+        raise SystemExit("TEMPLATE_CACHE_DIR is not configured")
+
+    count, duration = compile_templates(app.jinja_env)
+
+    print(
+        f"Compiled {count} templates into "
+        f"{app.config['TEMPLATE_CACHE_DIR']} in {duration:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+Write brotli and gzip versions of the static files, at build time.
+
+Usage: python3 -m webapp.compress_static
+"""
+
+import os
+
+from webapp.compression import compress_static
+
+
+def main():
+    static_folder = os.path.join(os.path.dirname(__file__), "..", "static")
+    min_size = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+
+    count = compress_static(static_folder, min_size)
+
+    print(f"Compressed {count} static files")
+
+
+if __name__ == "__main__":
+    main()
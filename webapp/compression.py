@@ -0,0 +1,174 @@
+"""
+Compression of the responses with brotli or gzip, negotiated with the
+Accept-Encoding header of the request.
+
+Static files are compressed at build time, next to the original files,
+by webapp.compress_static. Other responses are compressed after the
+request, and the compressed bytes are kept for the responses that are
+served again with the same body: micro-cached or ETagged responses.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+
+import brotli
+import flask
+from webapp.cache import create_cache
+
+# Content codings we compress to, in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+COMPRESSIBLE_MIMETYPES = [
+    "application/javascript",
+    "application/json",
+    "application/ld+json",
+    "application/xml",
+    "image/svg+xml",
+    "text/css",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+    "text/xml",
+]
+
+STATIC_EXTENSIONS = [".css", ".js", ".json", ".svg", ".txt", ".xml"]
+
+# Faster settings for responses compressed while the client waits,
+# static files get the best compression
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSED_TTL = 600
+
+
+def compress(data, encoding, best=False):
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if best else BROTLI_QUALITY)
+
+    return gzip.compress(data, compresslevel=9 if best else GZIP_LEVEL)
+
+
+def get_encoding():
+    """
+    Return the preferred content coding accepted by the client, or None
+    """
+    return flask.request.accept_encodings.best_match(list(ENCODINGS))
+
+
+def is_compressible(response, min_size):
+    return (
+        response.status_code == 200
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and not response.is_streamed
+        and not response.direct_passthrough
+        and "Content-Encoding" not in response.headers
+        and not response.cache_control.no_transform
+        and response.calculate_content_length() >= min_size
+    )
+
+
+def compress_static(directory, min_size):
+    """
+    Write a brotli and a gzip version of the static files worth
+    compressing. Returns the number of files compressed
+    """
+    count = 0
+
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+
+            if os.path.splitext(filename)[1] not in STATIC_EXTENSIONS:
+                continue
+
+            if os.path.getsize(path) < min_size:
+                continue
+
+            with open(path, "rb") as original:
+                data = original.read()
+
+            for encoding, extension in ENCODINGS.items():
+                with open(path + extension, "wb") as compressed:
+                    compressed.write(compress(data, encoding, best=True))
+
+            count += 1
+
+    return count
+
+
+def init_compression(app):
+    """
+    Register the compression of the responses. The hook must be
+    registered before the other after_request hooks, so it runs last.
+    """
+    min_size = app.config["COMPRESSION_MIN_SIZE"]
+    compressed_cache = create_cache(
+        "compressed", app.config["COMPRESSION_CACHE_SIZE"]
+    )
+    send_static_file = app.view_functions["static"]
+
+    def send_compressed_static_file(filename):
+        encoding = get_encoding()
+        extension = ENCODINGS.get(encoding)
+        mimetype = mimetypes.guess_type(filename)[0]
+
+        if mimetype not in COMPRESSIBLE_MIMETYPES:
+            return send_static_file(filename=filename)
+
+        if extension and os.path.isfile(
+            flask.safe_join(app.static_folder, filename + extension)
+        ):
+            response = flask.send_from_directory(
+                app.static_folder,
+                filename + extension,
+                mimetype=mimetype,
+                cache_timeout=app.get_send_file_max_age(filename),
+            )
+            response.headers["Content-Encoding"] = encoding
+        else:
+            response = send_static_file(filename=filename)
+
+        response.vary.add("Accept-Encoding")
+
+        return response
+
+    app.view_functions["static"] = send_compressed_static_file
+
+    @app.after_request
+    def compress_response(response):
+        if not is_compressible(response, min_size):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = get_encoding()
+
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        etag, weak = response.get_etag()
+        key = None
+
+        if etag:
+            key = (encoding, flask.request.path, etag)
+        elif flask.g.get("response_cached"):
+            key = (encoding, hashlib.sha1(data).hexdigest())
+
+        compressed = compressed_cache.get(key) if key else None
+
+        if compressed is None:
+            compressed = compress(data, encoding)
+
+            if key:
+                compressed_cache.set(key, compressed, COMPRESSED_TTL)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+
+        # The compressed body is only semantically equivalent
+        if etag:
+            response.set_etag(etag, weak=True)
+
+        return response
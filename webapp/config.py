@@ -29,3 +29,60 @@ CONTENT_DIRECTORY = {"PUBLISHER_PAGES": "store/content/publishers/"}
 SEARCH_API_KEY = os.getenv("SEARCH_API_KEY")
 SEARCH_API_URL = "https://www.googleapis.com/customsearch/v1"
 SEARCH_CUSTOM_ID = "009048213575199080868:i3zoqdwqk8o"
+
+# Time budget in seconds for all the upstream requests of a request
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", 30))
+
+# Time to live in seconds of the responses to anonymous requests cached
+# by every worker, 0 disables the cache
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 10))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 128))
+
+# Directory of the last known good store pages, served when the store
+# API is unavailable, unset to disable them. Pages are saved at most
+# every STALE_PAGES_REFRESH seconds, the oldest are removed once the
+# directory is larger than STALE_PAGES_MAX_SIZE bytes
+STALE_PAGES_DIR = os.getenv("STALE_PAGES_DIR")
+STALE_PAGES_MAX_SIZE = int(
+    os.getenv("STALE_PAGES_MAX_SIZE", 200 * 1024 * 1024)
+)
+STALE_PAGES_REFRESH = int(os.getenv("STALE_PAGES_REFRESH", 60))
+
+# Responses smaller than this number of bytes are not compressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", 256))
+
+# Maximum number of template fragments kept by the {% cache %} tag
+FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", 512))
+
+# Directory of the templates bytecode cache shared by the workers,
+# filled at build time by webapp.compile_templates
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR")
+
+# Load all the templates when a worker starts, instead of on first use
+TEMPLATE_PRECOMPILE = os.getenv("TEMPLATE_PRECOMPILE", "false").lower() in [
+    "1",
+    "true",
+]
+
+# Set when the application is preloaded in the gunicorn master, to load
+# everything the workers need before they are forked
+PRELOAD = os.getenv("PRELOAD", "false").lower() in ["1", "true"]
+
+# Where the sessions are stored: "cookie" signs them into the cookie,
+# "shared" and "redis" keep them on the server, in SESSION_SHARED_DIR
+# or in the Redis server of CACHE_REDIS_URL, with an id in the cookie
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "cookie")
+SESSION_SHARED_DIR = os.getenv(
+    "SESSION_SHARED_DIR", "/dev/shm/snapcraft-sessions"
+)
+SESSION_SHARED_MAX_SIZE = int(
+    os.getenv("SESSION_SHARED_MAX_SIZE", 64 * 1024 * 1024)
+)
+
+# Decode the images uploaded with a listing and encode them again,
+# without their metadata and scaled down, before sending them to the store
+IMAGE_NORMALISATION = os.getenv("IMAGE_NORMALISATION", "false").lower() in [
+    "1",
+    "true",
+]
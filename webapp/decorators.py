@@ -4,6 +4,7 @@ import functools
 # Third party packages
 import flask
 from webapp import authentication
+from webapp.api.requests import set_deadline
 
 
 def login_required(func):
@@ -23,3 +24,21 @@ def login_required(func):
         return func(*args, **kwargs)
 
     return is_user_logged_in
+
+
+def request_deadline(seconds):
+    """
+    Decorator that replaces the default time budget for the upstream
+    requests of a view. None removes the deadline.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def set_view_deadline(*args, **kwargs):
+            set_deadline(seconds)
+
+            return func(*args, **kwargs)
+
+        return set_view_deadline
+
+    return decorator
@@ -0,0 +1,99 @@
+"""
+A Jinja extension caching the output of template fragments:
+
+    {% cache ("store-category", category, snap_names), 600 %}
+      ...
+    {% endcache %}
+
+The fragment is keyed on the webapp, the template, the position of the
+tag and the value of the key expression, which should list all the
+inputs of the fragment. The key is serialised on every render, so it
+should hold names or ids rather than whole objects. The second argument
+is the time to live in seconds.
+
+Fragments are rendered without the cache for authenticated sessions
+and when templates are auto-reloaded.
+"""
+
+import hashlib
+import json
+
+import flask
+import prometheus_client
+from jinja2 import nodes
+from jinja2.ext import Extension
+from webapp import authentication
+from webapp.cache import LRUCache, create_cache
+
+fragment_cache_counter = prometheus_client.Counter(
+    "fragment_cache_counter",
+    "A counter of template fragments renders, split by cache result",
+    ["result"],
+)
+
+
+def get_fragment_key(webapp, template_name, lineno, key):
+    digest = hashlib.sha1(
+        json.dumps(key, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+    return f"{webapp}:{template_name}:{lineno}:{digest}"
+
+
+class FragmentCacheExtension(Extension):
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=LRUCache())
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+
+        args = [
+            nodes.Const(parser.name),
+            nodes.Const(lineno),
+            parser.parse_expression(),
+        ]
+
+        if parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(60))
+
+        body = parser.parse_statements(["name:endcache"], drop_needle=True)
+
+        return nodes.CallBlock(
+            self.call_method("_render_fragment", args), [], [], body
+        ).set_lineno(lineno)
+
+    def _render_fragment(self, template_name, lineno, key, ttl, caller):
+        if self.environment.auto_reload or (
+            flask.has_request_context()
+            and authentication.is_authenticated(flask.session)
+        ):
+            fragment_cache_counter.labels(result="bypass").inc()
+            return caller()
+
+        fragment_cache = self.environment.fragment_cache
+        fragment_key = get_fragment_key(
+            flask.current_app.config["WEBAPP"], template_name, lineno, key
+        )
+        fragment = fragment_cache.get(fragment_key)
+
+        if fragment is not None:
+            fragment_cache_counter.labels(result="hit").inc()
+            return fragment
+
+        fragment_cache_counter.labels(result="miss").inc()
+        fragment = caller()
+        fragment_cache.set(fragment_key, fragment, ttl)
+
+        return fragment
+
+
+def init_fragment_cache(app):
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.fragment_cache = create_cache(
+        "fragments", app.config["FRAGMENT_CACHE_SIZE"]
+    )
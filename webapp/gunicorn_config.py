@@ -0,0 +1,30 @@
+"""
+Gunicorn server hooks, loaded with --config python:webapp.gunicorn_config
+
+Talisker sets its own worker_exit, worker_abort, on_starting and
+child_exit hooks, they must not be defined here.
+"""
+
+from webapp.preload import freeze, get_memory_usage
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        server.log.info(
+            "Application preloaded", extra=get_memory_usage() or {}
+        )
+
+
+def pre_fork(server, worker):
+    if not server.cfg.preload_app:
+        return
+
+    freeze()
+
+    # Report the memory of the running workers, so the pages they still
+    # share with the master can be compared with their own
+    for pid in list(server.WORKERS):
+        usage = get_memory_usage(pid)
+
+        if usage:
+            server.log.info("Worker memory", extra=dict(usage, pid=pid))
@@ -1,4 +1,6 @@
+import functools
 import socket
+import time
 from urllib.parse import unquote, urlparse, urlunparse
 
 import flask
@@ -7,6 +9,9 @@ import user_agents
 import webapp.template_utils as template_utils
 from canonicalwebteam import image_template
 from webapp import authentication
+from webapp.api.requests import get_server_timing, set_deadline
+from webapp.stale_pages import STALE_STATUS_CODES, get_stale_response
+from werkzeug.local import LocalProxy
 
 from datetime import datetime
 
@@ -25,59 +30,128 @@ accept_encoding_counter = prometheus_client.Counter(
     ["accept_encoding", "browser_family"],
 )
 
+# Content codings reported in the Accept-Encoding counter labels,
+# anything else is ignored to keep the labels bounded
+ACCEPT_ENCODINGS = ["br", "compress", "deflate", "gzip", "identity", "zstd"]
+
+
+@functools.lru_cache(maxsize=2048)
+def get_browser_family(agent_string):
+    """
+    Return the browser family from a User-Agent string.
+    Parsing is expensive, so results are cached by User-Agent.
+    """
+    return user_agents.parse(agent_string).browser.family
+
+
+@functools.lru_cache(maxsize=256)
+def normalise_accept_encoding(accept_encoding):
+    """
+    Return the sorted list of known codings of an Accept-Encoding header,
+    separated by commas, or "none"
+    """
+    codings = set()
+
+    for coding in (accept_encoding or "").lower().split(","):
+        coding = coding.split(";")[0].strip()
+
+        if coding in ACCEPT_ENCODINGS:
+            codings.add(coding)
+
+    return ",".join(sorted(codings)) or "none"
+
+
+def lazy_value(func):
+    """
+    Return a proxy to the value returned by func. func is only called
+    the first time a template reads the value, then the value is reused.
+    """
+    values = []
+
+    def get_value():
+        if not values:
+            values.append(func())
+
+        return values[0]
+
+    return LocalProxy(get_value)
+
+
+def get_user_name():
+    if authentication.is_authenticated(flask.session):
+        return flask.session["publisher"]["fullname"]
+
+    return None
+
+
+def get_user_is_canonical():
+    if authentication.is_authenticated(flask.session):
+        return flask.session["publisher"].get("is_canonical", False)
+
+    return False
+
+
+def get_page_slug():
+    return template_utils.generate_slug(flask.request.path)
+
+
+def get_host_url():
+    return flask.request.host_url
+
+
+def get_path():
+    return flask.request.path
+
 
 def set_handlers(app):
+    # Properties and functions that don't depend on the request,
+    # computed once when the app is created
+    static_context = {
+        # Variables
+        "LOGIN_URL": app.config["LOGIN_URL"],
+        "SENTRY_DSN": app.config["SENTRY_DSN"],
+        "COMMIT_ID": app.config["COMMIT_ID"],
+        "ENVIRONMENT": app.config["ENVIRONMENT"],
+        "VERIFIED_PUBLISHER": "verified",
+        "webapp_config": app.config["WEBAPP_CONFIG"],
+        "BSI_URL": app.config["BSI_URL"],
+        "IS_BRAND_STORE": "STORE_QUERY" in app.config["WEBAPP_CONFIG"],
+        # Functions
+        "contains": template_utils.contains,
+        "join": template_utils.join,
+        "static_url": template_utils.static_url,
+        "format_number": template_utils.format_number,
+        "display_name": template_utils.display_name,
+        "install_snippet": template_utils.install_snippet,
+        "format_date": template_utils.format_date,
+        "format_member_role": template_utils.format_member_role,
+        "image": image_template,
+    }
+
     @app.context_processor
     def utility_processor():
         """
         This defines the set of properties and functions that will be added
         to the default context for processing templates. All these items
         can be used in all templates
+
+        Properties depending on the request are only computed if
+        a template reads them
         """
 
-        if authentication.is_authenticated(flask.session):
-            user_name = flask.session["publisher"]["fullname"]
-            user_is_canonical = flask.session["publisher"].get(
-                "is_canonical", False
-            )
-        else:
-            user_name = None
-            user_is_canonical = False
-
-        page_slug = template_utils.generate_slug(flask.request.path)
-
-        is_brand_store = False
-
-        if "STORE_QUERY" in app.config["WEBAPP_CONFIG"]:
-            is_brand_store = True
-
-        return {
-            # Variables
-            "LOGIN_URL": app.config["LOGIN_URL"],
-            "SENTRY_DSN": app.config["SENTRY_DSN"],
-            "COMMIT_ID": app.config["COMMIT_ID"],
-            "ENVIRONMENT": app.config["ENVIRONMENT"],
-            "host_url": flask.request.host_url,
-            "path": flask.request.path,
-            "page_slug": page_slug,
-            "user_name": user_name,
-            "VERIFIED_PUBLISHER": "verified",
-            "webapp_config": app.config["WEBAPP_CONFIG"],
-            "BSI_URL": app.config["BSI_URL"],
-            "IS_BRAND_STORE": is_brand_store,
-            "now": datetime.now(),
-            "user_is_canonical": user_is_canonical,
-            # Functions
-            "contains": template_utils.contains,
-            "join": template_utils.join,
-            "static_url": template_utils.static_url,
-            "format_number": template_utils.format_number,
-            "display_name": template_utils.display_name,
-            "install_snippet": template_utils.install_snippet,
-            "format_date": template_utils.format_date,
-            "format_member_role": template_utils.format_member_role,
-            "image": image_template,
-        }
+        context = dict(static_context)
+        context.update(
+            {
+                "host_url": lazy_value(get_host_url),
+                "path": lazy_value(get_path),
+                "page_slug": lazy_value(get_page_slug),
+                "user_name": lazy_value(get_user_name),
+                "now": lazy_value(datetime.now),
+                "user_is_canonical": lazy_value(get_user_is_canonical),
+            }
+        )
+
+        return context
 
     # Error handlers
     # ===
@@ -93,6 +167,13 @@ def set_handlers(app):
         if not app.testing:
             app.extensions["sentry"].captureException()
 
+        # The store API failed, serve the last known good page
+        if return_code in STALE_STATUS_CODES:
+            stale_response = get_stale_response()
+
+            if stale_response:
+                return stale_response
+
         return (
             flask.render_template("50X.html", error_name=error_name),
             return_code,
@@ -100,6 +181,11 @@ def set_handlers(app):
 
     @app.errorhandler(503)
     def service_unavailable(error):
+        stale_response = get_stale_response()
+
+        if stale_response:
+            return stale_response
+
         return flask.render_template("503.html"), 503
 
     # Global tasks for all requests
@@ -119,6 +205,15 @@ def set_handlers(app):
 
             return flask.redirect(new_uri)
 
+    @app.before_request
+    def set_request_deadline():
+        """
+        Start the request timer and the time budget shared by all the
+        upstream requests
+        """
+        flask.g.request_start = time.perf_counter()
+        set_deadline(app.config["REQUEST_DEADLINE"])
+
     @app.before_request
     def prometheus_metrics():
         # Accept-encoding counter
@@ -129,16 +224,16 @@ def set_handlers(app):
         if agent_string and not agent_string.startswith(
             ("kube-probe", "Prometheus")
         ):
-            agent = user_agents.parse(agent_string or "")
-
             accept_encoding_counter.labels(
-                accept_encoding=flask.request.headers.get("Accept-Encoding"),
-                browser_family=agent.browser.family,
+                accept_encoding=normalise_accept_encoding(
+                    flask.request.headers.get("Accept-Encoding")
+                ),
+                browser_family=get_browser_family(agent_string),
             ).inc()
 
         # Badge counters
         # ===
-        if "/static/images/badges" in flask.request.url:
+        if flask.request.path.startswith("/static/images/badges"):
             if flask.session:
                 badge_logged_in_counter.inc()
             else:
@@ -150,10 +245,15 @@ def set_handlers(app):
         Generic rules for headers to add to all requests
 
         - X-Hostname: Mention the name of the host/pod running the application
+        - Server-Timing: Time spent in the request and upstream requests,
+          by upstream host in debug mode only
         - Cache-Control: Add cache-control headers for public and private pages
         """
 
         response.headers["X-Hostname"] = socket.gethostname()
+        response.headers["Server-Timing"] = get_server_timing(
+            by_host=app.debug
+        )
 
         if response.status_code == 200:
             if flask.session:
@@ -1,3 +1,4 @@
+import functools
 import json
 import os
 
@@ -25,6 +26,7 @@ def get_yaml_loader(typ="safe"):
     return _yaml
 
 
+@functools.lru_cache(maxsize=None)
 def get_licenses():
     try:
         with open("webapp/licenses.json") as f:
@@ -48,6 +50,14 @@ def get_licenses():
     return licenses
 
 
+def is_linux(user_agent):
+    """
+    Whether a User-Agent is the one of a desktop Linux browser, the
+    Android ones include "Linux" too
+    """
+    return "Linux" in user_agent and "Android" not in user_agent
+
+
 def get_file(filename, replaces={}):
     """
     Reads a file, replaces occurences of all the keys in `replaces` with
@@ -3,7 +3,6 @@ import datetime
 
 import flask
 from canonicalwebteam.candid import CandidClient
-from canonicalwebteam.store_api.stores.snapstore import SnapPublisher
 from canonicalwebteam.store_api.exceptions import (
     StoreApiError,
     StoreApiResponseErrorList,
@@ -15,8 +14,10 @@ from flask_wtf.csrf import generate_csrf, validate_csrf
 from webapp import authentication
 from webapp.helpers import api_publisher_session
 from webapp.api.exceptions import ApiCircuitBreaker, ApiError, ApiResponseError
+from webapp.api.publisher import SnapPublisher
 from webapp.extensions import csrf
 from webapp.login.macaroon import MacaroonRequest, MacaroonResponse
+from webapp.publisher import account_cache
 from webapp.publisher.snaps import logic
 from webapp.publisher.views import _handle_error, _handle_error_list
 
@@ -81,7 +82,7 @@ def after_login(resp):
         return flask.redirect(LOGIN_URL)
 
     try:
-        account = publisher_api.get_account(flask.session)
+        account = account_cache.get_account(flask.session)
         flask.session["publisher"] = {
             "identity_url": resp.identity_url,
             "nickname": account["username"],
@@ -92,7 +93,7 @@ def after_login(resp):
             in resp.extensions["lp"].is_member,
         }
         owned, shared = logic.get_snap_names_by_ownership(account)
-        flask.session["user_shared_snaps"] = shared
+        flask.session["user_shared_snaps"] = frozenset(shared)
 
     except ApiCircuitBreaker:
         flask.abort(503)
@@ -0,0 +1,71 @@
+"""
+Preload mode: the application is created once in the gunicorn master,
+warmed up and frozen before the workers are forked from it, so the
+workers share its memory copy-on-write instead of each building their
+own copy.
+
+gc.freeze() moves every object of the master out of the reach of the
+garbage collector, otherwise the first collection in a worker writes to
+all of them and copies their pages.
+"""
+
+import gc
+
+import pycountry
+from webapp import helpers
+from webapp.template_cache import compile_templates
+
+# Fields of /proc/<pid>/smaps_rollup we report, in kB
+MEMORY_FIELDS = {
+    "rss": ["Rss"],
+    "pss": ["Pss"],
+    "shared": ["Shared_Clean", "Shared_Dirty"],
+    "private": ["Private_Clean", "Private_Dirty"],
+}
+
+
+def warm_up(app):
+    """
+    Load everything the workers would otherwise load on their first
+    requests: the templates, the licenses and the country tables
+    """
+    compile_templates(app.jinja_env)
+    helpers.get_licenses()
+    len(pycountry.countries)
+
+
+def freeze():
+    """
+    Collect the garbage of the master and freeze the remaining objects,
+    right before forking a worker
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def get_memory_usage(pid="self"):
+    """
+    Return the rss, pss, shared and private memory of a process in bytes,
+    or None when the kernel doesn't report it
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps_file:
+            lines = smaps_file.readlines()
+    except OSError:
+        return None
+
+    values = {}
+
+    for line in lines[1:]:
+        name, value = line.split(":", 1)
+        values[name] = int(value.split()[0]) * 1024
+
+    return {
+        field: sum(values.get(name, 0) for name in names)
+        for field, names in MEMORY_FIELDS.items()
+    }
+
+
+def init_preload(app):
+    if app.config["PRELOAD"]:
+        warm_up(app)
@@ -0,0 +1,129 @@
+"""
+A short-lived cache of the account of the publishers, so the pages
+needing it don't all request the large account document from the
+dashboard API and walk it again.
+
+Accounts are keyed on a hash of the macaroons of the session, and
+cached along with what the views compute from them: the split of their
+snaps between released and only registered snaps, and the role of the
+publisher on each snap. The views writing to the store invalidate the
+account of the session, so it reflects the change.
+
+A collaborator removed from a snap keeps the permissions of the cached
+account, to trigger builds, for up to ACCOUNT_CACHE_TTL seconds, unless
+the store denies them another action first.
+"""
+
+import hashlib
+
+from webapp.api.publisher import SnapPublisher
+from webapp.cache import create_cache
+from webapp.helpers import api_publisher_session
+from webapp.publisher.snaps import logic
+
+ACCOUNT_CACHE_TTL = 30
+ACCOUNT_CACHE_SIZE = 256
+
+MACAROON_KEYS = ["macaroons", "macaroon_root", "macaroon_discharge"]
+
+publisher_api = SnapPublisher(api_publisher_session)
+account_cache = create_cache("accounts", ACCOUNT_CACHE_SIZE)
+
+
+def get_session_key(session):
+    macaroons = "\n".join(session.get(key, "") for key in MACAROON_KEYS)
+
+    return hashlib.sha256(macaroons.encode("utf-8")).hexdigest()
+
+
+def get_account(session):
+    """
+    Return the account of the publisher of the session
+    """
+    key = get_session_key(session)
+    account = account_cache.get(key)
+
+    if account is None:
+        account = publisher_api.get_account(session)
+        account_cache.set(key, account, ACCOUNT_CACHE_TTL)
+
+    return account
+
+
+def get_snaps_account_info(session):
+    """
+    Return the snaps of the publisher of the session, split like
+    logic.get_snaps_account_info
+    """
+    key = ("snaps", get_session_key(session))
+    snaps = account_cache.get(key)
+
+    if snaps is None:
+        snaps = logic.get_snaps_account_info(get_account(session))
+        account_cache.set(key, snaps, ACCOUNT_CACHE_TTL)
+
+    return snaps
+
+
+def get_snap_permissions(session):
+    """
+    Return the role of the publisher of the session on each of the
+    snaps of their account, "owner" or "collaborator"
+    """
+    key = ("permissions", get_session_key(session))
+    permissions = account_cache.get(key)
+
+    if permissions is None:
+        account = get_account(session)
+        permissions = {}
+
+        for snap_name, snap in account.get("snaps", {}).get("16", {}).items():
+            publisher = snap.get("publisher", {})
+
+            if publisher.get("username") == account.get("username"):
+                permissions[snap_name] = "owner"
+            else:
+                permissions[snap_name] = "collaborator"
+
+        account_cache.set(key, permissions, ACCOUNT_CACHE_TTL)
+
+    return permissions
+
+
+def get_snap_role(session, snap_name):
+    """
+    Return the role of the publisher of the session on a snap, or None
+    if they are not a contributor. A snap missing from a cached account
+    is checked again against a fresh one, it may have been shared with
+    the publisher since.
+    """
+    permissions = account_cache.get(("permissions", get_session_key(session)))
+
+    if permissions is not None:
+        if snap_name in permissions:
+            return permissions[snap_name]
+
+        invalidate_account(session)
+
+    return get_snap_permissions(session).get(snap_name)
+
+
+def invalidate_account(session):
+    """
+    Remove the account of the publisher of the session from the cache,
+    after a change to their snaps or account, or when the store denies
+    them an action the cache allowed
+    """
+    key = get_session_key(session)
+    account_cache.delete(key)
+    account_cache.delete(("snaps", key))
+    account_cache.delete(("permissions", key))
+
+
+def invalidate_if_denied(session, api_error):
+    """
+    Invalidate the account of the publisher of the session if the store
+    denied them an action, their permissions may have changed
+    """
+    if getattr(api_error, "status_code", None) == 403:
+        invalidate_account(session)
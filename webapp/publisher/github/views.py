@@ -1,5 +1,8 @@
+import hashlib
+import json
 import flask
 from webapp.api.github import GitHub
+from webapp.cache import create_cache
 from webapp.decorators import login_required
 from werkzeug.exceptions import Unauthorized
 
@@ -7,22 +10,93 @@ publisher_github = flask.Blueprint(
     "github", __name__, template_folder="/templates", static_folder="/static"
 )
 
+# Repositories pages by (hashed GitHub token, org), kept for a short time
+# so the repo picker doesn't list them again on every selection
+REPOS_CACHE_TTL = 60
+_repos_cache = create_cache("github-repos", 256)
+
+
+def _cache_repo_pages(cache_key, pages):
+    """
+    Yield the pages while they arrive and cache them once all of them
+    have been listed
+    """
+    cached_pages = []
+
+    for page in pages:
+        cached_pages.append(page)
+        yield page
+
+    _repos_cache.set(cache_key, cached_pages, REPOS_CACHE_TTL)
+
+
+def _get_repo_pages(github_token, org=None):
+    """
+    Return an iterator over the pages of repositories of the org, or of
+    the user if no org is given
+    """
+    if github_token:
+        token_hash = hashlib.sha256(github_token.encode("UTF-8")).hexdigest()
+        cache_key = (token_hash, org)
+        cached_pages = _repos_cache.get(cache_key)
+
+        if cached_pages is not None:
+            return iter(cached_pages)
+
+    github = GitHub(github_token)
+
+    if org:
+        pages = github.iter_org_repositories(org)
+    else:
+        pages = github.iter_user_repositories()
+
+    if github_token:
+        return _cache_repo_pages(cache_key, pages)
+
+    return pages
+
+
+def _unauthorized_response():
+    return (
+        flask.jsonify({"error": "You need to be authenticated on GitHub"}),
+        401,
+    )
+
 
 @publisher_github.route("/publisher/github/get-repos", methods=["GET"])
 @login_required
 def get_repos():
-    github = GitHub(flask.session.get("github_auth_secret"))
     org = flask.request.args.get("org")
 
     try:
-        if org:
-            repos = github.get_org_repositories(org)
-        else:
-            repos = github.get_user_repositories()
+        pages = _get_repo_pages(flask.session.get("github_auth_secret"), org)
+        repos = [repo for page in pages for repo in page]
     except Unauthorized:
-        return (
-            flask.jsonify({"error": "You need to be authenticated on GitHub"}),
-            401,
-        )
+        return _unauthorized_response()
 
     return flask.jsonify(repos)
+
+
+@publisher_github.route("/publisher/github/get-repos/stream", methods=["GET"])
+@login_required
+def get_repos_stream():
+    """
+    Stream the repositories as newline delimited JSON, one list of
+    repositories per line, as they are listed from GitHub
+    """
+    org = flask.request.args.get("org")
+    pages = _get_repo_pages(flask.session.get("github_auth_secret"), org)
+
+    # Get the first page before streaming to be able to return errors
+    try:
+        first_page = next(pages, [])
+    except Unauthorized:
+        return _unauthorized_response()
+
+    def generate():
+        yield json.dumps(first_page) + "\n"
+
+        for page in pages:
+            yield json.dumps(page) + "\n"
+
+    return flask.Response(generate(), mimetype="application/x-ndjson")
@@ -4,7 +4,6 @@ from hashlib import md5
 
 # Packages
 import flask
-from canonicalwebteam.store_api.stores.snapstore import SnapPublisher
 from canonicalwebteam.store_api.exceptions import (
     StoreApiError,
     StoreApiResponseErrorList,
@@ -15,8 +14,10 @@ from requests.exceptions import HTTPError
 from webapp.helpers import api_publisher_session, launchpad
 from webapp.api.github import GitHub, InvalidYAML
 from webapp.api.exceptions import ApiError
+from webapp.api.publisher import SnapPublisher
 from webapp.decorators import login_required
 from webapp.extensions import csrf
+from webapp.publisher import account_cache
 from webapp.publisher.snaps.builds import map_build_and_upload_states
 from webapp.publisher.views import _handle_error, _handle_error_list
 from werkzeug.exceptions import Unauthorized
@@ -117,9 +118,13 @@ def get_snap_builds(snap_name):
             github_owner, github_repo
         )
 
-        context["yaml_file_exists"] = github.get_snapcraft_yaml_location(
-            github_owner, github_repo
-        )
+        try:
+            context["yaml_file_exists"] = github.get_snapcraft_yaml(
+                github_owner, github_repo
+            )["location"]
+        except InvalidYAML:
+            # The file is there, even if it can't be parsed
+            context["yaml_file_exists"] = True
 
         context.update(get_builds(lp_snap, slice(0, BUILDS_PER_PAGE)))
 
@@ -186,7 +191,21 @@ def get_snap_build(snap_name, build_id):
 def validate_repo(github_token, snap_name, gh_owner, gh_repo):
     github = GitHub(github_token)
     result = {"success": True}
-    yaml_location = github.get_snapcraft_yaml_location(gh_owner, gh_repo)
+
+    try:
+        snapcraft_yaml = github.get_snapcraft_yaml(gh_owner, gh_repo)
+    except InvalidYAML:
+        result["success"] = False
+        result["error"] = {
+            "type": "INVALID_YAML_FILE",
+            "message": (
+                "Invalid snapcraft.yaml: there was an issue parsing the "
+                f"snapcraft.yaml for {snap_name}."
+            ),
+        }
+        return result
+
+    yaml_location = snapcraft_yaml["location"]
 
     # The snapcraft.yaml is not present
     if not yaml_location:
@@ -201,30 +220,20 @@ def validate_repo(github_token, snap_name, gh_owner, gh_repo):
         }
     # The property name inside the yaml file doesn't match the snap
     else:
-        try:
-            gh_snap_name = github.get_snapcraft_yaml_name(gh_owner, gh_repo)
-
-            if gh_snap_name != snap_name:
-                result["success"] = False
-                result["error"] = {
-                    "type": "SNAP_NAME_DOES_NOT_MATCH",
-                    "message": (
-                        "Name mismatch: the snapcraft.yaml uses the snap "
-                        f'name "{gh_snap_name}", but you\'ve registered'
-                        f' the name "{snap_name}". Update your '
-                        "snapcraft.yaml to continue."
-                    ),
-                    "yaml_location": yaml_location,
-                    "gh_snap_name": gh_snap_name,
-                }
-        except InvalidYAML:
+        gh_snap_name = snapcraft_yaml["content"].get("name")
+
+        if gh_snap_name != snap_name:
             result["success"] = False
             result["error"] = {
-                "type": "INVALID_YAML_FILE",
+                "type": "SNAP_NAME_DOES_NOT_MATCH",
                 "message": (
-                    "Invalid snapcraft.yaml: there was an issue parsing the "
-                    f"snapcraft.yaml for {snap_name}."
+                    "Name mismatch: the snapcraft.yaml uses the snap "
+                    f'name "{gh_snap_name}", but you\'ve registered'
+                    f' the name "{snap_name}". Update your '
+                    "snapcraft.yaml to continue."
                 ),
+                "yaml_location": yaml_location,
+                "gh_snap_name": gh_snap_name,
             }
 
     return result
@@ -294,9 +303,7 @@ def post_snap_builds(snap_name):
         return _handle_error(api_error)
 
     # Don't allow changes from Admins that are no contributors
-    account_snaps = publisher_api.get_account_snaps(flask.session)
-
-    if snap_name not in account_snaps:
+    if not account_cache.get_snap_role(flask.session, snap_name):
         flask.flash(
             "You do not have permissions to modify this Snap", "negative"
         )
@@ -386,9 +393,7 @@ def post_snap_builds(snap_name):
 @login_required
 def post_build(snap_name):
     # Don't allow builds from no contributors
-    account_snaps = publisher_api.get_account_snaps(flask.session)
-
-    if snap_name not in account_snaps:
+    if not account_cache.get_snap_role(flask.session, snap_name):
         return flask.jsonify(
             {
                 "success": False,
@@ -4,10 +4,7 @@ from json import loads
 # Packages
 import bleach
 import flask
-from canonicalwebteam.store_api.stores.snapstore import (
-    SnapPublisher,
-    SnapStore,
-)
+from canonicalwebteam.store_api.stores.snapstore import SnapStore
 from canonicalwebteam.store_api.exceptions import (
     StoreApiError,
     StoreApiResponseErrorList,
@@ -17,9 +14,11 @@ from canonicalwebteam.store_api.exceptions import (
 from webapp import helpers
 from webapp.helpers import api_publisher_session
 from webapp.api.exceptions import ApiError
-from webapp.decorators import login_required
+from webapp.api.publisher import SnapPublisher
+from webapp.decorators import login_required, request_deadline
+from webapp.publisher import account_cache
 from webapp.markdown import parse_markdown_description
-from webapp.publisher.snaps import logic, preview_data
+from webapp.publisher.snaps import logic, media, preview_data
 from webapp.publisher.views import _handle_error, _handle_error_list
 from webapp.store.logic import (
     filter_screenshots,
@@ -136,6 +135,7 @@ def get_listing_snap(snap_name):
 
 
 @login_required
+@request_deadline(120)
 def post_listing_snap(snap_name):
     changes = None
     changed_fields = flask.request.form.get("changes")
@@ -148,21 +148,6 @@ def post_listing_snap(snap_name):
         error_list = []
 
         if "images" in changes:
-            # Add existing screenshots
-            try:
-                current_screenshots = publisher_api.snap_screenshots(
-                    snap_id, flask.session
-                )
-            except StoreApiResponseErrorList as api_response_error_list:
-                if api_response_error_list.status_code == 404:
-                    return flask.abort(
-                        404, "No snap named {}".format(snap_name)
-                    )
-                else:
-                    return _handle_error_list(api_response_error_list.errors)
-            except (StoreApiError, ApiError) as api_error:
-                return _handle_error(api_error)
-
             icon_input = (
                 flask.request.files.get("icon")
                 if flask.request.files.get("icon")
@@ -178,27 +163,67 @@ def post_listing_snap(snap_name):
                 else None
             )
 
-            images_json, images_files = logic.build_changed_images(
-                changes["images"],
-                current_screenshots,
-                icon_input,
-                screenshots_input,
-                banner_image_input,
+            # Check the images before sending any to the store
+            image_errors = media.validate_images(
+                icon_input, screenshots_input, banner_image_input
             )
 
-            try:
-                publisher_api.snap_screenshots(
-                    snap_id, flask.session, images_json, images_files
+            if (
+                not image_errors
+                and flask.current_app.config["IMAGE_NORMALISATION"]
+            ):
+                (
+                    icon_input,
+                    screenshots_input,
+                    banner_image_input,
+                    image_errors,
+                ) = media.normalise_images(
+                    icon_input, screenshots_input, banner_image_input
                 )
-            except StoreApiResponseErrorList as api_response_error_list:
-                if api_response_error_list.status_code == 404:
-                    return flask.abort(
-                        404, "No snap named {}".format(snap_name)
+
+            if image_errors:
+                error_list = error_list + image_errors
+            else:
+                # Add existing screenshots
+                try:
+                    current_screenshots = publisher_api.snap_screenshots(
+                        snap_id, flask.session
                     )
-                else:
-                    error_list = error_list + api_response_error_list.errors
-            except (StoreApiError, ApiError) as api_error:
-                return _handle_error(api_error)
+                except StoreApiResponseErrorList as api_response_error_list:
+                    if api_response_error_list.status_code == 404:
+                        return flask.abort(
+                            404, "No snap named {}".format(snap_name)
+                        )
+                    else:
+                        return _handle_error_list(
+                            api_response_error_list.errors
+                        )
+                except (StoreApiError, ApiError) as api_error:
+                    return _handle_error(api_error)
+
+                images_json, images_files = logic.build_changed_images(
+                    changes["images"],
+                    current_screenshots,
+                    icon_input,
+                    screenshots_input,
+                    banner_image_input,
+                )
+
+                try:
+                    publisher_api.snap_screenshots(
+                        snap_id, flask.session, images_json, images_files
+                    )
+                except StoreApiResponseErrorList as api_response_error_list:
+                    if api_response_error_list.status_code == 404:
+                        return flask.abort(
+                            404, "No snap named {}".format(snap_name)
+                        )
+                    else:
+                        error_list = (
+                            error_list + api_response_error_list.errors
+                        )
+                except (StoreApiError, ApiError) as api_error:
+                    return _handle_error(api_error)
 
         body_json = logic.filter_changes_data(changes)
 
@@ -210,7 +235,12 @@ def post_listing_snap(snap_name):
 
             try:
                 publisher_api.snap_metadata(snap_id, flask.session, body_json)
+                account_cache.invalidate_account(flask.session)
             except StoreApiResponseErrorList as api_response_error_list:
+                account_cache.invalidate_if_denied(
+                    flask.session, api_response_error_list
+                )
+
                 if api_response_error_list.status_code == 404:
                     return flask.abort(
                         404, "No snap named {}".format(snap_name)
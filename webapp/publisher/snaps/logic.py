@@ -4,6 +4,8 @@ from json import dumps
 
 from dateutil import parser
 
+HASH_CHUNK_SIZE = 64 * 1024
+
 
 def get_snaps_account_info(account_info):
     """Get snaps from the account information of a user
@@ -160,7 +162,12 @@ def build_image_info(image, image_type):
     Build info json structure for image upload
     Return json oject with useful informations for the api
     """
-    hasher = hashlib.sha256(image.read())
+    hasher = hashlib.sha256()
+
+    # Hash the image by chunks, uploads can be large files spooled on disk
+    for chunk in iter(lambda: image.read(HASH_CHUNK_SIZE), b""):
+        hasher.update(chunk)
+
     hash_final = hasher.hexdigest()
     image.seek(0)
 
@@ -202,32 +209,45 @@ def build_changed_images(
     info = []
     images_files = []
     images_json = None
+    added_images = set()
+
+    # Index the current screenshots by URL and the uploaded ones by
+    # filename, in their order for the duplicates
+    current_by_url = {}
+    for current_screenshot in current_screenshots:
+        current_by_url.setdefault(current_screenshot["url"], []).append(
+            current_screenshot
+        )
+
+    new_by_filename = {}
+    for new_screenshot in new_screenshots:
+        if new_screenshot:
+            new_by_filename.setdefault(new_screenshot.filename, []).append(
+                new_screenshot
+            )
 
     # Get screenshots info (existing and new) while keeping the order recieved
     for changed_screenshot in changed_screenshots:
-        for current_screenshot in current_screenshots:
-            if (
-                changed_screenshot
-                and changed_screenshot["url"] == current_screenshot["url"]
-                and current_screenshot not in info
-            ):
-                info.append(current_screenshot)
-                break
-        for new_screenshot in new_screenshots:
-            if new_screenshot:
-                is_same = (
-                    changed_screenshot["status"] == "new"
-                    and changed_screenshot["name"] == new_screenshot.filename
-                )
-
-                if is_same:
-                    image_built = build_image_info(
-                        new_screenshot, "screenshot"
-                    )
-                    if image_built not in info:
-                        info.append(image_built)
-                        images_files.append(new_screenshot)
-                        break
+        if not changed_screenshot:
+            continue
+
+        current_matches = current_by_url.get(changed_screenshot.get("url"))
+        if current_matches:
+            info.append(current_matches.pop(0))
+
+        if changed_screenshot.get("status") == "new":
+            new_matches = new_by_filename.get(changed_screenshot["name"], [])
+
+            while new_matches:
+                new_screenshot = new_matches.pop(0)
+                image_built = build_image_info(new_screenshot, "screenshot")
+                image_key = (image_built["filename"], image_built["hash"])
+
+                if image_key not in added_images:
+                    added_images.add(image_key)
+                    info.append(image_built)
+                    images_files.append(new_screenshot)
+                    break
 
     # Add new icon
     if icon is not None:
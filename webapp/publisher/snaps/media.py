@@ -0,0 +1,399 @@
+"""
+Checks of the images uploaded with a listing, run before they are sent
+to the store, so a listing with an invalid image fails before uploading
+anything.
+
+The restrictions are the ones the listing form checks in the browser,
+in static/js/publisher/market/restrictions.js. The dimensions are read
+from the headers of the images, without decoding them.
+
+With the IMAGE_NORMALISATION setting, the PNG and JPEG images are then
+decoded with Pillow, checked again, and encoded again without their
+metadata, resized when they are larger than the store pages need. The
+images are processed in a pool of threads, outside of the gevent loop
+of the worker, which keeps serving the other requests meanwhile.
+"""
+
+import functools
+import struct
+import tempfile
+
+import prometheus_client
+from gevent.threadpool import ThreadPoolExecutor
+from PIL import Image, ImageOps
+from werkzeug.datastructures import FileStorage
+
+IMAGE_RESTRICTIONS = {
+    "screenshot": {
+        "formats": ["png", "gif", "jpeg"],
+        "width": (480, 3840),
+        "height": (480, 2160),
+        "aspect_ratio": ((1, 2), (2, 1)),
+        "size": 2000000,
+    },
+    "icon": {
+        "formats": ["png", "jpeg", "svg"],
+        "width": (40, 512),
+        "height": (40, 512),
+        "aspect_ratio": ((1, 1), (1, 1)),
+        "size": 256000,
+    },
+    "banner": {
+        "formats": ["png", "jpeg"],
+        "width": (720, 4320),
+        "height": (240, 1440),
+        "aspect_ratio": ((3, 1), (3, 1)),
+        "size": 2000000,
+    },
+}
+
+# The largest images kept, bigger ones are scaled down to fit, keeping
+# their aspect ratio
+NORMALISED_SIZES = {
+    "screenshot": (1920, 1920),
+    "icon": (512, 512),
+    "banner": (2436, 812),
+}
+
+NORMALISED_FORMATS = ["png", "jpeg"]
+
+JPEG_QUALITY = 85
+
+# Normalised images bigger than this are written to disk
+SPOOL_MAX_SIZE = 1024 * 1024
+
+IMAGE_NORMALISATION_WORKERS = 2
+
+FORMAT_NAMES = {"png": "PNG", "gif": "GIF", "jpeg": "JPEG", "svg": "SVG"}
+
+HEADER_SIZE = 1024
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# JPEG start of frame markers, holding the dimensions of the image
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+normalised_images = prometheus_client.Counter(
+    "normalised_images",
+    "A counter of the normalised listing images, split by type and result",
+    ["type", "result"],
+)
+normalised_bytes_saved = prometheus_client.Counter(
+    "normalised_bytes_saved",
+    "Bytes saved by the normalisation of the listing images, split by type",
+    ["type"],
+)
+
+
+@functools.lru_cache(maxsize=None)
+def get_normalise_executor():
+    """
+    The pool of threads normalising the images, started in the worker on
+    its first use rather than in a preloaded master
+    """
+    return ThreadPoolExecutor(max_workers=IMAGE_NORMALISATION_WORKERS)
+
+
+def get_image_size(image):
+    """
+    Return the size of an uploaded image in bytes
+    """
+    image.seek(0, 2)
+    size = image.tell()
+    image.seek(0)
+
+    return size
+
+
+def _get_jpeg_dimensions(image):
+    image.seek(2)
+
+    while True:
+        marker = image.read(2)
+
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+
+        # Markers can be padded with any number of 0xFF
+        while marker[1] == 0xFF:
+            marker = marker[1:] + image.read(1)
+
+            if len(marker) < 2:
+                return None
+
+        segment = image.read(2)
+
+        if len(segment) < 2:
+            return None
+
+        (length,) = struct.unpack(">H", segment)
+
+        if marker[1] in JPEG_SOF_MARKERS:
+            frame = image.read(5)
+
+            if len(frame) < 5:
+                return None
+
+            height, width = struct.unpack(">HH", frame[1:])
+            return width, height
+
+        image.seek(length - 2, 1)
+
+
+def get_image_info(image):
+    """
+    Return the format of an uploaded image, and its width and height, or
+    None for the dimensions of an SVG image.
+    Return None if it is not an image in a format the store accepts.
+    """
+    header = image.read(HEADER_SIZE)
+    dimensions = None
+
+    try:
+        if header.startswith(PNG_SIGNATURE) and header[12:16] == b"IHDR":
+            image_format = "png"
+            dimensions = struct.unpack(">II", header[16:24])
+        elif header[:6] in (b"GIF87a", b"GIF89a"):
+            image_format = "gif"
+            dimensions = struct.unpack("<HH", header[6:10])
+        elif header.startswith(b"\xff\xd8"):
+            image_format = "jpeg"
+            dimensions = _get_jpeg_dimensions(image)
+
+            if dimensions is None:
+                return None
+        elif b"<svg" in header:
+            image_format = "svg"
+        else:
+            return None
+    except struct.error:
+        return None
+    finally:
+        image.seek(0)
+
+    return image_format, dimensions
+
+
+def _check_aspect_ratio(width, height, aspect_ratio):
+    (min_width, min_height), (max_width, max_height) = aspect_ratio
+
+    return (
+        width * min_height >= height * min_width
+        and width * max_height <= height * max_width
+    )
+
+
+def _check_dimensions(width, height, restrictions):
+    min_width, max_width = restrictions["width"]
+    min_height, max_height = restrictions["height"]
+
+    if not (
+        min_width <= width <= max_width and min_height <= height <= max_height
+    ):
+        return [
+            f"it is {width} x {height} pixels, it needs to be between "
+            f"{min_width} x {min_height} and "
+            f"{max_width} x {max_height} pixels"
+        ]
+
+    if not _check_aspect_ratio(width, height, restrictions["aspect_ratio"]):
+        min_ratio, max_ratio = restrictions["aspect_ratio"]
+
+        if min_ratio == max_ratio:
+            ratio = "{}:{}".format(*min_ratio)
+        else:
+            ratio = "between {}:{} and {}:{}".format(*min_ratio, *max_ratio)
+
+        return [f"its aspect ratio needs to be {ratio}"]
+
+    return []
+
+
+def _image_error(image, messages):
+    return {
+        "code": "invalid-image",
+        "message": "{}: {}".format(image.filename, ", ".join(messages)),
+    }
+
+
+def validate_image(image, image_type):
+    """
+    Check an uploaded image against the restrictions of the store for its
+    type, "screenshot", "icon" or "banner"
+
+    :return: A list of errors, in the format of the store API
+    """
+    restrictions = IMAGE_RESTRICTIONS[image_type]
+    messages = []
+
+    size = get_image_size(image)
+
+    if size > restrictions["size"]:
+        messages.append(
+            "it is {:.1f} kB, the maximum is {:.0f} kB".format(
+                size / 1000, restrictions["size"] / 1000
+            )
+        )
+
+    image_info = get_image_info(image)
+
+    if image_info is None or image_info[0] not in restrictions["formats"]:
+        formats = [
+            FORMAT_NAMES[image_format]
+            for image_format in restrictions["formats"]
+        ]
+        messages.append(
+            "it needs to be a {} or {} image".format(
+                ", ".join(formats[:-1]), formats[-1]
+            )
+        )
+    elif image_info[1] is not None:
+        messages.extend(_check_dimensions(*image_info[1], restrictions))
+
+    if not messages:
+        return []
+
+    return [_image_error(image, messages)]
+
+
+def validate_images(icon, screenshots, banner_background):
+    """
+    Check the images uploaded with a listing
+
+    :param icon: The uploaded icon, or None
+    :param screenshots: The uploaded screenshots, with None for the
+        empty inputs
+    :param banner_background: The uploaded banner, or None
+
+    :return: A list of errors, in the format of the store API
+    """
+    errors = []
+
+    if icon is not None:
+        errors.extend(validate_image(icon, "icon"))
+
+    for screenshot in screenshots:
+        if screenshot:
+            errors.extend(validate_image(screenshot, "screenshot"))
+
+    if banner_background is not None:
+        errors.extend(validate_image(banner_background, "banner"))
+
+    return errors
+
+
+def normalise_image(image, image_type):
+    """
+    Decode an uploaded image, check its dimensions, and encode it again
+    without its metadata, scaled down to fit NORMALISED_SIZES.
+    GIF and SVG images are left as they are.
+
+    :return: The normalised image, or the image itself if it is not in
+        a format to normalise or could not be made smaller, and a list
+        of errors, in the format of the store API
+    """
+    image_info = get_image_info(image)
+
+    if image_info is None or image_info[0] not in NORMALISED_FORMATS:
+        return image, []
+
+    image_format, dimensions = image_info
+
+    try:
+        # Read from the file Werkzeug spooled the upload to
+        with Image.open(image.stream) as decoded:
+            normalised = ImageOps.exif_transpose(decoded)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        normalised_images.labels(type=image_type, result="invalid").inc()
+        return image, [_image_error(image, ["it could not be decoded"])]
+    finally:
+        image.seek(0)
+
+    messages = _check_dimensions(
+        *normalised.size, IMAGE_RESTRICTIONS[image_type]
+    )
+
+    if messages:
+        normalised_images.labels(type=image_type, result="invalid").inc()
+        return image, [_image_error(image, messages)]
+
+    normalised.thumbnail(
+        NORMALISED_SIZES[image_type], Image.Resampling.LANCZOS
+    )
+
+    output = tempfile.SpooledTemporaryFile(SPOOL_MAX_SIZE)
+
+    # Only the colour profile is kept from the metadata
+    icc_profile = normalised.info.get("icc_profile")
+
+    if image_format == "jpeg":
+        normalised.save(
+            output,
+            "JPEG",
+            quality=JPEG_QUALITY,
+            optimize=True,
+            progressive=True,
+            icc_profile=icc_profile,
+        )
+    else:
+        normalised.save(output, "PNG", optimize=True, icc_profile=icc_profile)
+
+    size = get_image_size(image)
+    normalised_size = output.tell()
+    resized = normalised.size != tuple(dimensions)
+
+    if not resized and normalised_size >= size:
+        output.close()
+        normalised_images.labels(type=image_type, result="unchanged").inc()
+        return image, []
+
+    output.seek(0)
+    normalised_images.labels(
+        type=image_type, result="resized" if resized else "recompressed"
+    ).inc()
+    normalised_bytes_saved.labels(type=image_type).inc(
+        max(size - normalised_size, 0)
+    )
+
+    return (
+        FileStorage(
+            output,
+            filename=image.filename,
+            name=image.name,
+            content_type=image.content_type,
+        ),
+        [],
+    )
+
+
+def normalise_images(icon, screenshots, banner_background):
+    """
+    Normalise the images uploaded with a listing, in parallel
+
+    :return: The icon, the screenshots and the banner, normalised, and a
+        list of errors, in the format of the store API
+    """
+    images = (
+        [(icon, "icon")]
+        + [(screenshot, "screenshot") for screenshot in screenshots]
+        + [(banner_background, "banner")]
+    )
+    executor = get_normalise_executor()
+    futures = [
+        executor.submit(normalise_image, image, image_type) if image else None
+        for image, image_type in images
+    ]
+
+    normalised = []
+    errors = []
+
+    for (image, _), future in zip(images, futures):
+        if future is None:
+            normalised.append(image)
+            continue
+
+        normalised_image, image_errors = future.result()
+        normalised.append(normalised_image)
+        errors.extend(image_errors)
+
+    return normalised[0], normalised[1:-1], normalised[-1], errors
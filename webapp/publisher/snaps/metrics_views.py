@@ -5,7 +5,6 @@ from json import loads
 import flask
 import webapp.metrics.helper as metrics_helper
 import webapp.metrics.metrics as metrics
-from canonicalwebteam.store_api.stores.snapstore import SnapPublisher
 from canonicalwebteam.store_api.exceptions import (
     StoreApiError,
     StoreApiResponseErrorList,
@@ -14,6 +13,7 @@ from canonicalwebteam.store_api.exceptions import (
 # Local
 from webapp.helpers import api_publisher_session
 from webapp.api.exceptions import ApiError
+from webapp.api.publisher import SnapPublisher
 from webapp.decorators import login_required
 from webapp.publisher.snaps import logic
 from webapp.publisher.views import _handle_error, _handle_error_list
@@ -1,9 +1,6 @@
 # Packages
 import flask
-from canonicalwebteam.store_api.stores.snapstore import (
-    SnapStore,
-    SnapPublisher,
-)
+from canonicalwebteam.store_api.stores.snapstore import SnapStore
 from canonicalwebteam.store_api.exceptions import (
     StoreApiError,
     StoreApiResponseErrorList,
@@ -12,6 +9,7 @@ from canonicalwebteam.store_api.exceptions import (
 # Local
 from webapp.helpers import api_publisher_session
 from webapp.api.exceptions import ApiError
+from webapp.api.publisher import SnapPublisher
 from webapp.decorators import login_required
 from webapp.publisher.views import _handle_error, _handle_error_list
 from webapp.store.logic import filter_screenshots
@@ -1,6 +1,5 @@
 # Packages
 import flask
-from canonicalwebteam.store_api.stores.snapstore import SnapPublisher
 from canonicalwebteam.store_api.exceptions import (
     StoreApiError,
     StoreApiResponseErrorList,
@@ -9,7 +8,9 @@ from canonicalwebteam.store_api.exceptions import (
 # Local
 from webapp.helpers import api_publisher_session
 from webapp.api.exceptions import ApiError
+from webapp.api.publisher import SnapPublisher
 from webapp.decorators import login_required
+from webapp.publisher import account_cache
 from webapp.publisher.views import _handle_error, _handle_error_list
 
 
@@ -95,6 +96,10 @@ def post_release(snap_name):
             flask.session, snap_name, data
         )
     except StoreApiResponseErrorList as api_response_error_list:
+        account_cache.invalidate_if_denied(
+            flask.session, api_response_error_list
+        )
+
         if api_response_error_list.status_code == 404:
             return flask.abort(404, "No snap named {}".format(snap_name))
         else:
@@ -102,6 +107,8 @@ def post_release(snap_name):
     except (StoreApiError, ApiError) as api_error:
         return _handle_error(api_error)
 
+    account_cache.invalidate_account(flask.session)
+
     return flask.jsonify(response)
 
 
@@ -134,6 +141,10 @@ def post_close_channel(snap_name):
             flask.session, snap_id, data
         )
     except StoreApiResponseErrorList as api_response_error_list:
+        account_cache.invalidate_if_denied(
+            flask.session, api_response_error_list
+        )
+
         if api_response_error_list.status_code == 404:
             return flask.abort(404, "No snap named {}".format(snap_name))
         else:
@@ -145,6 +156,7 @@ def post_close_channel(snap_name):
     except (StoreApiError, ApiError) as api_error:
         return _handle_error(api_error)
 
+    account_cache.invalidate_account(flask.session)
     response["success"] = True
     return flask.jsonify(response)
 
@@ -168,7 +180,12 @@ def post_default_track(snap_name):
 
     try:
         publisher_api.snap_metadata(snap_id, flask.session, data)
+        account_cache.invalidate_account(flask.session)
     except StoreApiResponseErrorList as api_response_error_list:
+        account_cache.invalidate_if_denied(
+            flask.session, api_response_error_list
+        )
+
         if api_response_error_list.status_code == 404:
             return flask.abort(404, "No snap named {}".format(snap_name))
         else:
@@ -4,7 +4,6 @@ from json import loads
 # Packages
 import flask
 import pycountry
-from canonicalwebteam.store_api.stores.snapstore import SnapPublisher
 from canonicalwebteam.store_api.exceptions import (
     StoreApiError,
     StoreApiResponseErrorList,
@@ -13,7 +12,9 @@ from canonicalwebteam.store_api.exceptions import (
 # Local
 from webapp.helpers import api_publisher_session, launchpad
 from webapp.api.exceptions import ApiError
+from webapp.api.publisher import SnapPublisher
 from webapp.decorators import login_required
+from webapp.publisher import account_cache
 from webapp.publisher.snaps import logic
 from webapp.publisher.views import _handle_error, _handle_error_list
 
@@ -97,7 +98,12 @@ def post_settings(snap_name):
         if body_json:
             try:
                 publisher_api.snap_metadata(snap_id, flask.session, body_json)
+                account_cache.invalidate_account(flask.session)
             except StoreApiResponseErrorList as api_response_error_list:
+                account_cache.invalidate_if_denied(
+                    flask.session, api_response_error_list
+                )
+
                 if api_response_error_list.status_code == 404:
                     return flask.abort(
                         404, "No snap named {}".format(snap_name)
@@ -1,7 +1,6 @@
 # Packages
 import bleach
 import flask
-from canonicalwebteam.store_api.stores.snapstore import SnapPublisher
 from canonicalwebteam.store_api.exceptions import (
     StoreApiError,
     StoreApiResponseErrorList,
@@ -10,7 +9,9 @@ from canonicalwebteam.store_api.exceptions import (
 # Local
 from webapp.helpers import api_publisher_session, launchpad
 from webapp.api.exceptions import ApiError
+from webapp.api.publisher import SnapPublisher
 from webapp.decorators import login_required
+from webapp.publisher import account_cache
 from webapp.publisher.snaps import (
     build_views,
     listing_views,
@@ -225,14 +226,14 @@ def redirect_get_account_snaps():
 @login_required
 def get_account_snaps():
     try:
-        account_info = publisher_api.get_account(flask.session)
+        user_snaps, registered_snaps = account_cache.get_snaps_account_info(
+            flask.session
+        )
     except StoreApiResponseErrorList as api_response_error_list:
         return _handle_error_list(api_response_error_list.errors)
     except (StoreApiError, ApiError) as api_error:
         return _handle_error(api_error)
 
-    user_snaps, registered_snaps = logic.get_snaps_account_info(account_info)
-
     flask_user = flask.session["publisher"]
 
     context = {
@@ -248,12 +249,11 @@ def get_account_snaps():
 @login_required
 def get_snap_build_status():
     try:
-        account_info = publisher_api.get_account(flask.session)
+        user_snaps, _ = account_cache.get_snaps_account_info(flask.session)
     except (StoreApiError, ApiError) as api_error:
         return flask.jsonify(api_error), 400
 
     response = []
-    user_snaps, _ = logic.get_snaps_account_info(account_info)
 
     for snap_name in user_snaps:
         snap_build_statuses = launchpad.get_snap_build_status(snap_name)
@@ -273,7 +273,7 @@ def redirect_get_register_name():
 @login_required
 def get_register_name():
     try:
-        user = publisher_api.get_account(flask.session)
+        user = account_cache.get_account(flask.session)
     except (StoreApiError, ApiError) as api_error:
         return _handle_error(api_error)
 
@@ -341,7 +341,7 @@ def post_register_name():
         )
     except StoreApiResponseErrorList as api_response_error_list:
         try:
-            user = publisher_api.get_account(flask.session)
+            user = account_cache.get_account(flask.session)
         except (StoreApiError, ApiError) as api_error:
             return _handle_error(api_error)
 
@@ -395,6 +395,8 @@ def post_register_name():
     except (StoreApiError, ApiError) as api_error:
         return _handle_error(api_error)
 
+    account_cache.invalidate_account(flask.session)
+
     flask.flash(
         "".join(
             [
@@ -439,6 +441,7 @@ def post_register_name_json():
     except (StoreApiError, ApiError) as api_error:
         return _handle_error(api_error)
 
+    account_cache.invalidate_account(flask.session)
     response["code"] = "created"
 
     return flask.jsonify(response)
@@ -500,14 +503,14 @@ def get_request_reserved_name():
 @login_required
 def snap_count():
     try:
-        account_info = publisher_api.get_account(flask.session)
+        user_snaps, registered_snaps = account_cache.get_snaps_account_info(
+            flask.session
+        )
     except StoreApiResponseErrorList as api_response_error_list:
         return _handle_error_list(api_response_error_list.errors)
     except (StoreApiError, ApiError) as api_error:
         return _handle_error(api_error)
 
-    user_snaps, registered_snaps = logic.get_snaps_account_info(account_info)
-
     context = {"count": len(user_snaps), "snaps": list(user_snaps.keys())}
 
     return flask.jsonify(context)
@@ -7,7 +7,6 @@ from canonicalwebteam.store_api.exceptions import (
     StoreApiCircuitBreaker,
     StoreApiTimeoutError,
 )
-from canonicalwebteam.store_api.stores.snapstore import SnapPublisher
 from canonicalwebteam.store_api.exceptions import (
     StoreApiError,
     StoreApiResponseErrorList,
@@ -24,7 +23,9 @@ from webapp.api.exceptions import (
     ApiResponseError,
     ApiTimeoutError,
 )
+from webapp.api.publisher import SnapPublisher
 from webapp.decorators import login_required
+from webapp.publisher import account_cache
 
 account = flask.Blueprint(
     "account", __name__, template_folder="/templates", static_folder="/static"
@@ -166,6 +167,7 @@ def post_agreement():
     if agreed == "on":
         try:
             publisher_api.post_agreement(flask.session, True)
+            account_cache.invalidate_account(flask.session)
         except StoreApiResponseErrorList as api_response_error_list:
             codes = [error["code"] for error in api_response_error_list.errors]
             error_messages = ", ".join(codes)
@@ -193,6 +195,7 @@ def post_account_name():
         errors = []
         try:
             publisher_api.post_username(flask.session, username)
+            account_cache.invalidate_account(flask.session)
         except StoreApiResponseErrorList as api_response_error_list:
             errors = errors + api_response_error_list.errors
         except (StoreApiError, ApiError) as api_error:
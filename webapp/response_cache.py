@@ -0,0 +1,159 @@
+"""
+A short-lived cache of the full responses to anonymous GET requests,
+so a traffic spike on a page only reaches the store API and the
+templates once per worker and time to live.
+
+Responses are keyed on the full URL, the webapp and whether the
+User-Agent is a desktop Linux one. When a response is missing, a single request
+renders it while the concurrent requests for the same key wait for it.
+"""
+
+import threading
+
+import flask
+import prometheus_client
+from webapp import helpers
+from webapp.cache import create_cache
+
+response_cache_counter = prometheus_client.Counter(
+    "response_cache_counter",
+    "A counter of requests to the response cache, split by result",
+    ["result"],
+)
+
+
+class ResponseCache:
+    def __init__(self, ttl, maxsize):
+        self.ttl = ttl
+        self.responses = create_cache("responses", maxsize)
+        self.fills = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        return self.responses.get(key)
+
+    def set(self, key, response):
+        self.responses.set(key, response, self.ttl)
+
+    def claim(self, key):
+        """
+        Claim the rendering of a missing response.
+        Returns None if the caller should render it, or an event
+        that is set once the request rendering it finishes
+        """
+        with self.lock:
+            fill = self.fills.get(key)
+
+            if fill:
+                return fill
+
+            self.fills[key] = threading.Event()
+
+    def release(self, key):
+        with self.lock:
+            fill = self.fills.pop(key, None)
+
+        if fill:
+            fill.set()
+
+
+def is_cacheable_request():
+    return (
+        flask.request.method in ["GET", "HEAD"]
+        and not flask.request.path.startswith("/static")
+        and not flask.session
+    )
+
+
+def is_cacheable_response(response):
+    return (
+        response.status_code == 200
+        and not response.is_streamed
+        and not response.direct_passthrough
+        and "Set-Cookie" not in response.headers
+        # Stale pages served while the upstream fails
+        and "Warning" not in response.headers
+        and not response.cache_control.private
+        and not response.cache_control.no_store
+        and not response.cache_control.no_cache
+        and not flask.session
+    )
+
+
+def get_response_key():
+    user_agent = flask.request.headers.get("User-Agent", "")
+
+    return (
+        flask.current_app.config["WEBAPP"],
+        flask.request.url,
+        helpers.is_linux(user_agent),
+    )
+
+
+def init_response_cache(app):
+    """
+    Register the hooks of the response cache. They must be registered
+    after the other hooks so the cached responses don't include the
+    headers added to every response.
+    """
+    if not app.config["RESPONSE_CACHE_TTL"] or app.debug:
+        return
+
+    cache = ResponseCache(
+        app.config["RESPONSE_CACHE_TTL"], app.config["RESPONSE_CACHE_SIZE"]
+    )
+    app.extensions["response_cache"] = cache
+
+    @app.before_request
+    def get_cached_response():
+        if not is_cacheable_request():
+            response_cache_counter.labels(result="bypass").inc()
+            return
+
+        key = get_response_key()
+        cached_response = cache.get(key)
+
+        if cached_response is None:
+            fill = cache.claim(key)
+
+            if fill is None:
+                flask.g.response_cache_key = key
+                response_cache_counter.labels(result="miss").inc()
+                return
+
+            fill.wait(app.config["REQUEST_DEADLINE"])
+            cached_response = cache.get(key)
+
+            if cached_response is None:
+                response_cache_counter.labels(result="miss").inc()
+                return
+
+        response_cache_counter.labels(result="hit").inc()
+        flask.g.response_cached = True
+        data, status, headers = cached_response
+
+        return flask.Response(data, status=status, headers=headers)
+
+    @app.after_request
+    def set_cached_response(response):
+        key = flask.g.get("response_cache_key")
+
+        if key and is_cacheable_response(response):
+            flask.g.response_cached = True
+            cache.set(
+                key,
+                (
+                    response.get_data(),
+                    response.status_code,
+                    list(response.headers),
+                ),
+            )
+
+        return response
+
+    @app.teardown_request
+    def release_cached_response(exception=None):
+        key = flask.g.pop("response_cache_key", None)
+
+        if key:
+            cache.release(key)
@@ -0,0 +1,163 @@
+"""
+Session backends, picked with the SESSION_BACKEND setting:
+
+- cookie: the whole session signed into the cookie, the Flask default
+- shared: the session in files of a local or shared memory directory,
+  for deployments with a single host
+- redis: the session in a Redis server, or anything speaking its
+  protocol, for deployments with several hosts
+
+The server-side backends only keep an opaque random id in the cookie,
+and store the session pickled, so values like sets keep their type.
+When the store can't be read, the request goes on with an empty
+session, and neither the stored session nor the cookie are changed, so
+the user finds their session again once the store is back.
+The cookie backend can also serialise frozensets, so the views can
+store them whichever the backend.
+"""
+
+import secrets
+
+from flask.json.tag import JSONTag, TaggedJSONSerializer
+from flask.sessions import (
+    SecureCookieSession,
+    SecureCookieSessionInterface,
+    SessionInterface,
+    total_seconds,
+)
+from webapp.cache import CACHE_REDIS_URL, FileCache, RedisCache, RedisError
+
+
+class TagFrozenSet(JSONTag):
+    __slots__ = ()
+    key = " fs"
+
+    def check(self, value):
+        return isinstance(value, frozenset)
+
+    def to_json(self, value):
+        return [self.serializer.tag(item) for item in value]
+
+    def to_python(self, value):
+        return frozenset(value)
+
+
+class CookieSessionInterface(SecureCookieSessionInterface):
+    serializer = TaggedJSONSerializer()
+    serializer.register(TagFrozenSet)
+
+
+STORE_ERRORS = (OSError, RedisError)
+
+
+class ServerSideSession(SecureCookieSession):
+    def __init__(self, initial=None, sid=None, new=False, unavailable=False):
+        super().__init__(initial)
+        self.sid = sid
+        self.new = new
+        self.unavailable = unavailable
+        self.was_authenticated = "publisher" in self
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Sessions stored in a cache backend of webapp.cache, under a random
+    id kept in the cookie. The id changes when the user logs in, so an
+    id obtained before can't be used to share their session.
+    """
+
+    session_class = ServerSideSession
+
+    def __init__(self, store):
+        self.store = store
+
+    def generate_sid(self):
+        return secrets.token_urlsafe(32)
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(app.session_cookie_name)
+
+        if sid:
+            try:
+                data = self.store.get(sid)
+            except STORE_ERRORS:
+                return self.session_class(sid=sid, unavailable=True)
+
+            if data is not None:
+                return self.session_class(data, sid=sid)
+
+        return self.session_class(sid=self.generate_sid(), new=True)
+
+    def save_session(self, app, session, response):
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        # The stored session is still there, keep its id in the cookie
+        if session.unavailable:
+            response.vary.add("Cookie")
+            return
+
+        if not session:
+            if session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(
+                    app.session_cookie_name, domain=domain, path=path
+                )
+
+            return
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if not self.should_set_cookie(app, session):
+            return
+
+        if "publisher" in session and not session.was_authenticated:
+            self.store.delete(session.sid)
+            session.sid = self.generate_sid()
+
+        # Written whenever the cookie is, so the stored session doesn't
+        # expire before the cookie of a user only reading it. Failing to
+        # only extend it leaves the session and the cookie as they were.
+        try:
+            self.store.set(
+                session.sid,
+                dict(session),
+                total_seconds(app.permanent_session_lifetime),
+            )
+        except STORE_ERRORS:
+            if session.modified:
+                raise
+
+            return
+
+        response.set_cookie(
+            app.session_cookie_name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def init_sessions(app):
+    backend = app.config["SESSION_BACKEND"]
+
+    if backend == "cookie":
+        app.session_interface = CookieSessionInterface()
+    elif backend == "shared":
+        app.session_interface = ServerSideSessionInterface(
+            FileCache(
+                app.config["SESSION_SHARED_DIR"],
+                app.config["SESSION_SHARED_MAX_SIZE"],
+            )
+        )
+    elif backend == "redis":
+        app.session_interface = ServerSideSessionInterface(
+            RedisCache(CACHE_REDIS_URL, "sessions", raise_errors=True)
+        )
+    else:
+        raise ValueError(f"Unknown session backend {backend}")
@@ -0,0 +1,147 @@
+"""
+Last known good copies of the anonymous store pages, kept on local disk
+and shared by the workers. They are served with a notification when the
+store API circuit breaker is open, the store API times out or fails,
+instead of an error page: from the error handlers when a view aborts,
+and after the request when a store view renders its own error page with
+one of STALE_STATUS_CODES.
+"""
+
+import re
+import time
+from datetime import datetime
+
+import flask
+import prometheus_client
+from webapp.cache import FileCache
+from webapp.response_cache import get_response_key, is_cacheable_request
+
+stale_pages_counter = prometheus_client.Counter(
+    "stale_pages_counter",
+    "A counter of errors that could be replaced by a stale page, "
+    "split by result",
+    ["result"],
+)
+
+STALE_STATUS_CODES = [502, 503, 504]
+
+BODY_TAG = re.compile(rb"<body[^>]*>")
+
+
+class StalePages:
+    """
+    Pages stored in a file cache on local disk, without expiry. Once the
+    directory grows larger than max_size bytes, the oldest pages are
+    removed.
+    """
+
+    def __init__(self, directory, max_size, refresh):
+        self.pages = FileCache(directory, max_size)
+        self.refresh = refresh
+
+    def get(self, key):
+        """
+        Return the page and the time it was saved, or None
+        """
+        page = self.pages.get(key)
+        saved_at = self.pages.get_mtime(key)
+
+        if page is None or saved_at is None:
+            return None
+
+        return page, saved_at
+
+    def set(self, key, page):
+        saved_at = self.pages.get_mtime(key)
+
+        if saved_at and time.time() - saved_at < self.refresh:
+            return
+
+        self.pages.set(key, page)
+
+
+def get_stale_response():
+    """
+    Return the last known good copy of the requested page
+    with a notification, or None
+    """
+    stale_pages = flask.current_app.extensions.get("stale_pages")
+
+    # Only look the page up once, from the error handler or after the view
+    if flask.g.get("stale_page_checked"):
+        return None
+
+    flask.g.stale_page_checked = True
+
+    if not stale_pages or not is_cacheable_request():
+        return None
+
+    stale_page = stale_pages.get(get_response_key())
+
+    if not stale_page:
+        stale_pages_counter.labels(result="missing").inc()
+        return None
+
+    stale_pages_counter.labels(result="served").inc()
+    page, saved_at = stale_page
+
+    notification = flask.render_template(
+        "partials/_stale-page-notification.html",
+        updated_at=datetime.utcfromtimestamp(saved_at),
+    )
+    body_tag = BODY_TAG.search(page)
+
+    if body_tag:
+        position = body_tag.end()
+        page = page[:position] + notification.encode("utf-8") + page[position:]
+
+    response = flask.Response(page, mimetype="text/html")
+    response.headers["Warning"] = '110 - "Response is Stale"'
+    response.headers[
+        "Cache-Control"
+    ] = "public, max-age=10, stale-if-error=86400"
+
+    return response
+
+
+def init_stale_pages(app):
+    if not app.config["STALE_PAGES_DIR"]:
+        return
+
+    stale_pages = StalePages(
+        app.config["STALE_PAGES_DIR"],
+        app.config["STALE_PAGES_MAX_SIZE"],
+        app.config["STALE_PAGES_REFRESH"],
+    )
+    app.extensions["stale_pages"] = stale_pages
+
+    @app.after_request
+    def save_stale_page(response):
+        if (
+            flask.request.blueprint == "store"
+            and response.status_code == 200
+            and response.mimetype == "text/html"
+            and not response.is_streamed
+            and "Warning" not in response.headers
+            and is_cacheable_request()
+        ):
+            stale_pages.set(get_response_key(), response.get_data())
+
+        return response
+
+    @app.after_request
+    def serve_stale_page(response):
+        """
+        Replace the error pages the store views render themselves with
+        error_info, rather than aborting
+        """
+        if (
+            flask.request.blueprint == "store"
+            and response.status_code in STALE_STATUS_CODES
+        ):
+            stale_response = get_stale_response()
+
+            if stale_response:
+                return stale_response
+
+        return response
@@ -0,0 +1,240 @@
+"""
+The catalogue of a brand store, held in memory by each worker, so its
+homepage and its search are served without requests to the store API.
+
+Brand stores hold tens to hundreds of snaps: the whole catalogue is
+loaded on the first use, with the same filters as the store API listing
+and search, then reloaded in the background every CATALOGUE_REFRESH
+seconds while the current one keeps being served. A catalogue larger
+than CATALOGUE_SIZE is not complete, the search then goes to the store
+API as before.
+
+The search matches the words of the query against the words of the
+name, the title, the publisher and the summary of the snaps: whole
+words, the start of words, or close words to allow for typos.
+"""
+
+import bisect
+import difflib
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import prometheus_client
+
+CATALOGUE_REFRESH = 300
+CATALOGUE_SIZE = 500
+
+# Weights of the fields in the ranking of the results
+FIELD_WEIGHTS = {"name": 4, "title": 3, "publisher": 2, "summary": 1}
+
+# Minimum similarity of a word to a word of the query, between 0 and 1
+FUZZY_CUTOFF = 0.8
+FUZZY_MATCHES = 3
+
+WORD = re.compile(r"[^\W_]+")
+
+catalogue_loads = prometheus_client.Counter(
+    "brand_store_catalogue_loads",
+    "A counter of the loads of the brand store catalogue, split by result",
+    ["result"],
+)
+
+
+def get_words(text):
+    return WORD.findall(text.lower()) if text else []
+
+
+def get_publisher(snap):
+    publisher = snap.get("publisher")
+
+    if isinstance(publisher, dict):
+        return " ".join(
+            filter(
+                None,
+                [publisher.get("display-name"), publisher.get("username")],
+            )
+        )
+
+    return publisher
+
+
+class CatalogueIndex:
+    """
+    An inverted index of snaps, from the words of their fields to their
+    positions in the catalogue and the weight of the field
+    """
+
+    def __init__(self, snaps):
+        self.snaps = snaps
+        self.postings = defaultdict(dict)
+
+        for position, snap in enumerate(snaps):
+            fields = {
+                "name": snap.get("package_name"),
+                "title": snap.get("title"),
+                "publisher": get_publisher(snap),
+                "summary": snap.get("summary"),
+            }
+
+            for field, text in fields.items():
+                for word in get_words(text):
+                    postings = self.postings[word]
+                    postings[position] = max(
+                        postings.get(position, 0), FIELD_WEIGHTS[field]
+                    )
+
+        self.words = sorted(self.postings)
+
+    def _match_word(self, query_word):
+        """
+        Return the score of the snaps matching a word of the query
+        """
+        scores = defaultdict(int)
+
+        # Words starting with the query word, whole words score double
+        start = bisect.bisect_left(self.words, query_word)
+
+        for word in self.words[start:]:
+            if not word.startswith(query_word):
+                break
+
+            factor = 2 if word == query_word else 1
+
+            for position, weight in self.postings[word].items():
+                scores[position] = max(scores[position], weight * factor)
+
+        if scores:
+            return scores
+
+        for word in difflib.get_close_matches(
+            query_word, self.words, FUZZY_MATCHES, FUZZY_CUTOFF
+        ):
+            for position, weight in self.postings[word].items():
+                scores[position] = max(scores[position], weight)
+
+        return scores
+
+    def search(self, query):
+        """
+        Return the snaps matching all the words of a query, the best
+        matches first, then in the order of the catalogue
+        """
+        query_words = get_words(query)
+
+        if not query_words:
+            return []
+
+        scores = None
+
+        for query_word in query_words:
+            word_scores = self._match_word(query_word)
+
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {
+                    position: score + word_scores[position]
+                    for position, score in scores.items()
+                    if position in word_scores
+                }
+
+            if not scores:
+                return []
+
+        positions = sorted(scores, key=lambda position: -scores[position])
+
+        return [self.snaps[position] for position in positions]
+
+
+class StoreCatalogue:
+    """
+    The catalogue of a brand store, loaded with the store API client of
+    the brand store, and reloaded in the background once it is older than
+    refresh seconds
+    """
+
+    def __init__(self, api, refresh=CATALOGUE_REFRESH, size=CATALOGUE_SIZE):
+        self.api = api
+        self.refresh = refresh
+        self.size = size
+        self.snaps = None
+        self.index = None
+        self.complete = False
+        self.loaded_at = None
+        self.loading = False
+        self.lock = threading.Lock()
+        self.first_load_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def load(self):
+        """
+        Load the catalogue from the store API, the errors of the API are
+        raised when no catalogue was loaded before
+        """
+        try:
+            snaps = self.api.get_all_items(size=self.size)["results"]
+            # The search of the store API only returns strict and classic
+            # snaps, the homepage lists all of them
+            response = self.api.search("", size=self.size)
+        except Exception:
+            catalogue_loads.labels(result="error").inc()
+
+            if self.index is None:
+                raise
+
+            return
+        finally:
+            with self.lock:
+                self.loading = False
+
+        searchable_snaps = response.get("results", [])
+
+        self.snaps = snaps
+        self.index = CatalogueIndex(searchable_snaps)
+        self.complete = len(searchable_snaps) >= response.get(
+            "total", len(searchable_snaps)
+        )
+        self.loaded_at = time.monotonic()
+        catalogue_loads.labels(result="success").inc()
+
+    def refresh_if_stale(self):
+        """
+        Load the catalogue on the first use, once for all the concurrent
+        requests, and schedule a reload once it is stale
+        """
+        if self.index is None:
+            with self.first_load_lock:
+                if self.index is None:
+                    self.load()
+        elif time.monotonic() - self.loaded_at > self.refresh:
+            with self.lock:
+                if self.loading:
+                    return
+
+                self.loading = True
+
+            self.executor.submit(self.load)
+
+    def get_snaps(self):
+        """
+        Return all the snaps of the catalogue, in the order of the store
+        """
+        self.refresh_if_stale()
+
+        return self.snaps
+
+    def search(self, query):
+        """
+        Return the snaps matching a query, or None if the catalogue is not
+        complete and can't be searched
+        """
+        self.refresh_if_stale()
+        index = self.index
+
+        if not self.complete:
+            return None
+
+        return index.search(query)
@@ -1,7 +1,7 @@
 import datetime
 import random
 import re
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import parse_qs, quote_plus, urlparse
 
 import humanize
 from dateutil import parser
@@ -109,6 +109,44 @@ def convert_navigation_url(url, link):
     return url
 
 
+def get_search_links(url, query, limit, offset, total):
+    """Build the navigation links of search results paginated locally,
+    in the format of get_pages_details
+
+    :param url: The url to build
+    :param query: The search query
+    :param limit: The number of results per page
+    :param offset: The offset of the first result of the page
+    :param total: The total number of results
+
+    :returns: A dictionnary with all the navigation links
+    """
+    if not total:
+        return {}
+
+    host_url = "{base_url}?q={q}&limit={limit}&offset={offset}"
+
+    def build_url(link_offset):
+        return host_url.format(
+            base_url=url, q=quote_plus(query), limit=limit, offset=link_offset
+        )
+
+    last_offset = limit * ((total - 1) // limit)
+    links_result = {
+        "first": build_url(0),
+        "last": build_url(last_offset),
+        "self": build_url(offset),
+    }
+
+    if offset > 0:
+        links_result["prev"] = build_url(max(offset - limit, 0))
+
+    if offset + limit < total:
+        links_result["next"] = build_url(offset + limit)
+
+    return links_result
+
+
 def build_pagination_link(snap_searched, snap_category, page):
     """Build pagination link
 
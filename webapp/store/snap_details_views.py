@@ -6,7 +6,11 @@ import webapp.metrics.helper as metrics_helper
 import webapp.metrics.metrics as metrics
 import webapp.store.logic as logic
 from webapp import authentication
-from webapp.api.exceptions import ApiError
+from webapp.api.exceptions import (
+    ApiCircuitBreaker,
+    ApiError,
+    ApiTimeoutError,
+)
 from webapp.markdown import parse_markdown_description
 
 from canonicalwebteam.flask_base.decorators import (
@@ -31,7 +35,7 @@ def snap_details_views(store, api, handle_errors):
     def _get_context_snap_details(snap_name):
         try:
             details = api.get_item_details(snap_name, api_version=2)
-        except StoreApiTimeoutError as api_timeout_error:
+        except (StoreApiTimeoutError, ApiTimeoutError) as api_timeout_error:
             flask.abort(504, str(api_timeout_error))
         except StoreApiResponseDecodeError as api_response_decode_error:
             flask.abort(502, str(api_response_decode_error))
@@ -48,7 +52,7 @@ def snap_details_views(store, api, handle_errors):
                 flask.abort(502, error_messages)
         except StoreApiResponseError as api_response_error:
             flask.abort(502, str(api_response_error))
-        except StoreApiCircuitBreaker:
+        except (StoreApiCircuitBreaker, ApiCircuitBreaker):
             flask.abort(503)
         except (StoreApiError, ApiError) as api_error:
             flask.abort(502, str(api_error))
@@ -267,10 +271,8 @@ def snap_details_views(store, api, handle_errors):
                 ),
                 "normalized_os": os_metrics.os if os_metrics else None,
                 # Context info
-                "is_linux": (
-                    "Linux" in flask.request.headers.get("User-Agent", "")
-                    and "Android"
-                    not in flask.request.headers.get("User-Agent", "")
+                "is_linux": helpers.is_linux(
+                    flask.request.headers.get("User-Agent", "")
                 ),
                 "error_info": error_info,
             }
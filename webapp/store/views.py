@@ -15,8 +15,14 @@ from canonicalwebteam.store_api.exceptions import (
     StoreApiResponseErrorList,
     StoreApiTimeoutError,
 )
-from webapp.api.exceptions import ApiError
+from webapp.api.exceptions import (
+    ApiCircuitBreaker,
+    ApiError,
+    ApiTimeoutError,
+)
+from webapp.decorators import request_deadline
 from webapp.snapcraft import logic as snapcraft_logic
+from webapp.store.catalogue import StoreCatalogue
 from webapp.store.snap_details_views import snap_details_views
 import os
 
@@ -28,6 +34,9 @@ YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 def store_blueprint(store_query=None):
     api = SnapStore(session, store_query)
 
+    # Brand stores serve their homepage and their search from memory
+    catalogue = StoreCatalogue(api) if store_query else None
+
     store = flask.Blueprint(
         "store",
         __name__,
@@ -39,7 +48,7 @@ def store_blueprint(store_query=None):
         status_code = 502
         error = {"message": str(api_error)}
 
-        if type(api_error) is StoreApiTimeoutError:
+        if type(api_error) in [StoreApiTimeoutError, ApiTimeoutError]:
             status_code = 504
         elif type(api_error) is StoreApiResponseDecodeError:
             status_code = 502
@@ -50,7 +59,7 @@ def store_blueprint(store_query=None):
             status_code = 502
         elif type(api_error) is StoreApiConnectionError:
             status_code = 502
-        elif type(api_error) is StoreApiCircuitBreaker:
+        elif type(api_error) in [StoreApiCircuitBreaker, ApiCircuitBreaker]:
             # Special case for this one, because it is the only case where we
             # don't want the user to be able to access the page.
             return flask.abort(503)
@@ -112,7 +121,7 @@ def store_blueprint(store_query=None):
         status_code = 200
 
         try:
-            snaps = api.get_all_items(size=16)["results"]
+            snaps = catalogue.get_snaps()[:16]
         except (StoreApiError, ApiError) as api_error:
             snaps = []
             status_code, error_info = _handle_error(api_error)
@@ -248,23 +257,35 @@ def store_blueprint(store_query=None):
             page = floor(offset / size) + 1
 
         error_info = {}
-        searched_results = []
+        snaps_results = []
+        links = {}
 
         try:
-            searched_results = api.search(snap_searched, size=size, page=page)
+            results = catalogue.search(snap_searched)
+
+            if results is None:
+                # The catalogue is too large to be held in memory
+                searched_results = api.search(
+                    snap_searched, size=size, page=page
+                )
+                snaps_results = searched_results["results"]
+                links = logic.get_pages_details(
+                    flask.request.base_url,
+                    searched_results.get("_links", []),
+                )
+            else:
+                end = offset + size
+                snaps_results = results[offset:end]
+                links = logic.get_search_links(
+                    flask.request.base_url,
+                    snap_searched,
+                    size,
+                    offset,
+                    len(results),
+                )
         except (StoreApiError, ApiError) as api_error:
             status_code, error_info = _handle_error(api_error)
 
-        snaps_results = searched_results["results"]
-        links = logic.get_pages_details(
-            flask.request.base_url,
-            (
-                searched_results["_links"]
-                if "_links" in searched_results
-                else []
-            ),
-        )
-
         context = {
             "query": snap_searched,
             "snaps": snaps_results,
@@ -393,6 +414,7 @@ def store_blueprint(store_query=None):
         return flask.jsonify(snaps_results)
 
     @store.route("/store/sitemap.xml")
+    @request_deadline(None)
     def sitemap():
         base_url = "https://snapcraft.io/store"
 
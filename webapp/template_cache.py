@@ -0,0 +1,43 @@
+"""
+Compile the templates ahead of time into a bytecode cache on local disk,
+shared by all the workers, so a fresh worker doesn't pay the template
+compilation on its first requests.
+"""
+
+import os
+import time
+
+import prometheus_client
+from jinja2 import FileSystemBytecodeCache
+
+template_compile_seconds = prometheus_client.Gauge(
+    "template_compile_seconds",
+    "Time spent loading all the templates when the worker started",
+)
+
+
+def compile_templates(jinja_env):
+    """
+    Load every template of the environment, compiling the ones
+    missing from the bytecode cache.
+    Returns the number of templates and the time it took
+    """
+    start = time.perf_counter()
+    names = jinja_env.list_templates()
+
+    for name in names:
+        jinja_env.get_template(name)
+
+    return len(names), time.perf_counter() - start
+
+
+def init_template_cache(app):
+    cache_dir = app.config["TEMPLATE_CACHE_DIR"]
+
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+    if app.config["TEMPLATE_PRECOMPILE"]:
+        _, duration = compile_templates(app.jinja_env)
+        template_compile_seconds.set(duration)